@@ -3,6 +3,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django import forms
 from django.forms import TextInput,EmailInput
 
+from .services import register_user
+
 
 class SignUpForm(forms.ModelForm):
     
@@ -17,8 +19,14 @@ class SignUpForm(forms.ModelForm):
         }
 
     def save(self, commit=True):
+        if commit:
+            # User and profile in one transaction, password hashed once.
+            self.instance = register_user(
+                self.cleaned_data['username'],
+                self.cleaned_data['email'],
+                self.cleaned_data['password'],
+            )
+            return self.instance
         user = super().save(commit=False) #dont save to db yet
         user.set_password(self.cleaned_data['password']) #hashes pass
-        if commit: #save to db
-            user.save()
         return user
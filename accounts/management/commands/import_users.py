@@ -0,0 +1,31 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.services import bulk_import_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create users (and their profiles) from a CSV with a header row: "
+        "username, email and either password or password_hash. Existing "
+        "usernames are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--no-profiles", action="store_true",
+                            help="Skip profiles; they are then created on first access.")
+
+    def handle(self, path, batch_size=1000, no_profiles=False, **options):
+        try:
+            fh = open(path, newline="", encoding="utf-8")
+        except OSError as exc:
+            raise CommandError(exc)
+        with fh:
+            reader = csv.DictReader(fh)
+            if "username" not in (reader.fieldnames or ()):
+                raise CommandError("CSV needs a 'username' column.")
+            count = bulk_import_users(reader, batch_size=batch_size, with_profiles=not no_profiles)
+        self.stdout.write(self.style.SUCCESS(f"Processed {count} users."))
@@ -11,6 +11,8 @@ class CustomUser(AbstractUser):
 
 
 class UserProfile(models.Model):
+    # Created by accounts.services (register_user, bulk_import_users) or on
+    # first access through get_profile; there is no post_save signal.
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     bio = models.TextField(blank=True)
     location = models.CharField(max_length=100, blank=True)
@@ -0,0 +1,90 @@
+"""User creation paths that avoid redundant queries and password hashing."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .models import UserProfile
+
+
+def register_user(username: str, email: str, password: str):
+    """Create a user and their profile in one transaction, hashing once."""
+
+    User = get_user_model()
+    with transaction.atomic():
+        user = User(username=username, email=email)
+        user.set_password(password)
+        user.save()
+        user.userprofile = UserProfile.objects.create(user=user)
+    return user
+
+
+def get_profile(user) -> UserProfile:
+    """Return ``user``'s profile, creating it on first access."""
+
+    try:
+        return user.userprofile
+    except UserProfile.DoesNotExist:
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        user.userprofile = profile
+        return profile
+
+
+def _batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch: List[Dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_import_users(
+    rows: Iterable[Dict],
+    batch_size: int = 1000,
+    with_profiles: bool = True,
+    reuse_hashes: bool = False,
+) -> int:
+    """Insert users (and profiles) from ``rows`` with ``bulk_create``; returns the count.
+
+    Each row has ``username`` and optionally ``email`` and either a raw
+    ``password`` or an already encoded ``password_hash``. Rows without
+    either get an unusable password. Existing usernames are skipped.
+
+    Every raw password gets its own salt. ``reuse_hashes=True`` hashes each
+    distinct raw password once and copies the result to every user sharing
+    it, which is what makes load-test fixtures with millions of users
+    feasible; never use it for real accounts, since equal passwords then
+    have equal hashes.
+    """
+
+    User = get_user_model()
+    hashed: Dict[Optional[str], str] = {}
+    total = 0
+    for batch in _batches(rows, batch_size):
+        users = []
+        for row in batch:
+            encoded = row.get("password_hash")
+            if not encoded:
+                raw = row.get("password") or None
+                if not reuse_hashes:
+                    encoded = make_password(raw)
+                else:
+                    if raw not in hashed:
+                        hashed[raw] = make_password(raw)
+                    encoded = hashed[raw]
+            users.append(User(username=row["username"], email=row.get("email", ""), password=encoded))
+
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=batch_size, ignore_conflicts=True)
+            if with_profiles:
+                ids = User.objects.filter(username__in=[u.username for u in users]).values_list("pk", flat=True)
+                UserProfile.objects.bulk_create([UserProfile(user_id=pk) for pk in ids],
+                                                batch_size=batch_size, ignore_conflicts=True)
+        total += len(users)
+    return total
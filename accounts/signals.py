@@ -1,10 +0,0 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from django.conf import settings
-from .models import UserProfile
-
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-
-def create_profile(sender, instance,created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
\ No newline at end of file
@@ -1,3 +1,75 @@
-from django.test import TestCase
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from django.urls import reverse
 
-# Create your tests here.
+from accounts import services
+from accounts.hashers import ConfigurablePBKDF2PasswordHasher
+from accounts.models import UserProfile
+from accounts.services import bulk_import_users, get_profile
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_register_creates_user_and_profile_hashing_once(client, monkeypatch):
+    calls = []
+    real = User.set_password
+    monkeypatch.setattr(User, "set_password", lambda self, raw: calls.append(raw) or real(self, raw))
+    monkeypatch.setattr("django.contrib.auth.hashers.MD5PasswordHasher.verify",
+                        lambda *a: pytest.fail("password re-checked after signup"))
+
+    r = client.post(reverse("register"), {"username": "leo", "email": "leo@example.com", "password": "s3cret!"})
+    assert r.status_code == 302
+    user = User.objects.get(username="leo")
+    assert UserProfile.objects.filter(user=user).exists()
+    assert calls == ["s3cret!"]
+    assert client.session["_auth_user_id"] == str(user.pk)
+
+
+@pytest.mark.django_db
+def test_profiles_are_created_lazily(django_assert_num_queries):
+    user = User.objects.create_user("leo", "leo@example.com", "pass")
+    assert not UserProfile.objects.filter(user=user).exists()
+    profile = get_profile(user)
+    with django_assert_num_queries(0):
+        assert get_profile(user) == profile
+
+
+@pytest.mark.django_db
+def test_bulk_import_salts_each_user_unless_reuse_is_asked_for(tmp_path, monkeypatch):
+    User.objects.create_user("taken", "t@example.com", "pass")
+    hashed = []
+    real = services.make_password
+    monkeypatch.setattr(services, "make_password", lambda raw: hashed.append(raw) or real(raw))
+
+    rows = [{"username": f"user{i}", "email": f"user{i}@example.com", "password": "secret"} for i in range(3)]
+    assert bulk_import_users(rows) == 3
+    assert len(hashed) == 3
+    assert len(set(User.objects.filter(username__startswith="user").values_list("password", flat=True))) == 3
+
+    # Synthetic fixtures may opt into hashing each distinct password once.
+    hashed.clear()
+    rows = [{"username": f"load{i}", "email": f"load{i}@example.com", "password": "load-test"} for i in range(25)]
+    rows.append({"username": "taken", "password": "other"})
+    assert bulk_import_users(rows, batch_size=10, reuse_hashes=True) == 26
+    assert hashed == ["load-test", "other"]
+    assert User.objects.count() == 29
+    assert UserProfile.objects.count() == 29
+    assert check_password("load-test", User.objects.get(username="load7").password)
+
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text("username,email,password\nana,ana@example.com,pw\n")
+    call_command("import_users", str(csv_path))
+    assert UserProfile.objects.filter(user__username="ana").exists()
+
+
+def test_pbkdf2_cost_follows_settings(settings):
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1234
+    hasher = ConfigurablePBKDF2PasswordHasher()
+    encoded = hasher.encode("pw", hasher.salt())
+    assert encoded.startswith("pbkdf2_sha256$1234$")
+    settings.PASSWORD_PBKDF2_ITERATIONS = 2000
+    assert hasher.verify("pw", encoded)
+    assert hasher.must_update(encoded)
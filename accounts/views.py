@@ -1,14 +1,17 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 from .forms import SignUpForm
 from django import forms
+from sportsfinder.ratelimit import ratelimit
 
 
 
 # Create your views here.
+@ratelimit("login", "10/m", keys=("ip", "session"))
 def login_view(request, *args, **kwargs):
     if request.method == 'POST':
         username = request.POST.get("username", "").strip()
@@ -32,17 +35,15 @@ def logout_view(request, *args, **kwargs):
     return redirect("home")
 
 
+@ratelimit("register", "5/h", keys=("ip",))
 def register_view(request, *args, **kwargs):
     form = SignUpForm()
     if request.method == "POST":
         form = SignUpForm(request.POST)
         if form.is_valid():
-            form.save()
-            username = form.cleaned_data['username']
-            password = form.cleaned_data['password']
-            #login user
-            user = authenticate(username=username, password=password)
-            login(request, user)
+            user = form.save()
+            # The password was just hashed; authenticate() would hash it again.
+            login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
             messages.success(request, ('Registration was succesfull'))
             return redirect('home')
         else:
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.urls import reverse
 
 # Create your models here.
 
@@ -11,5 +12,8 @@ class Activity(models.Model):
     location    = models.CharField(max_length=120)
     owner       = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
+    def get_absolute_url(self):
+        return reverse("activity-detail", args=[self.pk])
+
     def __str__(self):
         return self.title
\ No newline at end of file
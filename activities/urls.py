@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("activities/<int:pk>/", views.ActivityDetail.as_view(), name="activity-detail"),
+]
@@ -1,4 +1,13 @@
 from django.http import HttpResponse
 from django.shortcuts import render
+from django.views.generic import DetailView
+
+from .models import Activity
 
 # Create your views here.
+
+
+class ActivityDetail(DetailView):
+    model = Activity
+    context_object_name = "activity"
+    template_name = "activities/activity_detail.html"
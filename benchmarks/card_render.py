@@ -0,0 +1,125 @@
+"""Per-card render time of the class list, model instances vs. card data.
+
+Run from the project root::
+
+    python benchmarks/card_render.py [cards] [rounds]
+
+Creates a throwaway test database, seeds classes with a coach (linked to
+a user), tags and three upcoming times each, and renders the card grid
+two ways:
+
+* ``instances`` — the previous markup: ``get_absolute_url``, ``tags.all``,
+  ``coach.display_name`` and ``date``/``time`` filters inside ``{% timezone %}``
+  evaluated in the template, on the old queryset (``coach`` without its user).
+* ``cards`` — `catalog.cards.build_cards` output rendered by the current
+  ``class_list.html`` loop; the build time is included.
+
+Prints the best-of-``rounds`` time per card and the queries per render.
+"""
+import datetime as dt
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sportsfinder.settings_test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.template import engines  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+LEGACY = """{% load tz %}{% for c, next in cards %}
+<a href="{{ c.get_absolute_url }}" class="block rounded-xl border hover:shadow-md transition p-5 bg-white">
+  <h3 class="font-bold text-xl">{{ c.title }}</h3>
+  <p class="text-sm text-slate-600 mt-1">
+    {{ c.location.city }}{% if c.location.address1 %}, {{ c.location.address1 }}{% endif %}
+    {% if c.coach %} • Coach: {{ c.coach.display_name }}{% endif %}
+  </p>
+  {% if c.tags.all %}<div class="flex flex-wrap gap-2 mt-3">
+    {% for t in c.tags.all %}<span class="text-xs bg-slate-100 px-2 py-1 rounded">{{ t.name }}</span>{% endfor %}
+  </div>{% endif %}
+  {% if next %}<ul class="text-sm text-slate-800 space-y-1 mt-1">
+    {% timezone c.location.time_zone %}{% for d in next %}<li>{{ d|date:"D, M j" }} at {{ d|time:"H:i" }}</li>{% endfor %}{% endtimezone %}
+  </ul>{% endif %}
+</a>{% endfor %}"""
+
+CARDS = """{% for card in cards %}
+<a href="{{ card.url }}" class="block rounded-xl border hover:shadow-md transition p-5 bg-white">
+  <h3 class="font-bold text-xl">{{ card.title }}</h3>
+  <p class="text-sm text-slate-600 mt-1">
+    {{ card.place }}{% if card.coach %} • Coach: {{ card.coach }}{% endif %}
+  </p>
+  {% if card.tags %}<div class="flex flex-wrap gap-2 mt-3">
+    {% for name in card.tags %}<span class="text-xs bg-slate-100 px-2 py-1 rounded">{{ name }}</span>{% endfor %}
+  </div>{% endif %}
+  {% if card.next_times %}<ul class="text-sm text-slate-800 space-y-1 mt-1">
+    {% for when in card.next_times %}<li>{{ when }}</li>{% endfor %}
+  </ul>{% endif %}
+</a>{% endfor %}"""
+
+
+def seed(n):
+    from django.contrib.auth import get_user_model
+
+    from catalog.models import ActivityClass, Coach, Location, Tag
+
+    loc = Location.objects.create(city="Vilnius", address1="Gedimino pr. 1", time_zone="Europe/Vilnius")
+    tags = [Tag.objects.create(name=f"Tag {i}", slug=f"tag-{i}") for i in range(3)]
+    user = get_user_model().objects.create_user("coach", "coach@example.com", "pass", first_name="Ona")
+    coach = Coach.objects.create(user=user)
+    start = timezone.now() + dt.timedelta(days=1)
+    times = [(start + dt.timedelta(days=d)).isoformat() for d in range(3)]
+    for i in range(n):
+        cls = ActivityClass.objects.create(title=f"Class {i}", slug=f"class-{i}", location=loc,
+                                           coach=coach, next_session_times=times)
+        cls.tags.set(tags)
+
+
+def best(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    from catalog.cards import build_cards
+    from catalog.models import ActivityClass
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(n)
+        engine = engines["django"]
+        legacy, current = engine.from_string(LEGACY), engine.from_string(CARDS)
+
+        def render_instances():
+            rows = list(ActivityClass.objects.select_related("location", "coach").prefetch_related("tags"))
+            return legacy.render({"cards": [(c, c.upcoming_times) for c in rows]})
+
+        def render_cards():
+            rows = list(ActivityClass.objects.select_related("location", "coach__user").prefetch_related("tags"))
+            return current.render({"cards": build_cards((c, c.upcoming_times) for c in rows)})
+
+        print(f"{n} cards, best of {rounds} rounds")
+        for label, fn in (("instances", render_instances), ("cards", render_cards)):
+            with CaptureQueriesContext(connection) as ctx:
+                fn()
+            per_card = best(fn, rounds) / n * 1e6
+            print(f"{label:10} {per_card:8.1f} µs/card  {len(ctx.captured_queries):3} queries")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
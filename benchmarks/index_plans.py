@@ -0,0 +1,93 @@
+"""Query plans and timings of the catalog pages without and with the 0018 indexes.
+
+Run from the project root::
+
+    python benchmarks/index_plans.py [classes]
+
+Creates a throwaway test database, seeds ``classes`` classes (default
+5000) with `catalog.seeding`, and captures the SELECTs of the catalog
+pages (see `catalog.index_audit`). Every captured query whose plan depends
+on the migration is then explained and timed twice: with the catalog
+migrated back to 0017 ("before") and forward again to 0018 ("after").
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sportsfinder.settings_test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+BEFORE, AFTER = "0017_photos", "0018_catalog_query_indexes"
+
+
+def timed(sql, params, repeat=20):
+    with connection.cursor() as cursor:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def measure(queries):
+    from catalog.index_audit import explain
+
+    if connection.vendor == "sqlite":
+        connection.cursor().execute("ANALYZE")
+    return [(explain(q.sql, q.params), timed(q.sql, q.params)) for q in queries]
+
+
+def main():
+    from catalog.index_audit import audit_pages, capture_queries, full_scans
+    from catalog.seeding import seed_catalog
+
+    classes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed_catalog(classes=classes, locations=max(1, classes // 20), coaches=max(1, classes // 10))
+        seen, queries = set(), []
+        for query in capture_queries(audit_pages()):
+            if (query.page, query.sql) not in seen:
+                seen.add((query.page, query.sql))
+                queries.append(query)
+
+        call_command("migrate", "catalog", BEFORE, verbosity=0)
+        before = measure(queries)
+        call_command("migrate", "catalog", AFTER, verbosity=0)
+        after = measure(queries)
+
+        print(f"{classes} classes, {len(queries)} distinct queries on {connection.vendor}\n")
+        total_before = total_after = 0.0
+        for query, (plan_before, ms_before), (plan_after, ms_after) in zip(queries, before, after):
+            total_before += ms_before
+            total_after += ms_after
+            if plan_before == plan_after:
+                continue
+            sql = " ".join(query.sql.split())
+            print(f"[{query.page}] {sql[:160]}{'…' if len(sql) > 160 else ''}")
+            print(f"  before: {ms_before:7.2f} ms, {len(full_scans(plan_before))} full scan(s)")
+            for step in plan_before:
+                print(f"    {step}")
+            print(f"  after:  {ms_after:7.2f} ms, {len(full_scans(plan_after))} full scan(s)")
+            for step in plan_after:
+                print(f"    {step}")
+            print()
+        print(f"all captured queries: {total_before:.2f} ms before, {total_after:.2f} ms after")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Replay a weighted traffic mix against a running server and report capacity.
+
+Seed a database and start the server you want to measure, e.g.::
+
+    python manage.py seed_catalog --classes 1000 --users 200
+    RATELIMIT_ENABLED=0 gunicorn sportsfinder.wsgi -w 4      # or runserver / uvicorn
+
+then, from the project root::
+
+    python benchmarks/loadtest.py benchmarks/scenarios/browse_and_book.json \\
+        --url http://127.0.0.1:8000 --json results/$(git rev-parse --short HEAD).json
+    python benchmarks/loadtest.py benchmarks/scenarios/browse_and_book.json \\
+        --compare results/<baseline>.json
+
+Each virtual user is a thread with its own keep-alive connection and
+cookies. It logs in first when the mix books sessions, then picks actions
+by weight until the duration is up:
+
+* ``list`` — the class list with random tag/city/sort/within filters and pages,
+* ``detail`` — a seeded class page, navigated with ``?start=`` up to four weeks out,
+* ``login`` — the login form round trip (GET for the CSRF token, then POST),
+* ``book`` — a class page, then a ``book_session`` POST of its first session.
+
+Requests finished during ``warmup`` are not counted. Randomness is seeded
+per virtual user, so a scenario replays the same requests on every run.
+Only the standard library is used; the script never imports Django.
+"""
+import argparse
+import html
+import http.client
+import json
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+DEFAULTS = {
+    "url": "http://127.0.0.1:8000",
+    "duration": 30,
+    "warmup": 5,
+    "concurrency": 10,
+    "think_time": 0.0,          # seconds between a user's actions
+    "timeout": 30,
+    "seed": 0,
+    "catalog_seed": 0,          # --seed given to `manage.py seed_catalog`
+    "classes": 1000,            # --classes given to `manage.py seed_catalog`
+    "users": 200,               # --users given to `manage.py seed_catalog`
+    "password": "loadtest-pass",
+    "mix": {"list": 50, "detail": 35, "login": 5, "book": 10},
+    "filters": {
+        "tag": ["yoga", "pilates", "boxing", "hiit", "spinning", "climbing", "beginner", "advanced"],
+        "city": ["Vilnius", "Kaunas", "Riga", "Tallinn", "Warsaw", "Berlin", "London", "New York"],
+        "sort": ["", "soonest"],
+        "within": ["", "1", "3", "7"],
+        "pages": 5,
+    },
+}
+LOGIN_PATH = "/accounts/login_view"
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+SESSION_TOKEN_RE = re.compile(r'name="token" value="([^"]+)"')
+PERCENTILES = (50, 90, 99)
+
+
+class Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status, self.headers, self.body = status, headers, body
+
+    def text(self):
+        return self.body.decode("utf-8", "replace")
+
+
+class Browser:
+    """One keep-alive connection with a cookie jar; does not follow redirects."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self._connect = lambda: conn_class(parts.hostname, parts.port, timeout=timeout)
+        self.conn = self._connect()
+        self.cookies = {}
+
+    def request(self, method, path, form=None, referer=None):
+        headers = {"Host": self.host, "User-Agent": "sportsfinder-loadtest"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            headers["Referer"] = referer or f"http://{self.host}{self.prefix}{path}"
+        for attempt in (1, 2):
+            try:
+                self.conn.request(method, self.prefix + path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; retry once on a new one.
+                self.conn.close()
+                self.conn = self._connect()
+                if attempt == 2:
+                    raise
+        for header in response.headers.get_all("Set-Cookie") or ():
+            for name, morsel in SimpleCookie(header).items():
+                if morsel["max-age"] == "0" or not morsel.value:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+        return Response(response.status, response.headers, data)
+
+    def close(self):
+        self.conn.close()
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = []  # (action, seconds, outcome)
+        self.lock = threading.Lock()
+
+    def add(self, action, seconds, outcome):
+        with self.lock:
+            self.samples.append((action, seconds, outcome))
+
+
+def outcome_of(status):
+    if status == 429:
+        return "throttled"
+    return "ok" if status < 400 else "error"
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, index, config, recorder, started, deadline):
+        super().__init__(name=f"vu-{index}", daemon=True)
+        self.config = config
+        self.recorder = recorder
+        self.measure_from = started + config["warmup"]
+        self.deadline = deadline
+        self.rng = random.Random(f"{config['seed']}-{index}")
+        self.username = f"loadtest-{index % max(1, config['users'])}"
+        self.browser = Browser(config["url"], config["timeout"])
+        actions = [(name, weight) for name, weight in config["mix"].items() if weight > 0]
+        unknown = {name for name, _ in actions} - set(ACTIONS)
+        if unknown:
+            raise SystemExit(f"Unknown actions in mix: {', '.join(sorted(unknown))}")
+        self.actions = [name for name, _ in actions]
+        self.weights = [weight for _, weight in actions]
+        self.logged_in = False
+
+    def timed(self, action, method, path, form=None):
+        started = time.perf_counter()
+        try:
+            response = self.browser.request(method, path, form=form)
+        except (OSError, http.client.HTTPException):
+            response, outcome = None, "error"
+        else:
+            outcome = outcome_of(response.status)
+        if time.monotonic() >= self.measure_from:
+            self.recorder.add(action, time.perf_counter() - started, outcome)
+        return response
+
+    def class_path(self):
+        n = self.rng.randrange(self.config["classes"])
+        return f"/classes/seed-{self.config['catalog_seed']}-class-{n}/"
+
+    # Actions ------------------------------------------------------------
+
+    def do_list(self):
+        filters = self.config["filters"]
+        params = {}
+        for name in ("tag", "city", "sort", "within"):
+            if filters.get(name) and self.rng.random() < 0.5:
+                value = self.rng.choice(filters[name])
+                if value:
+                    params[name] = value
+        # Only the unfiltered list is sure to have ``pages`` pages (others 404).
+        page = self.rng.randint(1, filters.get("pages", 1))
+        if page > 1 and not params:
+            params["page"] = page
+        self.timed("list", "GET", "/classes/" + (f"?{urlencode(params)}" if params else ""))
+
+    def do_detail(self):
+        start = date.today() + timedelta(days=self.rng.randrange(29))
+        self.timed("detail", "GET", f"{self.class_path()}?start={start.isoformat()}")
+
+    def do_login(self):
+        page = self.timed("login", "GET", LOGIN_PATH)
+        match = page and CSRF_RE.search(page.text())
+        if not match:
+            return
+        response = self.timed("login", "POST", LOGIN_PATH, form={
+            "csrfmiddlewaretoken": match.group(1),
+            "username": self.username,
+            "password": self.config["password"],
+        })
+        # Success redirects home; a bad password redirects back to the form.
+        self.logged_in = bool(response and response.status == 302
+                              and not response.headers.get("Location", "").endswith(LOGIN_PATH))
+
+    def do_book(self):
+        if not self.logged_in:
+            self.do_login()
+            if not self.logged_in:
+                return
+        path = self.class_path()
+        page = self.timed("book", "GET", path)
+        if page is None or page.status != 200:
+            return
+        body = page.text()
+        csrf, token = CSRF_RE.search(body), SESSION_TOKEN_RE.search(body)
+        if not (csrf and token):
+            return  # class without upcoming sessions
+        self.timed("book", "POST", path + "book/", form={
+            "csrfmiddlewaretoken": csrf.group(1),
+            "token": html.unescape(token.group(1)),
+        })
+
+    def run(self):
+        try:
+            if "book" in self.actions:
+                self.do_login()
+            while time.monotonic() < self.deadline:
+                getattr(self, ACTIONS[self.rng.choices(self.actions, self.weights)[0]])()
+                if self.config["think_time"]:
+                    time.sleep(self.rng.expovariate(1 / self.config["think_time"]))
+        finally:
+            self.browser.close()
+
+
+ACTIONS = {"list": "do_list", "detail": "do_detail", "login": "do_login", "book": "do_book"}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarise(samples, seconds):
+    """``{action: stats}`` plus ``"total"``; latencies in milliseconds."""
+
+    by_action = {}
+    for action, latency, outcome in samples:
+        by_action.setdefault(action, []).append((latency, outcome))
+    by_action["total"] = [(latency, outcome) for _, latency, outcome in samples]
+
+    report = {}
+    for action, rows in by_action.items():
+        latencies = sorted(latency * 1000 for latency, _ in rows)
+        outcomes = [outcome for _, outcome in rows]
+        stats = {
+            "requests": len(rows),
+            "rps": len(rows) / seconds if seconds else 0.0,
+            "error_rate": outcomes.count("error") / len(rows) if rows else 0.0,
+            "throttled_rate": outcomes.count("throttled") / len(rows) if rows else 0.0,
+            "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+            "max_ms": latencies[-1] if latencies else 0.0,
+        }
+        for pct in PERCENTILES:
+            stats[f"p{pct}_ms"] = percentile(latencies, pct)
+        report[action] = stats
+    return report
+
+
+def print_report(report, baseline=None):
+    columns = ["requests", "rps", "error_rate", "throttled_rate", "mean_ms"] + \
+              [f"p{pct}_ms" for pct in PERCENTILES] + ["max_ms"]
+    print(f"{'action':8}" + "".join(f"{c:>15}" for c in columns))
+    for action in sorted(report, key=lambda a: (a == "total", a)):
+        stats = report[action]
+        cells = []
+        for column in columns:
+            value = stats[column]
+            cell = f"{value:.1%}" if column.endswith("_rate") else (
+                f"{value}" if column == "requests" else f"{value:.1f}")
+            if baseline and action in baseline and column not in ("requests",) and baseline[action][column]:
+                change = value / baseline[action][column] - 1
+                cell += f" ({change:+.0%})"
+            cells.append(f"{cell:>15}")
+        print(f"{action:8}" + "".join(cells))
+
+
+def load_config(args):
+    config = json.loads(json.dumps(DEFAULTS))
+    if args.scenario:
+        with open(args.scenario, encoding="utf-8") as fh:
+            scenario = json.load(fh)
+        for key, value in scenario.items():
+            if key not in DEFAULTS:
+                raise SystemExit(f"Unknown scenario key {key!r}.")
+            config[key] = {**config[key], **value} if isinstance(value, dict) and key == "filters" else value
+    for key in ("url", "duration", "warmup", "concurrency", "seed", "classes", "users"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("scenario", nargs="?", help="JSON file overriding the defaults (mix, counts, ...).")
+    parser.add_argument("--url")
+    parser.add_argument("--duration", type=float, help="Seconds to run, warm-up included.")
+    parser.add_argument("--warmup", type=float)
+    parser.add_argument("--concurrency", type=int, help="Virtual users.")
+    parser.add_argument("--seed", type=int, help="Seed of the request sequence.")
+    parser.add_argument("--classes", type=int, help="Classes seeded by `manage.py seed_catalog`.")
+    parser.add_argument("--users", type=int, help="Load-test users seeded by `manage.py seed_catalog`.")
+    parser.add_argument("--json", dest="json_path", help="Write the report (and the config) to this file.")
+    parser.add_argument("--compare", help="A previous --json report to show changes against.")
+    args = parser.parse_args(argv)
+    config = load_config(args)
+
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + config["duration"]
+    users = [VirtualUser(i, config, recorder, started, deadline) for i in range(config["concurrency"])]
+    print(f"{config['concurrency']} users against {config['url']} for {config['duration']}s "
+          f"({config['warmup']}s warm-up), mix {config['mix']}", file=sys.stderr)
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+
+    report = summarise(recorder.samples, max(0.0, config["duration"] - config["warmup"]))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)["report"]
+    print_report(report, baseline)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump({"config": config, "report": report}, fh, indent=1, sort_keys=True)
+    return 1 if report.get("total", {}).get("error_rate", 0) > 0.01 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
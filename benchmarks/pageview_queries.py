@@ -0,0 +1,99 @@
+"""Queries per page view for anonymous and logged-in visitors.
+
+Run from the project root::
+
+    python benchmarks/pageview_queries.py
+
+Creates a throwaway test database, seeds a few classes and prints the
+number of SQL queries (and how many touch ``django_session``) for the
+main catalog pages. Each scenario runs with the configured session and
+message settings and, for comparison, with Django's defaults (database
+sessions, fallback message storage).
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sportsfinder.settings_test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+DEFAULTS = {
+    "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+    "MESSAGE_STORAGE": "django.contrib.messages.storage.fallback.FallbackStorage",
+}
+
+
+def seed():
+    from django.contrib.auth import get_user_model
+
+    from catalog.models import ActivityClass, Location
+
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    for i in range(12):
+        ActivityClass.objects.create(title=f"Class {i}", slug=f"class-{i}", location=loc)
+    get_user_model().objects.create_user("bench", "bench@example.com", "pass")
+
+
+def measure(client, url, repeat=3, cookie=None):
+    """Queries of the last of ``repeat`` requests (i.e. with warm caches).
+
+    ``cookie`` is re-sent on every request even though the server deletes
+    it, as crawlers and cookie-replaying clients do.
+    """
+    for _ in range(repeat):
+        if cookie:
+            client.cookies[settings.SESSION_COOKIE_NAME] = cookie
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(url)
+    session = sum("django_session" in q["sql"] for q in ctx.captured_queries)
+    return len(ctx.captured_queries), session
+
+
+def scenarios():
+    logged_in = Client()
+    logged_in.login(username="bench", password="pass")
+    return {
+        "anonymous": (Client(), None),
+        "stale cookie": (Client(), "x" * 32),
+        "logged in": (logged_in, None),
+    }
+
+
+def main():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed()
+        pages = {
+            "class list": reverse("class-list"),
+            "class detail": reverse("class-detail", args=["class-0"]),
+            "search": reverse("search") + "?q=class",
+        }
+        print(f"{'':28} {'configured':>12} {'defaults':>12}   (total / session queries)")
+        for label, overrides in (("configured", {}), ("defaults", DEFAULTS)):
+            with override_settings(**overrides):
+                results = {}
+                for who, (client, cookie) in scenarios().items():
+                    for page, url in pages.items():
+                        results[f"{who}, {page}"] = measure(client, url, cookie=cookie)
+            if label == "configured":
+                configured = results
+        for key, (total, session) in configured.items():
+            d_total, d_session = results[key]
+            print(f"{key:28} {total:>7} / {session:<3} {d_total:>7} / {d_session:<3}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,93 @@
 # activities/admin.py
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
-from .models import Location, Coach, Tag, ActivityClass, ScheduleRule, Booking
+
+from .admin_tools import AutocompleteFilterMixin, EstimatedCountPaginator, autocomplete_filter
+from .conflicts import conflicts_for_class
+from .models import Location, Coach, Tag, ActivityClass, ScheduleRule, Booking, ScheduleException, OneOffSession
 
 class ScheduleRuleInline(admin.TabularInline):
     model = ScheduleRule
     extra = 2
 
+
+class ScheduleExceptionInline(admin.TabularInline):
+    model = ScheduleException
+    fk_name = "activity_class"
+    fields = ("date", "reason")
+    extra = 0
+
+
+class OneOffSessionInline(admin.TabularInline):
+    model = OneOffSession
+    extra = 0
+
 @admin.register(ActivityClass)
-class ActivityClassAdmin(admin.ModelAdmin):
+class ActivityClassAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("title", "location", "coach", "price", "public_link")
     list_display_links = ("title",)
     search_fields = ("title", "description")
-    list_filter = ("location", "tags")
+    list_filter = (autocomplete_filter("location"), "tags")
+    list_select_related = ("location", "coach")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     prepopulated_fields = {"slug": ("title",)}
     readonly_fields = ("slug",)   # optional
-    inlines = [ScheduleRuleInline]
+    inlines = [ScheduleRuleInline, ScheduleExceptionInline, OneOffSessionInline]
+
+    # Conflicts are only reported, not blocked: admins sometimes import a
+    # schedule in several steps and fix overlaps afterwards.
+    MAX_REPORTED_CONFLICTS = 5
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        conflicts = conflicts_for_class(form.instance)
+        for conflict in conflicts[:self.MAX_REPORTED_CONFLICTS]:
+            messages.warning(request, f"Schedule conflict: {conflict}")
+        if len(conflicts) > self.MAX_REPORTED_CONFLICTS:
+            messages.warning(request, f"…and {len(conflicts) - self.MAX_REPORTED_CONFLICTS} more; "
+                                      "run `manage.py audit_schedule_conflicts` for the full list.")
 
     @admin.display(description="Public")
     def public_link(self, obj):
         return format_html('<a href="{}" target="_blank">Open</a>', obj.get_absolute_url())
 
 
-admin.site.register(Location)
+class LocationClosureInline(admin.TabularInline):
+    model = ScheduleException
+    fk_name = "location"
+    fields = ("date", "reason")
+    extra = 0
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "city", "country")
+    search_fields = ("address1", "city")
+    inlines = [LocationClosureInline]
+
+
+@admin.register(ScheduleException)
+class ScheduleExceptionAdmin(admin.ModelAdmin):
+    list_display = ("date", "activity_class", "location", "reason")
+    list_filter = (("date", admin.DateFieldListFilter),)
+    date_hierarchy = "date"
+    raw_id_fields = ("activity_class", "location")
+
+
 admin.site.register(Coach)
 admin.site.register(Tag)
 admin.site.register(ScheduleRule)
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("user", "activity_class", "start", "end", "status")
+    # Enumerating every user and class as filter links does not scale;
+    # these search the related admin instead.
     list_filter = (
-        "activity_class",
-        "user",
+        autocomplete_filter("activity_class"),
+        autocomplete_filter("user"),
         "status",
         ("start", admin.DateFieldListFilter),
     )
@@ -44,3 +98,6 @@ class BookingAdmin(admin.ModelAdmin):
     )
     ordering = ("-start",)
     list_select_related = ("user", "activity_class")
+    raw_id_fields = ("user", "activity_class")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,163 @@
+"""In-memory prefix index for search-as-you-type.
+
+Every class title, tag, city and coach name is indexed under each of its
+words (so "yo" finds "Power Yoga") in one sorted list of normalised keys.
+A lookup is a `bisect` to the first key with the prefix plus a short walk,
+i.e. O(log n + limit), which answers in microseconds from process memory.
+
+Web workers build the index at startup (`warm`, called from the WSGI and
+ASGI entry points), so no visitor waits for it. When the ``autocomplete``
+cache namespace is bumped by the change signals, every worker notices
+within the local cache TTL and rebuilds in a background thread while
+requests keep answering from the previous index.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import unicodedata
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.db import DatabaseError, connections
+from django.urls import reverse
+
+from . import cache as catalog_cache
+from .models import ActivityClass, Coach, Location, Tag
+
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "autocomplete"
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+
+class Suggestion(NamedTuple):
+    kind: str  # "class", "tag", "city" or "coach"
+    label: str
+    url: str
+
+
+def normalise(text: str) -> str:
+    """Casefold and strip accents so "kau" matches "Kaunas" and "zal" "Žalgiris"."""
+
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over `Suggestion` entries."""
+
+    def __init__(self, entries: Iterable[Tuple[str, Suggestion]]):
+        pairs = set()
+        for text, suggestion in entries:
+            words = normalise(text).split()
+            # Whole phrase plus every word-suffix, so multi-word prefixes work too.
+            for i in range(len(words)):
+                pairs.add((" ".join(words[i:]), suggestion))
+        ordered = sorted(pairs)
+        self.keys = [key for key, _ in ordered]
+        self.suggestions = [suggestion for _, suggestion in ordered]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[Suggestion]:
+        prefix = " ".join(normalise(prefix).split())
+        if not prefix:
+            return []
+        results: List[Suggestion] = []
+        seen = set()
+        i = bisect.bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(results) < limit and self.keys[i].startswith(prefix):
+            suggestion = self.suggestions[i]
+            if suggestion not in seen:
+                seen.add(suggestion)
+                results.append(suggestion)
+            i += 1
+        return results
+
+
+def _class_list_url(**params) -> str:
+    return f"{reverse('class-list')}?{urlencode(params)}"
+
+
+def build_index() -> PrefixIndex:
+    entries: List[Tuple[str, Suggestion]] = []
+    for title, slug in ActivityClass.objects.values_list("title", "slug").iterator():
+        entries.append((title, Suggestion("class", title, reverse("class-detail", args=[slug]))))
+    for name, slug in Tag.objects.values_list("name", "slug"):
+        entries.append((name, Suggestion("tag", name, _class_list_url(tag=slug))))
+    for city in Location.objects.values_list("city", flat=True).distinct():
+        entries.append((city, Suggestion("city", city, _class_list_url(city=city))))
+    for coach in Coach.objects.filter(classes__isnull=False).select_related("user").distinct():
+        if coach.display_name:
+            entries.append((coach.display_name,
+                             Suggestion("coach", coach.display_name, _class_list_url(coach=coach.pk))))
+    return PrefixIndex(entries)
+
+
+class _Holder:
+    """Process-wide index, rebuilt when the namespace version moves on."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.index: Optional[PrefixIndex] = None
+        self.version = None
+        self.refresher: Optional[threading.Thread] = None
+
+    def get(self) -> PrefixIndex:
+        version = catalog_cache.namespace_version(NAMESPACE)
+        if self.index is not None and version == self.version:
+            return self.index
+        if self.index is None:
+            # Nothing to serve yet (warm-up failed or never ran): build here.
+            with self._lock:
+                if self.index is None:
+                    self._build(version)
+            return self.index
+        if self._lock.acquire(blocking=False):
+            self.refresher = threading.Thread(target=self._refresh, args=(version,),
+                                              name="autocomplete-refresh", daemon=True)
+            self.refresher.start()
+        return self.index  # stale until the refresher swaps in the new one
+
+    def _build(self, version) -> None:
+        index = build_index()
+        self.index, self.version = index, version
+
+    def _refresh(self, version) -> None:
+        try:
+            self._build(version)
+        except DatabaseError:
+            logger.exception("Rebuilding the autocomplete index failed; serving the previous one.")
+        finally:
+            self._lock.release()
+            connections.close_all()  # this thread's connections only
+
+    def reset(self):
+        with self._lock:
+            self.index = None
+            self.version = None
+
+
+_holder = _Holder()
+
+
+def warm() -> None:
+    """Build this process's index now rather than on the first request.
+
+    Errors are logged, not raised: a worker whose database is not reachable
+    yet still starts and builds the index on first use instead.
+    """
+
+    try:
+        _holder.get()
+    except DatabaseError:
+        logger.exception("Could not warm the autocomplete index; it will be built on first use.")
+
+
+def suggest(prefix: str, limit: int = DEFAULT_LIMIT) -> List[Suggestion]:
+    return _holder.get().lookup(prefix, max(1, min(limit, MAX_LIMIT)))
@@ -0,0 +1,261 @@
+"""Two-tier cache for catalog data.
+
+Reads go through a small in-process LRU first and then Django's shared
+``default`` cache. Keys are namespaced and versioned: ``invalidate("tags")``
+bumps the namespace version so every key in it is orphaned at once, without a
+delete sweep.
+
+Shared entries are stored with a "fresh until" stamp and kept around for an
+extra ``stale_ttl`` seconds. When an entry goes stale, one caller (the holder
+of the recompute lock) rebuilds it while everyone else keeps serving the stale
+value. On a cold miss the same lock makes concurrent callers wait for the
+first computation instead of stampeding the database.
+
+Usage::
+
+    from catalog import cache as catalog_cache
+
+    tags = catalog_cache.get_or_set("tags", "all", lambda: list(Tag.objects.all()))
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+KEY_PREFIX = "catalog"
+
+DEFAULTS = {
+    "ALIAS": "default",
+    "TIMEOUT": 300,           # seconds an entry is considered fresh
+    "STALE_TTL": 60,          # extra seconds a stale entry may still be served
+    "LOCAL_MAX_ENTRIES": 512,
+    "LOCAL_TTL": 30,          # local tier lifetime; bounds cross-process lag
+    "LOCK_TIMEOUT": 10,       # upper bound for a single recompute
+}
+
+_MISSING = object()
+
+
+def _setting(name: str) -> Any:
+    return getattr(settings, "CATALOG_CACHE", {}).get(name, DEFAULTS[name])
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheStats:
+    """Per-namespace hit/miss counters."""
+
+    FIELDS = ("local_hits", "shared_hits", "stale_hits", "misses", "recomputes")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def incr(self, namespace: str, field: str) -> None:
+        with self._lock:
+            self._counts[namespace][field] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for namespace, counts in self._counts.items():
+                row: Dict[str, float] = dict(counts)
+                hits = counts["local_hits"] + counts["shared_hits"] + counts["stale_hits"]
+                total = hits + counts["misses"]
+                row["hit_rate"] = hits / total if total else 0.0
+                result[namespace] = row
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+local_cache = LocalLRU(_setting("LOCAL_MAX_ENTRIES"))
+stats = CacheStats()
+# Keys this process is recomputing right now; claimed and released under the guard.
+_inflight: Set[str] = set()
+_inflight_guard = threading.Lock()
+
+
+def _shared():
+    return caches[_setting("ALIAS")]
+
+
+def _version_key(namespace: str) -> str:
+    return f"{KEY_PREFIX}:ns:{namespace}"
+
+
+def namespace_version(namespace: str) -> int:
+    local_key = ("ns", namespace)
+    version = local_cache.get(local_key)
+    if version is _MISSING:
+        version = _shared().get(_version_key(namespace))
+        if version is None:
+            version = 1
+            _shared().add(_version_key(namespace), version, timeout=None)
+        local_cache.set(local_key, version, _setting("LOCAL_TTL"))
+    return version
+
+
+def make_key(namespace: str, key: Any) -> str:
+    return f"{KEY_PREFIX}:{namespace}:v{namespace_version(namespace)}:{key}"
+
+
+def invalidate(namespace: str) -> None:
+    """Orphan every key in ``namespace`` by bumping its version."""
+
+    shared = _shared()
+    version_key = _version_key(namespace)
+    try:
+        version = shared.incr(version_key)
+    except ValueError:
+        version = 2
+        shared.set(version_key, version, timeout=None)
+    local_cache.set(("ns", namespace), version, _setting("LOCAL_TTL"))
+
+
+def _store(full_key: str, value: Any, timeout: float, stale_ttl: float, local: bool) -> None:
+    _shared().set(full_key, (time.time() + timeout, value), timeout=timeout + stale_ttl)
+    if local:
+        local_cache.set(full_key, value, min(timeout, _setting("LOCAL_TTL")))
+
+
+def _recompute(namespace, full_key, producer, timeout, stale_ttl, local):
+    stats.incr(namespace, "recomputes")
+    value = producer()
+    _store(full_key, value, timeout, stale_ttl, local)
+    return value
+
+
+def _acquire(full_key: str) -> bool:
+    """Take the process-local and shared recompute locks for ``full_key``.
+
+    False means another thread or process is already computing this key.
+    """
+
+    with _inflight_guard:
+        if full_key in _inflight:
+            return False
+        _inflight.add(full_key)
+    if not _shared().add(f"{full_key}:lock", 1, timeout=_setting("LOCK_TIMEOUT")):
+        with _inflight_guard:
+            _inflight.discard(full_key)
+        return False
+    return True
+
+
+def _release(full_key: str) -> None:
+    _shared().delete(f"{full_key}:lock")
+    with _inflight_guard:
+        _inflight.discard(full_key)
+
+
+def get_or_set(
+    namespace: str,
+    key: Any,
+    producer: Callable[[], Any],
+    timeout: Optional[float] = None,
+    stale_ttl: Optional[float] = None,
+    local: bool = True,
+) -> Any:
+    """Return the cached value for ``(namespace, key)``, computing it at most once.
+
+    ``local=False`` skips the in-process tier for the value itself; use it for
+    results that are too large or too short-lived to copy into every worker.
+    """
+
+    timeout = _setting("TIMEOUT") if timeout is None else timeout
+    stale_ttl = _setting("STALE_TTL") if stale_ttl is None else stale_ttl
+    full_key = make_key(namespace, key)
+
+    if local:
+        value = local_cache.get(full_key)
+        if value is not _MISSING:
+            stats.incr(namespace, "local_hits")
+            return value
+
+    envelope = _shared().get(full_key)
+    if envelope is not None:
+        fresh_until, value = envelope
+        if fresh_until > time.time():
+            stats.incr(namespace, "shared_hits")
+            if local:
+                local_cache.set(full_key, value, min(fresh_until - time.time(), _setting("LOCAL_TTL")))
+            return value
+
+        # Stale: one caller refreshes, the rest keep serving the old value.
+        if not _acquire(full_key):
+            stats.incr(namespace, "stale_hits")
+            return value
+        try:
+            return _recompute(namespace, full_key, producer, timeout, stale_ttl, local)
+        finally:
+            _release(full_key)
+
+    stats.incr(namespace, "misses")
+    if not _acquire(full_key):
+        # Someone else is computing; wait for their result rather than piling on.
+        deadline = time.monotonic() + _setting("LOCK_TIMEOUT")
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            envelope = _shared().get(full_key)
+            if envelope is not None:
+                return envelope[1]
+        return _recompute(namespace, full_key, producer, timeout, stale_ttl, local)
+    try:
+        return _recompute(namespace, full_key, producer, timeout, stale_ttl, local)
+    finally:
+        _release(full_key)
+
+
+def clear_local() -> None:
+    local_cache.clear()
+
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    return stats.snapshot()
@@ -0,0 +1,69 @@
+"""Plain display data for class cards on listing pages.
+
+Rendering a card straight from an `ActivityClass` costs a ``reverse()``
+for its URL, a tags prefetch walk, the coach's ``display_name`` (which
+reads the linked user) and two localised date filters per session time,
+all resolved through the template engine's variable lookup. `build_cards`
+does that work once per page in Python: URLs are spliced into a prefix
+reversed once per URLconf, times are converted to the class's zone and
+formatted directly, and the template only prints strings.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import functools
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+
+from django.urls import get_script_prefix, get_urlconf, reverse
+
+from .zones import class_zone
+
+
+class Card(NamedTuple):
+    url: str
+    title: str
+    place: str
+    coach: str
+    tags: Tuple[str, ...]
+    next_times: Tuple[str, ...]
+
+
+@functools.lru_cache(maxsize=8)
+def _detail_url_parts(urlconf, script_prefix) -> Tuple[str, str]:
+    return tuple(reverse("class-detail", args=["slug-placeholder"]).split("slug-placeholder"))
+
+
+def class_url(slug: str) -> str:
+    """``reverse("class-detail", args=[slug])`` without the per-call reverse; also used by sitemaps."""
+
+    prefix, suffix = _detail_url_parts(get_urlconf(), get_script_prefix())
+    return prefix + slug + suffix
+
+
+def format_session(value: dt.datetime, zone: dt.tzinfo) -> str:
+    """``"Mon, Jun 3 at 18:00"`` in ``zone`` (what ``date:"D, M j"`` + ``time:"H:i"`` gave)."""
+
+    local = value.astimezone(zone)
+    return f"{local:%a, %b} {local.day} at {local:%H:%M}"
+
+
+def build_cards(rows: Iterable[Tuple[object, Sequence[dt.datetime]]]) -> List[Card]:
+    """One `Card` per ``(activity_class, next_times)``.
+
+    Expects ``location``, ``coach__user`` selected and ``tags`` prefetched.
+    """
+
+    cards = []
+    for obj, next_times in rows:
+        location = obj.location
+        place = location.city + (f", {location.address1}" if location.address1 else "")
+        zone = class_zone(obj)
+        cards.append(Card(
+            url=class_url(obj.slug),
+            title=obj.title,
+            place=place,
+            coach=obj.coach.display_name if obj.coach_id else "",
+            tags=tuple(tag.name for tag in obj.tags.all()),
+            next_times=tuple(format_session(t, zone) for t in next_times),
+        ))
+    return cards
@@ -0,0 +1,130 @@
+"""Detect coaches and venues booked for two classes at once.
+
+Weekly rules and one-off sessions are expanded over a window, grouped per
+coach and per location, and each group is swept once with
+`intervals.overlapping_pairs`. The whole catalog is processed in batches of
+classes with a fixed number of queries per batch.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .intervals import overlapping_pairs
+from .models import ActivityClass, ScheduleRule
+from .utils import calendars_for, rule_dates
+from .zones import class_zone, localizer
+
+
+DEFAULT_WEEKS = 8
+BATCH_SIZE = 500
+
+
+class Occurrence(NamedTuple):
+    class_id: int
+    title: str
+    start: dt.datetime
+    end: dt.datetime
+
+
+@dataclass(frozen=True)
+class Conflict:
+    kind: str  # "coach" or "location"
+    resource_id: int
+    first: Occurrence
+    second: Occurrence
+
+    def __str__(self):
+        return (f"{self.kind} #{self.resource_id}: {self.first.title} "
+                f"({self.first.start:%Y-%m-%d %H:%M}–{self.first.end:%H:%M}) overlaps "
+                f"{self.second.title} ({self.second.start:%Y-%m-%d %H:%M}–{self.second.end:%H:%M})")
+
+
+def expand_for_conflicts(classes: List[ActivityClass], first_day: dt.date, last_day: dt.date) -> Dict[int, List[Occurrence]]:
+    """Expand a batch of classes (with ``location`` selected) into occurrences."""
+
+    rules_by_class: Dict[int, list] = defaultdict(list)
+    rules = ScheduleRule.objects.filter(
+        activity_class_id__in=[c.pk for c in classes],
+        active=True, weekday__isnull=False, time__isnull=False, start_date__lte=last_day,
+    ).filter(Q(end_date__isnull=True) | Q(end_date__gte=first_day))
+    for rule in rules:
+        rules_by_class[rule.activity_class_id].append(rule)
+
+    calendars = calendars_for(classes, first_day, last_day)
+    result: Dict[int, List[Occurrence]] = {}
+    for obj in classes:
+        tz = class_zone(obj)
+        localize = localizer(tz, first_day, last_day)
+        calendar = calendars[obj.pk]
+        occurrences = []
+        for rule in rules_by_class.get(obj.pk, ()):
+            for day in rule_dates(rule, first_day, last_day):
+                if day in calendar.skip_dates:
+                    continue
+                start = localize(day, rule.time)
+                occurrences.append(Occurrence(obj.pk, obj.title, start, start + rule.duration))
+        for start, duration in zip(calendar.extra_starts, calendar.extra_durations):
+            if first_day <= start.astimezone(tz).date() <= last_day:
+                occurrences.append(Occurrence(obj.pk, obj.title, start, start + duration))
+        result[obj.pk] = occurrences
+    return result
+
+
+def find_conflicts(
+    classes: Optional[Iterable[ActivityClass]] = None,
+    start_date: Optional[dt.date] = None,
+    weeks: int = DEFAULT_WEEKS,
+) -> List[Conflict]:
+    """Return coach and location double-bookings among ``classes`` (default: all)."""
+
+    first_day = start_date or timezone.localdate()
+    last_day = first_day + dt.timedelta(weeks=weeks, days=-1)
+    qs = ActivityClass.objects.select_related("location").only(
+        "pk", "title", "coach_id", "location_id", "location__time_zone")
+    if isinstance(classes, QuerySet):
+        qs = qs.filter(pk__in=classes.values("pk"))
+    elif classes is not None:
+        qs = qs.filter(pk__in=[c.pk for c in classes])
+
+    by_coach: Dict[int, list] = defaultdict(list)
+    by_location: Dict[int, list] = defaultdict(list)
+    batch_iter = qs.order_by("pk").iterator(chunk_size=BATCH_SIZE)
+    while True:
+        batch = [obj for _, obj in zip(range(BATCH_SIZE), batch_iter)]
+        if not batch:
+            break
+        expanded = expand_for_conflicts(batch, first_day, last_day)
+        for obj in batch:
+            for occ in expanded[obj.pk]:
+                interval = (occ.start, occ.end, occ)
+                by_location[obj.location_id].append(interval)
+                if obj.coach_id:
+                    by_coach[obj.coach_id].append(interval)
+
+    conflicts: List[Conflict] = []
+    for kind, groups in (("coach", by_coach), ("location", by_location)):
+        for resource_id, intervals in groups.items():
+            for first, second in overlapping_pairs(intervals):
+                if first.class_id != second.class_id:
+                    conflicts.append(Conflict(kind, resource_id, first, second))
+    conflicts.sort(key=lambda c: (c.first.start, c.kind, c.resource_id))
+    return conflicts
+
+
+def conflicts_for_class(activity_class: ActivityClass, **kwargs) -> List[Conflict]:
+    """Conflicts involving one class, checked only against its coach's and venue's other classes."""
+
+    related = Q(location_id=activity_class.location_id)
+    if activity_class.coach_id:
+        related |= Q(coach_id=activity_class.coach_id)
+    neighbours = ActivityClass.objects.filter(related)
+    return [
+        c for c in find_conflicts(neighbours, **kwargs)
+        if activity_class.pk in (c.first.class_id, c.second.class_id)
+    ]
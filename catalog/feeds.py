@@ -0,0 +1,29 @@
+from django.contrib.syndication.views import Feed
+from django.urls import reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+
+from .models import ActivityClass
+
+
+class LatestClassesFeed(Feed):
+    """Atom feed of recently added or changed classes, for crawlers and aggregators."""
+
+    feed_type = Atom1Feed
+    title = "SportsFinder — new and updated classes"
+    link = reverse_lazy("class-list")
+    subtitle = "Classes added or changed most recently."
+    ITEMS = 50
+
+    def items(self):
+        return (ActivityClass.objects
+                .select_related("location")
+                .order_by("-updated_at", "-pk")[:self.ITEMS])
+
+    def item_title(self, item):
+        return f"{item.title} ({item.location.city})"
+
+    def item_description(self, item):
+        return item.description
+
+    def item_updateddate(self, item):
+        return item.updated_at
@@ -0,0 +1,172 @@
+"""Offline responsive renditions for class and location photos.
+
+`process_images` finds photos whose renditions are missing or stale,
+decodes and resizes them in a process pool (Pillow work is CPU-bound and
+holds the GIL), and writes every rendition through the default storage
+under a content-hashed name, so they can be served with a far-future
+``Cache-Control``. The result is recorded on the object as::
+
+    photo_renditions = {
+        "source": "classes/yoga.jpg",
+        "width": 2400, "height": 1600,
+        "formats": {"avif": [[320, "renditions/yoga-320w-1a2b3c4d5e6f.avif"], ...],
+                    "webp": [...], "jpeg": [...]},
+    }
+
+and rendered as ``<picture>``/``srcset`` by the ``responsive_image`` tag.
+AVIF and WebP are produced only when the installed Pillow can encode them;
+JPEG is always produced as the fallback.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import PurePosixPath
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .models import ActivityClass, Location
+
+
+WIDTHS = (320, 640, 960, 1280, 1920)
+RENDITION_DIR = "renditions"
+QUALITY = {"avif": 55, "webp": 75, "jpeg": 80}
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg"}
+MODELS = (ActivityClass, Location)
+
+
+def available_formats() -> Tuple[str, ...]:
+    from PIL import features
+
+    formats = []
+    if "avif" in features.codecs and features.check("avif"):
+        formats.append("avif")
+    if features.check("webp"):
+        formats.append("webp")
+    formats.append("jpeg")
+    return tuple(formats)
+
+
+def target_widths(source_width: int, widths: Iterable[int] = WIDTHS) -> List[int]:
+    """Widths to render: every configured width the source can fill, at least one."""
+
+    fitting = [w for w in widths if w <= source_width]
+    return fitting or [source_width]
+
+
+def render(data: bytes, stem: str, formats: Tuple[str, ...], widths: Tuple[int, ...] = WIDTHS):
+    """Resize one image; returns ``(width, height, [(fmt, width, name, bytes), ...])``.
+
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+        image = image.convert("RGB")
+        results = []
+        for target in target_widths(width, widths):
+            resized = image if target == width else image.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS)
+            for fmt in formats:
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=QUALITY[fmt], optimize=fmt == "jpeg")
+                payload = buffer.getvalue()
+                digest = hashlib.sha256(payload).hexdigest()[:12]
+                name = f"{RENDITION_DIR}/{stem}-{target}w-{digest}.{EXTENSIONS[fmt]}"
+                results.append((fmt, target, name, payload))
+    return width, height, results
+
+
+def _pending(model, force: bool):
+    for obj in model.objects.exclude(photo="").only("pk", "photo", "photo_renditions").iterator():
+        if force or obj.photo_renditions.get("source") != obj.photo.name:
+            yield obj
+
+
+def _read(obj) -> bytes:
+    with obj.photo.open("rb") as fh:
+        return fh.read()
+
+
+def _store(name: str, payload: bytes) -> str:
+    # Content-hashed names: an existing file already has these bytes.
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(payload))
+    return name
+
+
+def _save(model, obj, formats, rendered) -> None:
+    width, height, results = rendered
+    by_format: Dict[str, list] = {fmt: [] for fmt in formats}
+    for fmt, target, name, payload in results:
+        by_format[fmt].append([target, _store(name, payload)])
+    obj.photo_renditions = {
+        "source": obj.photo.name,
+        "width": width,
+        "height": height,
+        "formats": by_format,
+    }
+    # .update() so this does not bump updated_at or fire save signals.
+    model.objects.filter(pk=obj.pk).update(photo_renditions=obj.photo_renditions)
+
+
+def process_images(force: bool = False, workers: Optional[int] = None) -> int:
+    """Generate missing renditions for all models; returns the number of photos processed.
+
+    At most two jobs per worker are in flight, so memory follows ``workers``
+    (source bytes plus encoded renditions), not the size of the backlog.
+    """
+
+    formats = available_formats()
+    workers = workers or os.cpu_count() or 1
+    processed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for model in MODELS:
+            in_flight: Deque[Tuple[object, Future]] = deque()
+            for obj in _pending(model, force):
+                if len(in_flight) >= 2 * workers:
+                    done, future = in_flight.popleft()
+                    _save(model, done, formats, future.result())
+                    processed += 1
+                stem = PurePosixPath(obj.photo.name).stem
+                in_flight.append((obj, pool.submit(render, _read(obj), stem, formats)))
+            while in_flight:
+                done, future = in_flight.popleft()
+                _save(model, done, formats, future.result())
+                processed += 1
+    return processed
+
+
+def picture_sources(obj) -> Optional[dict]:
+    """Template data for ``obj``'s photo: renditions when current, else the original."""
+
+    photo = getattr(obj, "photo", None)
+    if not photo:
+        return None
+    renditions = obj.photo_renditions or {}
+    if renditions.get("source") != photo.name:
+        return {"fallback": photo.url, "sources": [], "srcset": ""}
+
+    def srcset(entries):
+        return ", ".join(f"{default_storage.url(name)} {width}w" for width, name in entries)
+
+    formats = renditions["formats"]
+    jpeg = formats.get("jpeg", [])
+    return {
+        "fallback": default_storage.url(jpeg[-1][1]) if jpeg else photo.url,
+        "srcset": srcset(jpeg),
+        "sources": [
+            {"type": f"image/{fmt}", "srcset": srcset(entries)}
+            for fmt, entries in formats.items() if fmt != "jpeg" and entries
+        ],
+        "width": renditions.get("width"),
+        "height": renditions.get("height"),
+    }
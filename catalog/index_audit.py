@@ -0,0 +1,142 @@
+"""Find catalog queries that the database answers with full table scans.
+
+`capture_queries` requests the main catalog pages in-process (through the
+whole middleware stack, as an anonymous visitor) and records every SELECT
+they send. `explain` asks the database for each query's plan, and
+`full_scans` picks out the steps that read a whole table: ``SCAN <table>``
+without an index on SQLite, ``Seq Scan on <table>`` on PostgreSQL. Used by
+``manage.py audit_indexes`` and ``benchmarks/index_plans.py``.
+
+Queries answered from the catalog cache never reach the database, so run
+the audit against a cold cache to see everything.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ActivityClass, Location, Tag
+
+
+class CapturedQuery(NamedTuple):
+    page: str
+    sql: str
+    params: tuple
+
+
+class FullScan(NamedTuple):
+    table: str
+    step: str
+
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def audit_pages() -> List[Tuple[str, str]]:
+    """``(label, url)`` for the catalog views, filled in from whatever data exists."""
+
+    class_list = reverse("class-list")
+    pages = [
+        ("class list", class_list),
+        ("class list, soonest", f"{class_list}?sort=soonest"),
+        ("class list, within 7 days", f"{class_list}?within=7"),
+        ("class list, evening slot", f"{class_list}?" + urlencode({
+            "date": timezone.localdate().isoformat(), "time_from": "18:00", "time_to": "20:00"})),
+    ]
+    tag = Tag.objects.order_by("pk").values_list("slug", flat=True).first()
+    if tag:
+        pages.append(("class list, tag", f"{class_list}?tag={tag}"))
+    city = Location.objects.order_by("pk").values_list("city", flat=True).first()
+    if city:
+        pages.append(("class list, city", f"{class_list}?" + urlencode({"city": city.upper()})))
+    first = ActivityClass.objects.order_by("pk").values_list("slug", "title").first()
+    if first:
+        slug, title = first
+        detail = reverse("class-detail", args=[slug])
+        pages += [
+            ("class detail", detail),
+            ("class detail, next week", f"{detail}?start={timezone.localdate() + dt.timedelta(days=7)}"),
+            ("autocomplete", f"{reverse('autocomplete')}?" + urlencode({"q": title[:3]})),
+        ]
+    return pages
+
+
+def capture_queries(pages: Iterable[Tuple[str, str]]) -> List[CapturedQuery]:
+    captured: List[CapturedQuery] = []
+    current = [""]
+
+    def record(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith("SELECT") and not many:
+            captured.append(CapturedQuery(current[0], sql, tuple(params or ())))
+        return execute(sql, params, many, context)
+
+    client = Client()
+    with override_settings(ALLOWED_HOSTS=["testserver"]), connection.execute_wrapper(record):
+        for label, url in pages:
+            current[0] = label
+            client.get(url)
+    return captured
+
+
+def explain(sql: str, params: Sequence = ()) -> List[str]:
+    """The database's plan for ``sql``, one line per step."""
+
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    if connection.vendor == "sqlite":
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def full_scans(plan: Iterable[str]) -> List[FullScan]:
+    scans = []
+    for step in plan:
+        step = step.strip()
+        if connection.vendor == "sqlite":
+            # "SCAN t USING [COVERING] INDEX i" walks an index, not the table.
+            match = _SQLITE_SCAN.match(step) if "INDEX" not in step else None
+            if match and match.group(1) == "CONSTANT":
+                match = None  # "SCAN CONSTANT ROW"
+        else:
+            match = _POSTGRES_SCAN.search(step)
+        if match:
+            scans.append(FullScan(match.group(1), step))
+    return scans
+
+
+def table_rows(table: str) -> Optional[int]:
+    """Row count (an estimate on PostgreSQL); None if ``table`` isn't a table."""
+
+    if table not in connection.introspection.table_names():
+        return None
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+        return cursor.fetchone()[0]
+
+
+def audit(pages: Optional[Iterable[Tuple[str, str]]] = None) -> Dict[str, list]:
+    """``{page: [(query, plan, full scans), ...]}`` with repeated statements folded."""
+
+    report: Dict[str, list] = {}
+    seen = set()
+    for query in capture_queries(pages if pages is not None else audit_pages()):
+        key = (query.page, query.sql)
+        if key in seen:
+            continue
+        seen.add(key)
+        plan = explain(query.sql, query.params)
+        report.setdefault(query.page, []).append((query, plan, full_scans(plan)))
+    return report
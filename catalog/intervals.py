@@ -0,0 +1,57 @@
+"""Interval structures over expanded sessions."""
+from __future__ import annotations
+
+import bisect
+import heapq
+from typing import Any, Generic, Iterable, List, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """Static index answering "which intervals overlap ``[lo, hi)``?".
+
+    Intervals are sorted by start and the longest length is remembered, so
+    any interval overlapping the window must start in
+    ``(lo - max_length, hi)``. A query bisects that slice and only checks
+    the ends inside it, which keeps it O(log n + k) for session-sized
+    intervals instead of a scan. Bounds can be anything orderable with a
+    matching difference type (datetimes, minutes, ...).
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, T]]):
+        items = sorted(intervals, key=lambda item: item[0])
+        self.starts = [start for start, _, _ in items]
+        self.ends = [end for _, end, _ in items]
+        self.payloads = [payload for _, _, payload in items]
+        self.max_length = max((end - start for start, end, _ in items), default=None)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, lo, hi) -> List[T]:
+        if not self.starts or hi <= lo:
+            return []
+        first = bisect.bisect_right(self.starts, lo - self.max_length)
+        last = bisect.bisect_left(self.starts, hi)
+        return [self.payloads[i] for i in range(first, last) if self.ends[i] > lo]
+
+
+def overlapping_pairs(intervals: Iterable[Tuple[Any, Any, T]]) -> List[Tuple[T, T]]:
+    """Return every pair of overlapping intervals using a sweep line.
+
+    Intervals are half-open, so back-to-back sessions do not conflict.
+    Runs in O(n log n + k) for n intervals and k reported pairs.
+    """
+
+    items = sorted(intervals, key=lambda item: (item[0], item[1]))
+    active: List[Tuple[Any, int]] = []  # heap of (end, position in items)
+    pairs: List[Tuple[T, T]] = []
+    for position, (start, end, payload) in enumerate(items):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, other in active:
+            pairs.append((items[other][2], payload))
+        heapq.heappush(active, (end, position))
+    return pairs
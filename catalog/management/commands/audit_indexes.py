@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.index_audit import audit, table_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the catalog pages in-process, EXPLAIN every SELECT they "
+        "issue and flag the ones that scan a whole table. Run it against a "
+        "database with production-like data (e.g. after seed_catalog)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-rows", type=int, default=1000,
+                            help="Ignore scans of tables smaller than this (planners rightly scan those).")
+        parser.add_argument("--plans", action="store_true", help="Print every query's plan, not just flagged ones.")
+        parser.add_argument("--fail", action="store_true", help="Exit with an error if anything is flagged.")
+
+    def handle(self, *args, min_rows=1000, plans=False, fail=False, **options):
+        report = audit()
+        sizes = {}
+        flagged = 0
+        for page, queries in report.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{page}: {len(queries)} distinct queries"))
+            for query, plan, scans in queries:
+                for scan in scans:
+                    if scan.table not in sizes:
+                        sizes[scan.table] = table_rows(scan.table)
+                # Subqueries and CTEs show up as scans too; only real tables count.
+                scans = [s for s in scans if sizes[s.table] is not None and sizes[s.table] >= min_rows]
+                if not scans and not plans:
+                    continue
+                sql = " ".join(query.sql.split())
+                self.stdout.write(f"  {sql[:300]}{'…' if len(sql) > 300 else ''}")
+                for step in plan:
+                    self.stdout.write(f"    {step}")
+                for scan in scans:
+                    flagged += 1
+                    rows = sizes[scan.table]
+                    self.stdout.write(self.style.WARNING(
+                        f"    full scan of {scan.table}" + (f" ({rows} rows)" if rows is not None else "")))
+
+        if flagged:
+            message = f"{flagged} full table scan(s) on tables with at least {min_rows} rows."
+            if fail:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"No full scans of tables with at least {min_rows} rows."))
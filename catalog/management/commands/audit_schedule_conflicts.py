@@ -0,0 +1,33 @@
+import datetime as dt
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.conflicts import DEFAULT_WEEKS, find_conflicts
+
+
+class Command(BaseCommand):
+    help = "List coaches and locations scheduled for two classes at the same time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start_date", help="First day to check (YYYY-MM-DD, default today).")
+        parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS, help="How many weeks ahead to check.")
+        parser.add_argument("--fail", action="store_true", help="Exit with an error when conflicts are found.")
+
+    def handle(self, *args, start_date=None, weeks=DEFAULT_WEEKS, fail=False, **options):
+        try:
+            start = dt.date.fromisoformat(start_date) if start_date else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid --from date: {start_date}") from exc
+
+        began = time.perf_counter()
+        conflicts = find_conflicts(start_date=start, weeks=weeks)
+        elapsed = time.perf_counter() - began
+
+        for conflict in conflicts:
+            self.stdout.write(str(conflict))
+        summary = f"{len(conflicts)} conflicts found in {elapsed:.2f}s."
+        if conflicts and fail:
+            raise CommandError(summary)
+        style = self.style.WARNING if conflicts else self.style.SUCCESS
+        self.stdout.write(style(summary))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from catalog.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the occupancy and revenue rollups from existing bookings. "
+        "Needed once after deploying them, or to repair drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Classes aggregated per query (default 200).",
+        )
+
+    def handle(self, *args, chunk_size=200, **options):
+        classes, occurrences = rebuild_rollups(chunk_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rollups for {classes} classes ({occurrences} booked sessions)."))
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.snapshot import build_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the memory-mapped schedule snapshot read by worker processes. "
+        "Workers pick up the new file within a few seconds; run this after "
+        "schedule imports or periodically from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="Write to this file instead of SCHEDULE_SNAPSHOT_PATH.")
+
+    def handle(self, *args, path=None, **options):
+        target = Path(path) if path else snapshot_path()
+        if target is None:
+            raise CommandError("SCHEDULE_SNAPSHOT_PATH is not configured; pass --path.")
+        snapshot = build_snapshot(target)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(snapshot)} rules to {target} (generation {snapshot.generation})."
+        ))
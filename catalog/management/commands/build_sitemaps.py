@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from catalog.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the sitemap index and per-chunk class sitemaps under "
+        "SITEMAP_ROOT, rewriting only chunks whose classes changed. Run it "
+        "from cron (e.g. hourly)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rewrite every chunk.")
+
+    def handle(self, *args, force=False, **options):
+        written, unchanged = build_sitemaps(force=force)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} sitemap chunk(s); {unchanged} unchanged."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from catalog.images import available_formats, process_images
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate resized AVIF/WebP/JPEG renditions for class and location "
+        "photos whose renditions are missing or stale. Run it after uploads "
+        "(e.g. from cron every few minutes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Re-render every photo.")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Worker processes (default: CPU count).")
+
+    def handle(self, *args, force=False, workers=None, **options):
+        processed = process_images(force=force, workers=workers)
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} photo(s) as {', '.join(available_formats())}."))
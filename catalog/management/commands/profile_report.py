@@ -0,0 +1,68 @@
+import io
+import pstats
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from sportsfinder.profiling import make_token, profile_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate request profiles stored by ProfilingMiddleware and print "
+        "the top functions per view (class list and detail by default)."
+    )
+
+    DEFAULT_VIEWS = ("class-list", "class-detail")
+
+    def add_arguments(self, parser):
+        parser.add_argument("views", nargs="*", help="URL names to report (default: class-list class-detail).")
+        parser.add_argument("--all", action="store_true", help="Report every view with stored profiles.")
+        parser.add_argument("--limit", type=int, default=20, help="Functions shown per view.")
+        parser.add_argument("--sort", choices=("cumulative", "tottime"), default="cumulative")
+        parser.add_argument("--token", action="store_true",
+                            help="Print a signed X-Profile header value and exit.")
+
+    def handle(self, *args, views=None, all=False, limit=20, sort="cumulative", token=False, **options):
+        if token:
+            self.stdout.write(make_token())
+            return
+
+        root = profile_dir()
+        if all:
+            views = sorted(p.name for p in root.iterdir() if p.is_dir()) if root.exists() else []
+        views = views or self.DEFAULT_VIEWS
+        for view in views:
+            directory = root / view.replace(":", ".")
+            prof = sorted(directory.glob("*.prof")) if directory.exists() else []
+            folded = sorted(directory.glob("*.folded")) if directory.exists() else []
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{view}: {len(prof)} cProfile, {len(folded)} sampled profile(s)"))
+            if prof:
+                self._report_cprofile(prof, sort, limit)
+            if folded:
+                self._report_folded(folded, limit)
+
+    def _report_cprofile(self, paths, sort, limit):
+        out = io.StringIO()
+        stats = pstats.Stats(str(paths[0]), stream=out)
+        for path in paths[1:]:
+            stats.add(str(path))
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        self.stdout.write(out.getvalue())
+
+    def _report_folded(self, paths, limit):
+        own, total = Counter(), Counter()
+        samples = 0
+        for path in paths:
+            for line in path.read_text().splitlines():
+                stack, _, count = line.rpartition(" ")
+                count = int(count)
+                frames = stack.split(";")
+                samples += count
+                own[frames[-1]] += count
+                for frame in set(frames):
+                    total[frame] += count
+        self.stdout.write(f"{samples} samples; top by inclusive time:")
+        for frame, count in total.most_common(limit):
+            self.stdout.write(f"  {100 * count / samples:5.1f}%  {100 * own[frame] / samples:5.1f}% self  {frame}")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from catalog.similarity import TOP_K, rebuild_similar_classes
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the \"you may also like\" neighbours shown on class pages "
+        "from tags, coach, city and co-bookings. Run it nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=TOP_K, help=f"Neighbours per class (default {TOP_K}).")
+
+    def handle(self, *args, top_k=TOP_K, **options):
+        count = rebuild_similar_classes(top_k)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} similar-class rows."))
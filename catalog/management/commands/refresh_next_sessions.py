@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from catalog.utils import refresh_next_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized next-session columns on ActivityClass. "
+        "Run it periodically (e.g. every 5 minutes from cron) so sessions "
+        "that have started drop off the class list."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--class-id",
+            action="append",
+            type=int,
+            dest="class_ids",
+            help="Only refresh the given class (repeatable).",
+        )
+
+    def handle(self, *args, class_ids=None, **options):
+        count = refresh_next_sessions(class_ids)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed next sessions for {count} classes."))
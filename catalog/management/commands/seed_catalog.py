@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.services import bulk_import_users
+from catalog.models import ActivityClass
+from catalog.seeding import seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert a deterministic synthetic catalog (classes 'seed-<seed>-class-<n>' "
+        "with locations, coaches, tags and weekly rules) and, optionally, "
+        "users 'loadtest-<n>' sharing one password, e.g. for "
+        "benchmarks/loadtest.py. Meant for development and staging databases."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--classes", type=int, default=1000)
+        parser.add_argument("--locations", type=int, default=50)
+        parser.add_argument("--coaches", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Same seed, same data; each seed can be inserted once, use another one to add more.")
+        parser.add_argument("--users", type=int, default=0, help="Load-test users to create.")
+        parser.add_argument("--password", default="loadtest-pass", help="Password of the load-test users.")
+
+    def handle(self, *args, classes, locations, coaches, seed, users, password, **options):
+        if classes < 0 or locations < 1 or coaches < 0 or users < 0:
+            raise CommandError("Counts must be positive (and at least one location).")
+        if ActivityClass.objects.filter(slug__startswith=f"seed-{seed}-class-").exists():
+            raise CommandError(f"Seed {seed} is already in this database; pass another --seed to add more.")
+        result = seed_catalog(classes=classes, locations=locations, coaches=coaches, seed=seed)
+        self.stdout.write(
+            f"Created {result.classes} classes, {result.rules} schedule rules, "
+            f"{result.locations} locations and {result.coaches} coaches.")
+        if users:
+            # Synthetic accounts sharing one password: hashing it once is fine here.
+            created = bulk_import_users(
+                ({"username": f"loadtest-{i}", "email": f"loadtest-{i}@example.com", "password": password}
+                 for i in range(users)),
+                reuse_hashes=True)
+            self.stdout.write(f"Processed {created} load-test users (existing ones are kept).")
+        self.stdout.write(self.style.SUCCESS("Done."))
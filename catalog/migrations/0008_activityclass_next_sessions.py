@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_booking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activityclass',
+            name='next_session_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='activityclass',
+            name='next_session_times',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='activityclass',
+            index=models.Index(fields=['next_session_at', 'title'], name='class_next_session_idx'),
+        ),
+    ]
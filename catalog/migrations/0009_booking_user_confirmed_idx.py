@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_activityclass_next_sessions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status', 'confirmed')), fields=['user', 'start', 'id'], name='booking_user_confirmed_idx'),
+        ),
+    ]
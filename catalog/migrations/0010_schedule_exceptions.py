@@ -0,0 +1,42 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_booking_user_confirmed_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OneOffSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('activity_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='one_off_sessions', to='catalog.activityclass')),
+            ],
+            options={
+                'ordering': ['start'],
+                'indexes': [models.Index(fields=['activity_class', 'start'], name='catalog_one_activit_f578b1_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('activity_class', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule_exceptions', to='catalog.activityclass')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule_exceptions', to='catalog.location')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['activity_class', 'date'], name='catalog_sch_activit_64e41a_idx'), models.Index(fields=['location', 'date'], name='catalog_sch_locatio_43ac99_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('activity_class__isnull', False), ('location__isnull', True)), models.Q(('activity_class__isnull', True), ('location__isnull', False)), _connector='OR'), name='schedule_exception_class_xor_location')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:26
+
+import catalog.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_schedule_exceptions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='time_zone',
+            field=models.CharField(default=catalog.models.default_time_zone, max_length=64, validators=[catalog.models.validate_time_zone]),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0011_location_time_zone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oneoffsession',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=60),
+        ),
+        migrations.AddField(
+            model_name='schedulerule',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=60),
+        ),
+    ]
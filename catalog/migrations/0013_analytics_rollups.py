@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0012_session_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activityclass',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Spots per session; used for fill rates.', null=True),
+        ),
+        migrations.CreateModel(
+            name='ClassWeekRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('bookings', models.IntegerField(default=0)),
+                ('sessions', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('activity_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.activityclass')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['week'], name='catalog_cla_week_d166da_idx')],
+                'constraints': [models.UniqueConstraint(fields=('activity_class', 'week'), name='rollup_class_week_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('bookings', models.IntegerField(default=0)),
+                ('sessions', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('activity_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.activityclass')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='catalog_dai_day_5093ed_idx')],
+                'constraints': [models.UniqueConstraint(fields=('activity_class', 'day'), name='rollup_daily_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OccurrenceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('bookings', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('activity_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.activityclass')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('activity_class', 'start'), name='rollup_occurrence_unique')],
+            },
+        ),
+    ]
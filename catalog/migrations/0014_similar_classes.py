@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0013_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarClass',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('activity_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_entries', to='catalog.activityclass')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.activityclass')),
+            ],
+            options={
+                'ordering': ('activity_class', 'rank'),
+                'constraints': [models.UniqueConstraint(fields=('activity_class', 'rank'), name='similar_class_rank_unique')],
+            },
+        ),
+    ]
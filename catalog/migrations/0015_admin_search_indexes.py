@@ -0,0 +1,43 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:37
+
+from django.conf import settings
+from django.db import migrations
+
+# Trigram indexes for the admin's icontains search, which PostgreSQL
+# compiles to UPPER(col::text) LIKE UPPER('%term%'). A b-tree cannot serve a
+# leading wildcard, so these are GIN indexes over the same expression.
+SEARCH_INDEXES = (
+    ("booking_search_username_trgm", settings.AUTH_USER_MODEL, "username"),
+    ("booking_search_email_trgm", settings.AUTH_USER_MODEL, "email"),
+    ("class_search_title_trgm", "catalog.ActivityClass", "title"),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, model, column in SEARCH_INDEXES:
+        table = apps.get_model(model)._meta.db_table
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0014_similar_classes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
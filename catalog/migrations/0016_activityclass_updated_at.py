@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0015_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activityclass',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0016_activityclass_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activityclass',
+            name='photo',
+            field=models.ImageField(blank=True, upload_to='classes/'),
+        ),
+        migrations.AddField(
+            model_name='activityclass',
+            name='photo_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='photo',
+            field=models.ImageField(blank=True, upload_to='locations/'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='photo_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
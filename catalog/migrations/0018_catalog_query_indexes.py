@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:55
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# On PostgreSQL rule_active_weekday_idx is rebuilt as a covering index: the
+# per-day interval index reads every other column it needs from the index
+# itself (an index-only scan). SQLite has no INCLUDE, so it keeps the plain
+# one. Same name either way, so the model state and later migrations match.
+WEEKDAY_INDEX = "rule_active_weekday_idx"
+
+
+def cover_weekday_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("catalog", "ScheduleRule")._meta.db_table
+    schema_editor.execute(f"DROP INDEX IF EXISTS {WEEKDAY_INDEX}")
+    schema_editor.execute(
+        f'CREATE INDEX {WEEKDAY_INDEX} ON "{table}" ("weekday", "time") '
+        f'INCLUDE ("activity_class_id", "start_date", "end_date", "duration_minutes", "interval") '
+        f'WHERE "active"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0017_photos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activityclass',
+            index=models.Index(fields=['title'], name='class_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(django.db.models.functions.text.Lower('city'), name='location_city_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulerule',
+            index=models.Index(condition=models.Q(('active', True)), fields=['activity_class', 'weekday', 'time'], name='rule_active_class_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedulerule',
+            index=models.Index(condition=models.Q(('active', True)), fields=['weekday', 'time'], name='rule_active_weekday_idx'),
+        ),
+        # Reversing the AddIndex above drops the covering version too.
+        migrations.RunPython(cover_weekday_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:09
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0018_catalog_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='oneoffsession',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=60, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AlterField(
+            model_name='schedulerule',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=60, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
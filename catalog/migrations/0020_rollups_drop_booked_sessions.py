@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0019_session_duration_min'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='classweekrollup',
+            name='sessions',
+        ),
+        migrations.RemoveField(
+            model_name='dailyrollup',
+            name='sessions',
+        ),
+    ]
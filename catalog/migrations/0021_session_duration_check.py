@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0020_rollups_drop_booked_sessions'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='oneoffsession',
+            constraint=models.CheckConstraint(condition=models.Q(('duration_minutes__gte', 1)), name='one_off_duration_positive'),
+        ),
+        migrations.AddConstraint(
+            model_name='schedulerule',
+            constraint=models.CheckConstraint(condition=models.Q(('duration_minutes__gte', 1)), name='rule_duration_positive'),
+        ),
+    ]
@@ -1,11 +1,31 @@
+import functools
+import zoneinfo
+
 from django.conf import settings
 from django.db import models
 from django.db.models import F
+from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
-from datetime import date, timedelta
+from django.core.validators import MinValueValidator
+from datetime import date, datetime, timedelta
+from django.utils import timezone
 from django.utils.text import slugify
 from django.urls import reverse
 
+@functools.lru_cache(maxsize=1)
+def _known_time_zones():
+    return frozenset(zoneinfo.available_timezones())
+
+
+def validate_time_zone(value):
+    if value not in _known_time_zones():
+        raise ValidationError(f"{value!r} is not a known IANA time zone.")
+
+
+def default_time_zone():
+    return settings.TIME_ZONE
+
+
 class Location(models.Model):
     # Optional nickname; can help if an address is long
     # name = models.CharField(max_length=120, blank=True)
@@ -14,10 +34,21 @@ class Location(models.Model):
     city = models.CharField(max_length=80)
     postal_code = models.CharField(max_length=20, blank=True)
     country = models.CharField(max_length=60, default="")
+    # IANA name, e.g. "Europe/Vilnius"; sessions are expanded in this zone.
+    time_zone = models.CharField(max_length=64, default=default_time_zone, validators=[validate_time_zone])
+    photo = models.ImageField(upload_to="locations/", blank=True)
+    photo_renditions = models.JSONField(default=dict, blank=True, editable=False)
 
 
     slug = models.SlugField(max_length=160, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # The class list filters on city case-insensitively, as
+            # city__lower=Lower(value) (see the lookup registered below).
+            models.Index(Lower("city"), name="location_city_lower_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
             # Prefer a compact slug based on address/city
@@ -29,6 +60,9 @@ class Location(models.Model):
     def __str__(self):
         name = getattr(self, "name", "")
         return name or f"{self.address1}, {self.city}"
+
+
+Location._meta.get_field("city").register_lookup(Lower)
     
 class Coach(models.Model):
     # Either link to a real user, or just type a name
@@ -72,8 +106,29 @@ class ActivityClass(models.Model):
     location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name="classes")
     coach = models.ForeignKey(Coach, on_delete=models.SET_NULL, null=True, blank=True, related_name="classes")
     price = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    capacity = models.PositiveIntegerField(null=True, blank=True, help_text="Spots per session; used for fill rates.")
     tags = models.ManyToManyField(Tag, blank=True)
     slug = models.SlugField(max_length=160, unique=True, blank=True)
+    photo = models.ImageField(upload_to="classes/", blank=True)
+    # Written by catalog.images.process_images; see responsive_image.
+    photo_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Sitemap lastmod; bulk updates of the denormalized columns below leave it alone.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Denormalized by catalog.utils.refresh_next_sessions so the list can
+    # sort and filter by upcoming time without expanding every schedule.
+    next_session_at = models.DateTimeField(null=True, blank=True, editable=False)
+    next_session_times = models.JSONField(default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("next_session_at", "title"), name="class_next_session_idx"),
+            models.Index(fields=("title",), name="class_title_idx"),
+        ]
+
+    @property
+    def upcoming_times(self):
+        return [datetime.fromisoformat(value) for value in self.next_session_times]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -103,14 +158,33 @@ class ScheduleRule(models.Model):
     start_date = models.DateField(default=date.today)
     end_date = models.DateField(null=True, blank=True)  # optional open-ended
     interval = models.PositiveIntegerField(default=1)   # every N weeks
+    duration_minutes = models.PositiveIntegerField(default=60, validators=[MinValueValidator(1)])
     active = models.BooleanField(default=True)
 
     class Meta:
         ordering = ["activity_class", "weekday", "time"]
+        indexes = [
+            # Only active rules are ever expanded. Per-class reads (rule
+            # cache, prefetches, conflict audit) come back in Meta.ordering
+            # straight from this index; the per-day interval index scans by
+            # weekday. On PostgreSQL the latter is a covering index, see
+            # migration 0018.
+            models.Index(fields=("activity_class", "weekday", "time"), condition=models.Q(active=True),
+                         name="rule_active_class_idx"),
+            models.Index(fields=("weekday", "time"), condition=models.Q(active=True),
+                         name="rule_active_weekday_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(duration_minutes__gte=1), name="rule_duration_positive"),
+        ]
 
     def __str__(self):
         return f"{self.get_weekday_display()} {self.time} · {self.activity_class}"
 
+    @property
+    def duration(self):
+        return timedelta(minutes=self.duration_minutes)
+
     # Convenience to produce upcoming dates (for list/detail)
     def next_occurrences(self, count=8, from_date=None):
         """Generate the next N dates this rule applies to (without times)."""
@@ -129,6 +203,72 @@ class ScheduleRule(models.Model):
         return generated
 
 
+class ScheduleException(models.Model):
+    """A date on which weekly sessions do not run.
+
+    Set ``activity_class`` to cancel one class (e.g. coach is away), or
+    ``location`` to close a venue for every class it hosts (e.g. holidays).
+    """
+
+    activity_class = models.ForeignKey(
+        ActivityClass, on_delete=models.CASCADE, null=True, blank=True, related_name="schedule_exceptions",
+    )
+    location = models.ForeignKey(
+        Location, on_delete=models.CASCADE, null=True, blank=True, related_name="schedule_exceptions",
+    )
+    date = models.DateField()
+    reason = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        ordering = ["date"]
+        indexes = [
+            models.Index(fields=("activity_class", "date")),
+            models.Index(fields=("location", "date")),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(activity_class__isnull=False, location__isnull=True)
+                    | models.Q(activity_class__isnull=True, location__isnull=False)
+                ),
+                name="schedule_exception_class_xor_location",
+            ),
+        ]
+
+    def clean(self):
+        super().clean()
+        if bool(self.activity_class_id) == bool(self.location_id):
+            raise ValidationError("Set either a class or a location, not both.")
+
+    def __str__(self):
+        return f"{self.date:%Y-%m-%d} · {self.activity_class or self.location}"
+
+
+class OneOffSession(models.Model):
+    """An extra session outside the weekly rules."""
+
+    activity_class = models.ForeignKey(ActivityClass, on_delete=models.CASCADE, related_name="one_off_sessions")
+    start = models.DateTimeField()
+    duration_minutes = models.PositiveIntegerField(default=60, validators=[MinValueValidator(1)])
+    note = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        ordering = ["start"]
+        indexes = [
+            models.Index(fields=("activity_class", "start")),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(duration_minutes__gte=1), name="one_off_duration_positive"),
+        ]
+
+    @property
+    def duration(self):
+        return timedelta(minutes=self.duration_minutes)
+
+    def __str__(self):
+        return f"{self.activity_class} @ {self.start:%Y-%m-%d %H:%M}"
+
+
 class Booking(models.Model):
     STATUS_CONFIRMED = "confirmed"
     STATUS_CANCELLED = "cancelled"
@@ -161,6 +301,13 @@ class Booking(models.Model):
         indexes = [
             models.Index(fields=("activity_class", "start")),
             models.Index(fields=("user", "start")),
+            # Narrower copy of (user, start) for the "upcoming" dashboard tab:
+            # only confirmed rows, with id as the keyset tie-breaker.
+            models.Index(
+                fields=("user", "start", "id"),
+                condition=models.Q(status="confirmed"),
+                name="booking_user_confirmed_idx",
+            ),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -178,5 +325,79 @@ class Booking(models.Model):
         if self.start and self.end and self.start >= self.end:
             raise ValidationError({"end": "End time must be after start."})
 
+    @property
+    def is_cancellable(self):
+        return self.status == self.STATUS_CONFIRMED and self.start > timezone.now()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the rollup signal tell a cancellation from an ordinary save.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def cancel(self):
+        self.status = self.STATUS_CANCELLED
+        self.save(update_fields=["status"])
+
     def __str__(self):
         return f"{self.user} → {self.activity_class} @ {self.start:%Y-%m-%d %H:%M}"
+
+
+class OccurrenceRollup(models.Model):
+    """Confirmed bookings and revenue for one session, kept by catalog.rollups."""
+
+    activity_class = models.ForeignKey(ActivityClass, on_delete=models.CASCADE, related_name="+")
+    start = models.DateTimeField()
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("activity_class", "start"), name="rollup_occurrence_unique"),
+        ]
+
+
+class DailyRollup(models.Model):
+    """Confirmed bookings and revenue per class and venue-local day."""
+
+    activity_class = models.ForeignKey(ActivityClass, on_delete=models.CASCADE, related_name="+")
+    day = models.DateField()
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("activity_class", "day"), name="rollup_daily_unique"),
+        ]
+        indexes = [models.Index(fields=("day",))]
+
+
+class ClassWeekRollup(models.Model):
+    """Per class and ISO week (``week`` is the Monday); feeds the analytics dashboard."""
+
+    activity_class = models.ForeignKey(ActivityClass, on_delete=models.CASCADE, related_name="+")
+    week = models.DateField()
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("activity_class", "week"), name="rollup_class_week_unique"),
+        ]
+        indexes = [models.Index(fields=("week",))]
+
+
+class SimilarClass(models.Model):
+    """Top-K "you may also like" neighbours, rebuilt by catalog.similarity."""
+
+    activity_class = models.ForeignKey(ActivityClass, on_delete=models.CASCADE, related_name="similar_entries")
+    similar = models.ForeignKey(ActivityClass, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ("activity_class", "rank")
+        constraints = [
+            models.UniqueConstraint(fields=("activity_class", "rank"), name="similar_class_rank_unique"),
+        ]
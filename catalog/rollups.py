@@ -0,0 +1,143 @@
+"""Incrementally maintained occupancy and revenue rollups.
+
+Every confirmed booking adds one to its occurrence, venue-local day and ISO
+week rows (and its class price to their revenue); a cancellation or delete
+subtracts it again. Scheduled sessions, the other half of a fill rate, come
+from the schedule itself (`utils.scheduled_sessions`), not from bookings.
+
+`apply_booking_deltas` handles any number of sessions of one class with one
+upsert per rollup table, so the series booking path stays cheap.
+`rebuild_rollups` recomputes everything from `Booking` in chunks of classes.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import ActivityClass, Booking, ClassWeekRollup, DailyRollup, OccurrenceRollup
+from .zones import class_zone, zone_for
+
+
+def _week_of(day: dt.date) -> dt.date:
+    return day - dt.timedelta(days=day.weekday())
+
+
+def _add_counts(model, activity_class_id: int, field: str, bookings: Dict, price) -> None:
+    """Add ``bookings[key]`` (and its revenue) to the class's rows, creating missing ones.
+
+    One ``INSERT ... ON CONFLICT DO UPDATE`` that increments in place, so
+    concurrent bookings need neither row locks nor a read; PostgreSQL and
+    SQLite share the syntax.
+    """
+
+    meta = model._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    key_field = meta.get_field(field)
+    revenue_field = meta.get_field("revenue")
+    columns = [qn(meta.get_field("activity_class").column), qn(key_field.column), qn("bookings"), qn("revenue")]
+    params = []
+    for key, count in bookings.items():
+        params += [activity_class_id, key_field.get_db_prep_save(key, connection), count,
+                   revenue_field.get_db_prep_save(price * count, connection)]
+    placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(bookings))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders} "
+            f"ON CONFLICT ({columns[0]}, {columns[1]}) DO UPDATE SET "
+            f"{columns[2]} = {table}.{columns[2]} + EXCLUDED.{columns[2]}, "
+            f"{columns[3]} = {table}.{columns[3]} + EXCLUDED.{columns[3]}",
+            params,
+        )
+
+
+def apply_booking_deltas(
+    activity_class_id: int,
+    deltas: Dict[dt.datetime, int],
+    activity_class: Optional[ActivityClass] = None,
+) -> None:
+    """Add ``deltas[start]`` confirmed bookings to each occurrence of a class.
+
+    Pass ``activity_class`` (with ``location`` selected) when the caller
+    already has it, to skip looking up its price and time zone.
+    """
+
+    deltas = {start: delta for start, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    if activity_class is not None:
+        price, tz = activity_class.price, class_zone(activity_class)
+    else:
+        price, zone_name = (ActivityClass.objects
+                            .filter(pk=activity_class_id)
+                            .values_list("price", "location__time_zone")
+                            .get())
+        tz = zone_for(zone_name)
+
+    day_deltas: Dict[dt.date, int] = defaultdict(int)
+    for start, delta in deltas.items():
+        day_deltas[start.astimezone(tz).date()] += delta
+    week_deltas: Dict[dt.date, int] = defaultdict(int)
+    for day, delta in day_deltas.items():
+        week_deltas[_week_of(day)] += delta
+
+    with transaction.atomic():
+        _add_counts(OccurrenceRollup, activity_class_id, "start", deltas, price)
+        _add_counts(DailyRollup, activity_class_id, "day", day_deltas, price)
+        _add_counts(ClassWeekRollup, activity_class_id, "week", week_deltas, price)
+
+
+def rebuild_rollups(chunk_size: int = 200) -> Tuple[int, int]:
+    """Recompute all rollups from `Booking`; returns ``(classes, occurrences)``.
+
+    Classes are processed ``chunk_size`` at a time: one aggregate query per
+    chunk, day and week rows derived in Python, then bulk inserts.
+    """
+
+    with transaction.atomic():
+        for model in (OccurrenceRollup, DailyRollup, ClassWeekRollup):
+            model.objects.all().delete()
+
+        classes = occurrences_total = 0
+        class_rows = (ActivityClass.objects
+                      .order_by("pk")
+                      .values_list("pk", "price", "location__time_zone"))
+        last_pk = 0
+        while True:
+            chunk = list(class_rows.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            classes += len(chunk)
+            info = {pk: (price, zone_for(zone_name)) for pk, price, zone_name in chunk}
+
+            counts = (Booking.objects
+                      .filter(activity_class_id__in=info, status=Booking.STATUS_CONFIRMED)
+                      .values_list("activity_class_id", "start")
+                      .annotate(n=Count("id"))
+                      .order_by())
+            occurrence_rows, days, weeks = [], defaultdict(int), defaultdict(int)
+            for class_id, start, n in counts:
+                price, tz = info[class_id]
+                occurrence_rows.append(OccurrenceRollup(activity_class_id=class_id, start=start,
+                                                        bookings=n, revenue=price * n))
+                day = start.astimezone(tz).date()
+                days[class_id, day] += n
+                weeks[class_id, _week_of(day)] += n
+
+            OccurrenceRollup.objects.bulk_create(occurrence_rows, batch_size=1000)
+            DailyRollup.objects.bulk_create([
+                DailyRollup(activity_class_id=class_id, day=day, bookings=b, revenue=info[class_id][0] * b)
+                for (class_id, day), b in days.items()
+            ], batch_size=1000)
+            ClassWeekRollup.objects.bulk_create([
+                ClassWeekRollup(activity_class_id=class_id, week=week, bookings=b, revenue=info[class_id][0] * b)
+                for (class_id, week), b in weeks.items()
+            ], batch_size=1000)
+            occurrences_total += len(occurrence_rows)
+
+    return classes, occurrences_total
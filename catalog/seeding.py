@@ -0,0 +1,114 @@
+"""Deterministic synthetic catalog data, inserted with ``bulk_create``.
+
+Used by the test suite's session-wide seeded database (see ``conftest.py``)
+and by anything that needs a realistic catalog quickly. A class costs no
+per-row queries: every model is written in a handful of batched INSERTs,
+and model ``save()``/signals are skipped, so the denormalized next-session
+columns are filled in with one `refresh_next_sessions` pass at the end.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import random
+from typing import NamedTuple, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import ActivityClass, Coach, Location, ScheduleRule, Tag
+from .utils import refresh_next_sessions
+
+
+CITIES = (
+    ("Vilnius", "Europe/Vilnius"),
+    ("Kaunas", "Europe/Vilnius"),
+    ("Riga", "Europe/Riga"),
+    ("Tallinn", "Europe/Tallinn"),
+    ("Warsaw", "Europe/Warsaw"),
+    ("Berlin", "Europe/Berlin"),
+    ("London", "Europe/London"),
+    ("New York", "America/New_York"),
+)
+ACTIVITIES = (
+    "Yoga", "Pilates", "Boxing", "HIIT", "Spinning", "CrossFit", "Zumba", "Climbing",
+    "Swimming", "Running", "Rowing", "Kettlebells", "Tai Chi", "Barre", "Dance", "Judo",
+)
+LEVELS = ("Beginner", "Open", "Intermediate", "Advanced")
+BATCH_SIZE = 1000
+
+
+class SeedResult(NamedTuple):
+    locations: int
+    tags: int
+    coaches: int
+    classes: int
+    rules: int
+
+
+@transaction.atomic
+def seed_catalog(classes: int = 200, locations: int = 16, coaches: int = 24, seed: int = 0,
+                 start: Optional[dt.date] = None) -> SeedResult:
+    """Insert ``classes`` classes with tags, coaches and weekly rules.
+
+    The same ``seed`` always yields the same rows (primary keys aside), so
+    tests and benchmarks can rely on titles, slugs and counts.
+    """
+
+    rng = random.Random(seed)
+    start = start or timezone.localdate()
+
+    location_objs = Location.objects.bulk_create([
+        Location(
+            address1=f"{rng.randint(1, 200)} Main St",
+            city=CITIES[i % len(CITIES)][0],
+            time_zone=CITIES[i % len(CITIES)][1],
+            slug=f"seed-{seed}-location-{i}",
+        )
+        for i in range(locations)
+    ], batch_size=BATCH_SIZE)
+    # Tags are shared vocabulary: reuse the ones an earlier run created.
+    names = ACTIVITIES + LEVELS
+    Tag.objects.bulk_create([Tag(name=name, slug=slugify(name)) for name in names], ignore_conflicts=True)
+    by_name = Tag.objects.in_bulk(names, field_name="name")
+    tag_objs = [by_name[name] for name in names]
+    coach_objs = Coach.objects.bulk_create([
+        Coach(name=f"Coach {i}") for i in range(coaches)
+    ], batch_size=BATCH_SIZE)
+
+    class_objs = ActivityClass.objects.bulk_create([
+        ActivityClass(
+            title=f"{LEVELS[i % len(LEVELS)]} {ACTIVITIES[i % len(ACTIVITIES)]} {i}",
+            description=f"A {ACTIVITIES[i % len(ACTIVITIES)].lower()} class for every body.",
+            slug=f"seed-{seed}-class-{i}",
+            location=rng.choice(location_objs),
+            coach=rng.choice(coach_objs) if coach_objs else None,
+            price=rng.choice((0, 8, 10, 12, 15, 20)),
+            capacity=rng.choice((None, 8, 12, 20, 30)),
+        )
+        for i in range(classes)
+    ], batch_size=BATCH_SIZE)
+
+    through = ActivityClass.tags.through
+    activity_tags, level_tags = tag_objs[:len(ACTIVITIES)], tag_objs[len(ACTIVITIES):]
+    through.objects.bulk_create([
+        through(activityclass_id=obj.pk, tag_id=tag.pk)
+        for i, obj in enumerate(class_objs)
+        for tag in (activity_tags[i % len(ACTIVITIES)], level_tags[i % len(LEVELS)])
+    ], batch_size=BATCH_SIZE)
+
+    rules = ScheduleRule.objects.bulk_create([
+        ScheduleRule(
+            activity_class=obj,
+            weekday=weekday,
+            time=dt.time(rng.randint(6, 21), rng.choice((0, 15, 30, 45))),
+            start_date=start - dt.timedelta(days=7),
+            duration_minutes=rng.choice((45, 60, 75, 90)),
+        )
+        for obj in class_objs
+        for weekday in rng.sample(range(7), rng.randint(1, 3))
+    ], batch_size=BATCH_SIZE)
+
+    for i in range(0, len(class_objs), BATCH_SIZE):
+        refresh_next_sessions([obj.pk for obj in class_objs[i:i + BATCH_SIZE]])
+    return SeedResult(len(location_objs), len(tag_objs), len(coach_objs), len(class_objs), len(rules))
@@ -0,0 +1,120 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import cache as catalog_cache
+from .models import ActivityClass, Booking, Coach, Location, OneOffSession, ScheduleException, ScheduleRule, Tag
+from .rollups import apply_booking_deltas
+from .utils import refresh_next_sessions
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tags(sender, **kwargs):
+    catalog_cache.invalidate("tags")
+
+
+@receiver([post_save, post_delete], sender=Location)
+def invalidate_cities(sender, **kwargs):
+    catalog_cache.invalidate("cities")
+
+
+@receiver([post_save, post_delete], sender=ActivityClass)
+@receiver(m2m_changed, sender=ActivityClass.tags.through)
+def invalidate_classes(sender, **kwargs):
+    catalog_cache.invalidate("classes")
+
+
+@receiver([post_save, post_delete], sender=ActivityClass)
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=Location)
+@receiver([post_save, post_delete], sender=Coach)
+def invalidate_autocomplete(sender, **kwargs):
+    catalog_cache.invalidate("autocomplete")
+
+
+@receiver([post_save, post_delete], sender=ScheduleRule)
+@receiver([post_save, post_delete], sender=ScheduleException)
+@receiver([post_save, post_delete], sender=OneOffSession)
+def invalidate_schedule(sender, **kwargs):
+    catalog_cache.invalidate("schedule")
+
+
+@receiver([post_save, post_delete], sender=ScheduleRule)
+@receiver([post_save, post_delete], sender=OneOffSession)
+def refresh_class_next_sessions(sender, instance, **kwargs):
+    refresh_next_sessions([instance.activity_class_id])
+
+
+@receiver([post_save, post_delete], sender=ScheduleException)
+def refresh_exception_next_sessions(sender, instance, **kwargs):
+    if instance.activity_class_id:
+        refresh_next_sessions([instance.activity_class_id])
+    else:
+        refresh_next_sessions(ActivityClass.objects
+                              .filter(location_id=instance.location_id)
+                              .values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Booking)
+def rollup_booking_saved(sender, instance, created, **kwargs):
+    loaded = getattr(instance, "_loaded_values", None)
+    was_confirmed = (not created and loaded is not None
+                     and loaded.get("status") == Booking.STATUS_CONFIRMED)
+    is_confirmed = instance.status == Booking.STATUS_CONFIRMED
+    if was_confirmed != is_confirmed:
+        apply_booking_deltas(instance.activity_class_id, {instance.start: 1 if is_confirmed else -1})
+    instance._loaded_values = {"status": instance.status}
+
+
+@receiver(pre_delete, sender=ActivityClass)
+def note_class_deleted(sender, instance, origin=None, **kwargs):
+    # Every pre_delete is sent before the collector deletes anything, so the
+    # booking receiver below can tell which classes go in the same delete.
+    if origin is not None:
+        vars(origin).setdefault("_deleted_class_ids", set()).add(instance.pk)
+
+
+@receiver(post_delete, sender=Booking)
+def rollup_booking_deleted(sender, instance, origin=None, **kwargs):
+    if instance.activity_class_id in getattr(origin, "_deleted_class_ids", ()):
+        # The class's rollup rows are already gone; new deltas would point at a deleted class.
+        return
+    if instance.user_id in getattr(origin, "_user_booking_deltas", ()):
+        return  # subtracted per class by rollup_user_deleted
+    loaded = getattr(instance, "_loaded_values", None) or {"status": instance.status}
+    if loaded.get("status") == Booking.STATUS_CONFIRMED:
+        apply_booking_deltas(instance.activity_class_id, {instance.start: -1})
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def collect_user_booking_deltas(sender, instance, origin=None, **kwargs):
+    """Group a deleted user's confirmed bookings by class before they cascade.
+
+    One aggregate query here and one `apply_booking_deltas` per class in
+    `rollup_user_deleted`, instead of a price lookup and three upserts for
+    every booking in `rollup_booking_deleted`.
+    """
+
+    if origin is None:
+        return
+    deltas = defaultdict(dict)
+    counts = (Booking.objects
+              .filter(user=instance, status=Booking.STATUS_CONFIRMED)
+              .values_list("activity_class_id", "start")
+              .annotate(n=Count("id"))
+              .order_by())
+    for class_id, start, n in counts:
+        deltas[class_id][start] = -n
+    vars(origin).setdefault("_user_booking_deltas", {})[instance.pk] = deltas
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def rollup_user_deleted(sender, instance, origin=None, **kwargs):
+    deltas = getattr(origin, "_user_booking_deltas", {}).get(instance.pk, {})
+    deleted_classes = getattr(origin, "_deleted_class_ids", ())
+    for class_id, class_deltas in deltas.items():
+        if class_id not in deleted_classes:
+            apply_booking_deltas(class_id, class_deltas)
@@ -0,0 +1,115 @@
+"""Offline "similar classes" recommendations.
+
+Each class is described by two sparse, binary feature vectors: its tags and
+the users who booked it. Both are TF-IDF weighted and L2-normalised, so the
+dot product of two rows is their cosine similarity. The all-pairs product
+is computed the sparse-matrix way, through inverted postings (feature →
+classes), so only pairs sharing at least one feature are ever touched.
+Features shared by more than ``MAX_POSTING`` classes carry almost no signal
+and are skipped, which keeps the job near-linear on a large catalog.
+
+The final score blends both cosines with small bonuses for the same coach
+and the same city; the best ``TOP_K`` neighbours per class are written to
+`SimilarClass` by `rebuild_similar_classes`.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+
+from .models import ActivityClass, Booking, SimilarClass
+
+
+TOP_K = 8
+MAX_POSTING = 2000
+WEIGHTS = {
+    "tags": 0.5,
+    "cobooked": 0.3,
+    "coach": 0.1,
+    "city": 0.1,
+}
+
+SparseRows = Dict[int, Dict[int, float]]  # class id -> {feature id: weight}
+
+
+def _normalised_rows(pairs: Iterable[Tuple[int, int]], n_classes: int) -> Tuple[SparseRows, Dict[int, List[int]]]:
+    """Build TF-IDF rows and feature postings from ``(class_id, feature_id)`` pairs."""
+
+    postings: Dict[int, List[int]] = defaultdict(list)
+    for class_id, feature in set(pairs):
+        postings[feature].append(class_id)
+    postings = {f: ids for f, ids in postings.items() if len(ids) <= MAX_POSTING}
+
+    rows: SparseRows = defaultdict(dict)
+    for feature, class_ids in postings.items():
+        idf = math.log(1 + n_classes / len(class_ids))
+        for class_id in class_ids:
+            rows[class_id][feature] = idf
+    for row in rows.values():
+        norm = math.sqrt(sum(w * w for w in row.values()))
+        for feature in row:
+            row[feature] /= norm
+    # Features unique to one class count towards the norm but pair nothing up.
+    return rows, {f: ids for f, ids in postings.items() if len(ids) > 1}
+
+
+def _cosines(class_id: int, rows: SparseRows, postings: Dict[int, List[int]], scores: Dict[int, float], weight: float):
+    """Add ``weight * cos(class, other)`` to ``scores`` for every other class sharing a feature."""
+
+    for feature, value in rows.get(class_id, {}).items():
+        for other in postings.get(feature, ()):
+            if other != class_id:
+                scores[other] += weight * value * rows[other][feature]
+
+
+def compute_similar(top_k: int = TOP_K) -> Dict[int, List[Tuple[int, float]]]:
+    """Return ``{class_id: [(similar_id, score), ...]}``, best first."""
+
+    classes = {pk: (city.casefold(), coach_id) for pk, city, coach_id in
+               ActivityClass.objects.values_list("pk", "location__city", "coach_id").iterator()}
+    n = len(classes)
+    tag_rows, tag_postings = _normalised_rows(
+        ActivityClass.tags.through.objects.values_list("activityclass_id", "tag_id").iterator(), n)
+    booking_rows, booking_postings = _normalised_rows(
+        Booking.objects.filter(status=Booking.STATUS_CONFIRMED)
+        .values_list("activity_class_id", "user_id").iterator(), n)
+
+    by_coach: Dict[int, List[int]] = defaultdict(list)
+    for pk, (_, coach_id) in classes.items():
+        if coach_id:
+            by_coach[coach_id].append(pk)
+
+    result: Dict[int, List[Tuple[int, float]]] = {}
+    for pk, (city, coach_id) in classes.items():
+        scores: Dict[int, float] = defaultdict(float)
+        _cosines(pk, tag_rows, tag_postings, scores, WEIGHTS["tags"])
+        _cosines(pk, booking_rows, booking_postings, scores, WEIGHTS["cobooked"])
+        if coach_id and len(by_coach[coach_id]) <= MAX_POSTING:
+            for other in by_coach[coach_id]:
+                if other != pk:
+                    scores[other] += WEIGHTS["coach"]
+        # City alone is too broad to nominate candidates; it only re-ranks them.
+        for other in scores:
+            if classes[other][0] == city:
+                scores[other] += WEIGHTS["city"]
+        result[pk] = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+    return result
+
+
+def rebuild_similar_classes(top_k: int = TOP_K) -> int:
+    """Recompute the neighbour table; returns the number of rows written."""
+
+    neighbours = compute_similar(top_k)
+    rows = [
+        SimilarClass(activity_class_id=pk, similar_id=other, rank=rank, score=score)
+        for pk, ranked in neighbours.items()
+        for rank, (other, score) in enumerate(ranked)
+    ]
+    with transaction.atomic():
+        SimilarClass.objects.all().delete()
+        SimilarClass.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
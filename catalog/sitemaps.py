@@ -0,0 +1,121 @@
+"""Chunked, incrementally rebuilt sitemaps for every class page.
+
+Classes are bucketed by primary key (``pk // CHUNK_SIZE``), so a chunk
+never holds more than the 50,000 URLs a sitemap may list and an edit only
+ever touches one chunk. `build_sitemaps` asks the database for each
+chunk's row count and newest ``updated_at`` in one aggregate query, compares
+that with the manifest from the previous run, and rewrites only the chunks
+that differ, streaming their rows straight to disk. The index and the
+chunks are plain files under ``settings.SITEMAP_ROOT``, so a web server or
+CDN can serve them as static files.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, Max
+from django.db.models.functions import Cast
+from django.urls import reverse
+
+from .cards import class_url
+from .models import ActivityClass
+
+
+CHUNK_SIZE = 50_000
+MANIFEST = "manifest.json"
+INDEX = "sitemap.xml"
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def sitemap_root() -> Path:
+    return Path(settings.SITEMAP_ROOT)
+
+
+def chunk_name(chunk: int) -> str:
+    return f"classes-{chunk:05d}.xml"
+
+
+def _site_url() -> str:
+    return settings.SITE_URL.rstrip("/")
+
+
+def _write_atomic(path: Path, lines) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.writelines(lines)
+    os.replace(tmp, path)
+
+
+def chunk_stamps() -> Dict[int, Tuple[int, str]]:
+    """``{chunk: (class_count, newest updated_at)}`` for every non-empty chunk."""
+
+    rows = (ActivityClass.objects
+            .annotate(chunk=Cast(F("pk") / CHUNK_SIZE, IntegerField()))
+            .values("chunk")
+            .annotate(count=Count("pk"), lastmod=Max("updated_at"))
+            .order_by("chunk"))
+    return {row["chunk"]: (row["count"], row["lastmod"].isoformat()) for row in rows}
+
+
+def _chunk_lines(chunk: int):
+    # class_url splices slugs into a cached reverse; reversing 50k times is the slow part.
+    base = _site_url()
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{XMLNS}">\n'
+    rows = (ActivityClass.objects
+            .filter(pk__gte=chunk * CHUNK_SIZE, pk__lt=(chunk + 1) * CHUNK_SIZE)
+            .order_by("pk")
+            .values_list("slug", "updated_at"))
+    for slug, updated_at in rows.iterator(chunk_size=2000):
+        yield (f"<url><loc>{escape(base + class_url(slug))}</loc>"
+               f"<lastmod>{updated_at.isoformat(timespec='seconds')}</lastmod></url>\n")
+    yield "</urlset>\n"
+
+
+def _index_lines(manifest: Dict[str, dict]):
+    base = _site_url()
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{XMLNS}">\n'
+    for chunk in sorted(manifest, key=int):
+        entry = manifest[chunk]
+        loc = base + reverse("sitemap-chunk", args=[entry["file"]])
+        yield f"<sitemap><loc>{escape(loc)}</loc><lastmod>{entry['lastmod']}</lastmod></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def load_manifest(root: Optional[Path] = None) -> Dict[str, dict]:
+    try:
+        return json.loads(((root or sitemap_root()) / MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def build_sitemaps(force: bool = False, root: Optional[Path] = None) -> Tuple[int, int]:
+    """Bring the sitemap files up to date; returns ``(written, unchanged)`` chunks."""
+
+    root = root or sitemap_root()
+    root.mkdir(parents=True, exist_ok=True)
+    previous = {} if force else load_manifest(root)
+    manifest: Dict[str, dict] = {}
+    written = unchanged = 0
+
+    for chunk, (count, lastmod) in chunk_stamps().items():
+        entry = {"file": chunk_name(chunk), "count": count, "lastmod": lastmod}
+        manifest[str(chunk)] = entry
+        if previous.get(str(chunk)) == entry and (root / entry["file"]).exists():
+            unchanged += 1
+            continue
+        _write_atomic(root / entry["file"], _chunk_lines(chunk))
+        written += 1
+
+    for chunk, entry in previous.items():
+        if chunk not in manifest:
+            (root / entry["file"]).unlink(missing_ok=True)
+
+    if written or manifest != previous or not (root / INDEX).exists():
+        _write_atomic(root / INDEX, _index_lines(manifest))
+        _write_atomic(root / MANIFEST, [json.dumps(manifest, indent=1, sort_keys=True)])
+    return written, unchanged
@@ -0,0 +1,228 @@
+"""Compact, memory-mapped snapshot of the active weekly schedule.
+
+`build_snapshot` packs every active `ScheduleRule` into fixed-width
+columns (one `array` per field, sorted by class id) and writes them to
+``settings.SCHEDULE_SNAPSHOT_PATH`` atomically. Worker processes call
+`get_snapshot`, which maps the file read-only and exposes the columns as
+``memoryview`` casts, so every worker shares the same pages and nothing is
+copied or unpickled. The file is re-checked every few seconds and swapped in
+when a rebuild has replaced it.
+
+Each snapshot records the ``schedule`` cache namespace version it was built
+at. Any rule, exception or one-off change bumps that version (see
+`signals.invalidate_schedule`), and `get_snapshot` stops returning a
+snapshot that is behind it until ``build_schedule_snapshot`` runs again.
+
+Layout (native byte order)::
+
+    header   magic "SFSS", format u32, generation u64,
+             schedule version u64, count u64
+    columns  class_id q, rule_id q, start_ord i, end_ord i,
+             seconds i, duration i (minutes), interval h, weekday b
+             (each padded to 8 bytes)
+"""
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from django.conf import settings
+
+from . import cache as catalog_cache
+from .models import ScheduleRule
+
+
+MAGIC = b"SFSS"
+FORMAT_VERSION = 3
+HEADER = struct.Struct("=4sIQQQ")
+COLUMNS = (
+    ("class_id", "q"),
+    ("rule_id", "q"),
+    ("start_ord", "i"),
+    ("end_ord", "i"),   # 0 means open-ended
+    ("seconds", "i"),   # time of day
+    ("duration", "i"),  # minutes
+    ("interval", "h"),
+    ("weekday", "b"),
+)
+CHECK_INTERVAL = 5.0  # seconds between stat() calls looking for a rebuild
+
+
+class SnapshotRule(NamedTuple):
+    """Read-only stand-in for `ScheduleRule` with the fields expansion needs."""
+
+    pk: int
+    activity_class_id: int
+    weekday: int
+    time: dt.time
+    start_date: dt.date
+    end_date: Optional[dt.date]
+    interval: int
+    duration_minutes: int
+
+    @property
+    def duration(self) -> dt.timedelta:
+        return dt.timedelta(minutes=self.duration_minutes)
+
+
+def _pad(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class ScheduleSnapshot:
+    def __init__(self, buffer):
+        magic, fmt, generation, schedule_version, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError("Not a schedule snapshot (or an incompatible format).")
+        self.generation = generation
+        self.schedule_version = schedule_version
+        self.count = count
+        self._buffer = buffer
+
+        view = memoryview(buffer)
+        offset = _pad(HEADER.size)
+        for name, code in COLUMNS:
+            size = struct.calcsize(code) * count
+            setattr(self, name, view[offset:offset + size].cast(code))
+            offset += _pad(size)
+
+    def __len__(self):
+        return self.count
+
+    def rules_for(self, class_id: int) -> List[SnapshotRule]:
+        lo = bisect.bisect_left(self.class_id, class_id)
+        hi = bisect.bisect_right(self.class_id, class_id, lo)
+        return [self._rule(i) for i in range(lo, hi)]
+
+    def _rule(self, i: int) -> SnapshotRule:
+        seconds = self.seconds[i]
+        end_ord = self.end_ord[i]
+        return SnapshotRule(
+            pk=self.rule_id[i],
+            activity_class_id=self.class_id[i],
+            weekday=self.weekday[i],
+            time=dt.time(seconds // 3600, seconds % 3600 // 60, seconds % 60),
+            start_date=dt.date.fromordinal(self.start_ord[i]),
+            end_date=dt.date.fromordinal(end_ord) if end_ord else None,
+            interval=self.interval[i],
+            duration_minutes=self.duration[i],
+        )
+
+
+def snapshot_path() -> Optional[Path]:
+    path = getattr(settings, "SCHEDULE_SNAPSHOT_PATH", None)
+    return Path(path) if path else None
+
+
+def build_snapshot(path: Optional[Path] = None) -> ScheduleSnapshot:
+    """Write a fresh snapshot of all active rules and return it (in memory)."""
+
+    path = path or snapshot_path()
+    if path is None:
+        raise ValueError("SCHEDULE_SNAPSHOT_PATH is not configured.")
+
+    # Read before the rules, so a change made while we scan leaves us stale.
+    schedule_version = catalog_cache.namespace_version("schedule")
+    columns = {name: array(code) for name, code in COLUMNS}
+    rows = (ScheduleRule.objects
+            .filter(active=True, weekday__isnull=False, time__isnull=False)
+            .order_by("activity_class_id", "weekday", "time", "pk")
+            .values_list("activity_class_id", "pk", "start_date", "end_date", "time",
+                         "duration_minutes", "interval", "weekday"))
+    for class_id, rule_id, start_date, end_date, time_of_day, minutes, interval, weekday in rows.iterator(
+            chunk_size=2000):
+        columns["class_id"].append(class_id)
+        columns["rule_id"].append(rule_id)
+        columns["start_ord"].append(start_date.toordinal())
+        columns["end_ord"].append(end_date.toordinal() if end_date else 0)
+        columns["seconds"].append(time_of_day.hour * 3600 + time_of_day.minute * 60 + time_of_day.second)
+        columns["duration"].append(minutes)
+        columns["interval"].append(interval or 1)
+        columns["weekday"].append(weekday)
+
+    count = len(columns["class_id"])
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION, time.time_ns(), schedule_version, count)]
+    parts.append(b"\0" * (_pad(HEADER.size) - HEADER.size))
+    for name, _ in COLUMNS:
+        raw = columns[name].tobytes()
+        parts.append(raw)
+        parts.append(b"\0" * (_pad(len(raw)) - len(raw)))
+    payload = b"".join(parts)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(payload)
+        fh.flush()
+        os.fsync(fh.fileno())
+    # Readers keep their old mapping until they notice the new inode.
+    os.replace(tmp, path)
+    _attachment.expire()
+    return ScheduleSnapshot(payload)
+
+
+class _Attachment:
+    """Process-wide handle on the current snapshot file."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.snapshot: Optional[ScheduleSnapshot] = None
+        self._identity = None
+        self._checked_at = 0.0
+
+    def get(self) -> Optional[ScheduleSnapshot]:
+        now = time.monotonic()
+        if now - self._checked_at < CHECK_INTERVAL:
+            return self.snapshot
+        with self._lock:
+            self._checked_at = now
+            path = snapshot_path()
+            try:
+                stat = os.stat(path) if path else None
+            except FileNotFoundError:
+                stat = None
+            identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size) if stat else None
+            if identity != self._identity:
+                self.snapshot = self._open(path) if identity else None
+                self._identity = identity
+            return self.snapshot
+
+    @staticmethod
+    def _open(path: Path) -> Optional[ScheduleSnapshot]:
+        with open(path, "rb") as fh:
+            buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return ScheduleSnapshot(buffer)
+        except (ValueError, struct.error):
+            buffer.close()
+            return None
+
+    def expire(self):
+        """Make the next `get` look at the file again."""
+        self._checked_at = 0.0
+
+    def reset(self):
+        with self._lock:
+            self.snapshot = None
+            self._identity = None
+            self._checked_at = 0.0
+
+
+_attachment = _Attachment()
+
+
+def get_snapshot() -> Optional[ScheduleSnapshot]:
+    """Return the attached snapshot, or ``None`` when none has been built or it is stale."""
+
+    snapshot = _attachment.get()
+    if snapshot is not None and snapshot.schedule_version != catalog_cache.namespace_version("schedule"):
+        return None
+    return snapshot
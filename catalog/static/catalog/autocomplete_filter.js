@@ -0,0 +1,16 @@
+'use strict';
+// Applies an AutocompleteFilter choice by reloading the changelist with the
+// filter's query parameter set (or removed when the selection is cleared).
+window.addEventListener('load', function () {
+    django.jQuery('select[data-filter]').on('change', function () {
+        const params = new URLSearchParams(window.location.search);
+        const name = this.dataset.filter;
+        if (this.value) {
+            params.set(name, this.value);
+        } else {
+            params.delete(name);
+        }
+        params.delete('p');
+        window.location.search = params.toString();
+    });
+});
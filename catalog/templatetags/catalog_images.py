@@ -0,0 +1,22 @@
+from django import template
+from django.templatetags.static import static
+
+from ..images import picture_sources
+
+
+register = template.Library()
+
+
+@register.inclusion_tag("catalog/includes/picture.html")
+def responsive_image(obj, alt="", sizes="100vw", css_class="", placeholder="img/placeholders/studio-1.jpg",
+                     eager=False):
+    """``<picture>`` for ``obj.photo`` with AVIF/WebP/JPEG ``srcset``s; a static placeholder without one."""
+
+    picture = picture_sources(obj) or {"fallback": static(placeholder), "sources": [], "srcset": ""}
+    return {
+        "picture": picture,
+        "alt": alt,
+        "sizes": sizes,
+        "css_class": css_class,
+        "loading": "eager" if eager else "lazy",
+    }
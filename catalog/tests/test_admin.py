@@ -0,0 +1,50 @@
+import datetime
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.admin_tools import EstimatedCountPaginator
+from catalog.models import ActivityClass, Booking, Location
+
+User = get_user_model()
+
+
+@pytest.fixture
+def bookings():
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    yoga = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    boxing = ActivityClass.objects.create(title="Boxing", slug="boxing", location=loc)
+    start = timezone.now() + datetime.timedelta(days=1)
+    for i in range(3):
+        user = User.objects.create_user(f"user{i}", f"user{i}@example.com", "pass")
+        for ac in (yoga, boxing):
+            Booking.objects.create(user=user, activity_class=ac, start=start, end=start + datetime.timedelta(hours=1))
+    return yoga
+
+
+@pytest.mark.django_db
+def test_booking_changelist_filters_by_autocomplete_without_listing_rows(admin_client, bookings):
+    url = reverse("admin:catalog_booking_changelist")
+    r = admin_client.get(url)
+    assert r.status_code == 200
+    # Filters render the select2 widget, not a link per user/class.
+    assert b'data-filter="user__id__exact"' in r.content
+    assert b"?user__id__exact=" not in r.content
+    assert b"autocomplete_filter.js" in r.content
+
+    r = admin_client.get(url, {"activity_class__id__exact": bookings.pk})
+    assert r.context["cl"].result_count == 3
+    assert b'<option value="%d" selected>Yoga</option>' % bookings.pk in r.content
+
+
+@pytest.mark.django_db
+def test_estimated_count_only_for_large_unfiltered_tables(bookings):
+    with mock.patch.object(EstimatedCountPaginator, "_estimate", return_value=5_000_000):
+        assert EstimatedCountPaginator(Booking.objects.all(), 100).count == 5_000_000
+    with mock.patch.object(EstimatedCountPaginator, "_estimate", return_value=40):
+        assert EstimatedCountPaginator(Booking.objects.all(), 100).count == 6
+    # Not PostgreSQL here, so no estimate is attempted.
+    assert EstimatedCountPaginator(Booking.objects.all(), 100)._estimate() is None
@@ -0,0 +1,54 @@
+import pytest
+from django.urls import reverse
+
+from catalog import autocomplete
+from catalog.autocomplete import PrefixIndex, Suggestion
+from catalog.models import ActivityClass, Coach, Location, Tag
+
+
+def test_prefix_index_matches_any_word_and_ignores_accents():
+    index = PrefixIndex([
+        ("Power Yoga", Suggestion("class", "Power Yoga", "/classes/power-yoga/")),
+        ("Yin Yoga", Suggestion("class", "Yin Yoga", "/classes/yin-yoga/")),
+        ("Šiauliai", Suggestion("city", "Šiauliai", "/classes/?city=Šiauliai")),
+    ])
+    assert [s.label for s in index.lookup("yo")] == ["Power Yoga", "Yin Yoga"]
+    assert [s.label for s in index.lookup("power y")] == ["Power Yoga"]
+    assert [s.label for s in index.lookup("SIAU")] == ["Šiauliai"]
+    assert index.lookup("yoga", limit=1) == index.lookup("yoga")[:1]
+    assert index.lookup("   ") == []
+
+
+@pytest.mark.django_db(transaction=True)  # the rebuild thread must see committed rows
+def test_autocomplete_endpoint_follows_catalog_changes(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    coach = Coach.objects.create(name="Kazys")
+    Tag.objects.create(name="Kettlebell", slug="kettlebell")
+    ActivityClass.objects.create(title="Kickboxing", slug="kickboxing", location=loc, coach=coach)
+    url = reverse("autocomplete")
+
+    results = client.get(url, {"q": "k"}).json()["results"]
+    assert {(r["kind"], r["label"]) for r in results} == {
+        ("class", "Kickboxing"), ("tag", "Kettlebell"), ("city", "Kaunas"), ("coach", "Kazys"),
+    }
+
+    # The edit is picked up by a background rebuild; until then the old index answers.
+    ActivityClass.objects.create(title="Krav Maga", slug="krav-maga", location=loc)
+    assert client.get(url, {"q": "krav"}).json()["results"] == []
+    autocomplete._holder.refresher.join()
+    assert [r["label"] for r in client.get(url, {"q": "krav"}).json()["results"]] == ["Krav Maga"]
+
+    coach_url = next(r["url"] for r in results if r["kind"] == "coach")
+    assert [c.title for c in client.get(coach_url).context["classes"]] == ["Kickboxing"]
+
+
+@pytest.mark.django_db
+def test_warm_builds_the_index_before_the_first_request(client, django_assert_max_num_queries):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ActivityClass.objects.create(title="Kickboxing", slug="kickboxing", location=loc)
+    autocomplete.warm()
+    assert len(autocomplete._holder.index)
+
+    with django_assert_max_num_queries(0):
+        results = client.get(reverse("autocomplete"), {"q": "kick"}).json()["results"]
+    assert [r["label"] for r in results] == ["Kickboxing"]
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from catalog import cache as catalog_cache
+from catalog.models import Tag
+
+
+def test_get_or_set_computes_once_and_counts_hits():
+    calls = []
+
+    def producer():
+        calls.append(1)
+        return ["a", "b"]
+
+    assert catalog_cache.get_or_set("demo", "k", producer) == ["a", "b"]
+    assert catalog_cache.get_or_set("demo", "k", producer) == ["a", "b"]
+    catalog_cache.clear_local()
+    assert catalog_cache.get_or_set("demo", "k", producer) == ["a", "b"]
+
+    assert len(calls) == 1
+    stats = catalog_cache.get_stats()["demo"]
+    assert stats["misses"] == 1
+    assert stats["local_hits"] == 1
+    assert stats["shared_hits"] == 1
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_invalidate_bumps_namespace_version():
+    catalog_cache.get_or_set("demo", "k", lambda: 1)
+    catalog_cache.invalidate("demo")
+    assert catalog_cache.get_or_set("demo", "k", lambda: 2) == 2
+
+
+def test_stale_value_served_while_another_caller_recomputes(settings):
+    settings.CATALOG_CACHE = {"LOCAL_TTL": 0}
+    catalog_cache.get_or_set("demo", "k", lambda: "old", timeout=0.01, stale_ttl=60)
+    time.sleep(0.02)
+
+    full_key = catalog_cache.make_key("demo", "k")
+    assert catalog_cache._acquire(full_key)
+    try:
+        assert catalog_cache.get_or_set("demo", "k", lambda: "new", timeout=60) == "old"
+    finally:
+        catalog_cache._release(full_key)
+
+    assert catalog_cache.get_or_set("demo", "k", lambda: "new", timeout=60) == "new"
+    assert catalog_cache.get_stats()["demo"]["stale_hits"] == 1
+
+
+def test_miss_on_one_key_does_not_wait_for_another_keys_recompute():
+    def outer():
+        # Computing many other keys while "outer" is in flight must not make any of
+        # them wait for a result nobody is producing.
+        return [catalog_cache.get_or_set("demo", f"inner-{i}", lambda i=i: i) for i in range(200)]
+
+    started = time.monotonic()
+    assert catalog_cache.get_or_set("demo", "outer", outer) == list(range(200))
+    assert time.monotonic() - started < 1
+    assert catalog_cache.get_stats()["demo"]["recomputes"] == 201
+    assert not catalog_cache._inflight
+
+
+@pytest.mark.django_db
+def test_tag_options_invalidated_on_save(client):
+    Tag.objects.create(name="Yoga")
+    r = client.get("/classes/")
+    assert [t["name"] for t in r.context["all_tags"]] == ["Yoga"]
+
+    Tag.objects.create(name="Boxing")
+    r = client.get("/classes/")
+    assert [t["name"] for t in r.context["all_tags"]] == ["Boxing", "Yoga"]
@@ -0,0 +1,51 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.template.defaultfilters import date as date_filter, time as time_filter
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.cards import class_url, format_session
+from catalog.models import ActivityClass, Coach, Location, Tag
+from catalog.zones import zone_for
+
+
+def test_format_session_matches_template_filters():
+    zone = datetime.timezone(datetime.timedelta(hours=3))
+    value = datetime.datetime(2030, 6, 3, 15, 5, tzinfo=datetime.timezone.utc)
+    local = value.astimezone(zone)
+    assert format_session(value, zone) == f"{date_filter(local, 'D, M j')} at {time_filter(local, 'H:i')}"
+    assert format_session(value, zone) == "Mon, Jun 3 at 18:05"
+
+
+@pytest.mark.django_db
+def test_class_list_cards_are_precomputed(client):
+    loc = Location.objects.create(city="Vilnius", address1="Gedimino pr. 1", time_zone="Europe/Vilnius")
+    user = get_user_model().objects.create_user("ona", "ona@example.com", "pass", first_name="Ona")
+    coach = Coach.objects.create(user=user)
+    tag = Tag.objects.create(name="Yoga", slug="yoga")
+    start = timezone.now() + datetime.timedelta(days=1)
+    for i in range(4):
+        cls = ActivityClass.objects.create(title=f"Flow {i}", slug=f"flow-{i}", location=loc, coach=coach,
+                                           next_session_times=[start.isoformat()])
+        cls.tags.add(tag)
+
+    client.get(reverse("class-list"))  # warm the filter-option caches
+    with CaptureQueriesContext(connection) as one:
+        client.get(reverse("class-list"))
+    ActivityClass.objects.create(title="Flow 4", slug="flow-4", location=loc, coach=coach,
+                                 next_session_times=[start.isoformat()]).tags.add(tag)
+    with CaptureQueriesContext(connection) as more:
+        r = client.get(reverse("class-list"))
+    assert len(more) == len(one)  # no per-card queries
+
+    card = r.context["cards"][0]
+    assert card.url == class_url("flow-0") == reverse("class-detail", args=["flow-0"])
+    assert card.place == "Vilnius, Gedimino pr. 1"
+    assert card.coach == "Ona"
+    assert card.tags == ("Yoga",)
+    html = r.content.decode()
+    assert f"<li>{format_session(start, zone_for('Europe/Vilnius'))}</li>" in html
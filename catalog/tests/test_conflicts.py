@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+
+from catalog.conflicts import conflicts_for_class, find_conflicts
+from catalog.intervals import overlapping_pairs
+from catalog.models import ActivityClass, Coach, Location, ScheduleRule
+
+MONDAY = datetime.date(2030, 6, 3)
+
+
+def test_overlapping_pairs_ignores_back_to_back():
+    pairs = overlapping_pairs([(0, 60, "a"), (60, 120, "b"), (30, 90, "c"), (200, 210, "d")])
+    assert sorted(tuple(sorted(p)) for p in pairs) == [("a", "c"), ("b", "c")]
+
+
+def _rule(ac, time, minutes=60):
+    return ScheduleRule.objects.create(activity_class=ac, weekday=0, time=time,
+                                       duration_minutes=minutes, start_date=MONDAY)
+
+
+@pytest.mark.django_db
+def test_coach_and_location_conflicts():
+    hall = Location.objects.create(city="Kaunas", address1="Hall")
+    park = Location.objects.create(city="Kaunas", address1="Park")
+    ana = Coach.objects.create(name="Ana")
+    yoga = ActivityClass.objects.create(title="Yoga", slug="yoga", location=hall, coach=ana)
+    pilates = ActivityClass.objects.create(title="Pilates", slug="pilates", location=hall)
+    run = ActivityClass.objects.create(title="Run", slug="run", location=park, coach=ana)
+    later = ActivityClass.objects.create(title="Later", slug="later", location=hall)
+    _rule(yoga, datetime.time(18), 90)       # 18:00-19:30
+    _rule(pilates, datetime.time(19))        # same hall, overlaps yoga
+    _rule(run, datetime.time(19, 15))        # same coach elsewhere, overlaps yoga
+    _rule(later, datetime.time(20))          # back-to-back with pilates
+
+    conflicts = find_conflicts(start_date=MONDAY, weeks=1)
+    found = {(c.kind, frozenset((c.first.title, c.second.title))) for c in conflicts}
+    assert found == {
+        ("location", frozenset({"Yoga", "Pilates"})),
+        ("coach", frozenset({"Yoga", "Run"})),
+    }
+    assert len(conflicts_for_class(run, start_date=MONDAY, weeks=1)) == 1
+    assert conflicts_for_class(later, start_date=MONDAY, weeks=1) == []
+
+
+@pytest.mark.django_db
+def test_audit_command_reports_conflicts(capsys):
+    hall = Location.objects.create(city="Kaunas", address1="Hall")
+    for title in ("A", "B"):
+        _rule(ActivityClass.objects.create(title=title, slug=title.lower(), location=hall), datetime.time(18))
+
+    call_command("audit_schedule_conflicts", "--from", MONDAY.isoformat(), "--weeks", "2")
+    out = capsys.readouterr().out
+    assert "2 conflicts found" in out
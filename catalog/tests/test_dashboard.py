@@ -0,0 +1,68 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog import views
+from catalog.models import ActivityClass, Booking, Location
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_with_bookings(db):
+    u = User.objects.create_user("leo", "leo@example.com", "pass")
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    now = timezone.now()
+    Booking.objects.bulk_create([
+        Booking(user=u, activity_class=ac,
+                start=now + datetime.timedelta(days=offset),
+                end=now + datetime.timedelta(days=offset, hours=1))
+        for offset in range(-5, 30) if offset
+    ])
+    return u
+
+
+def test_upcoming_tab_pages_with_bounded_queries(client, user_with_bookings, django_assert_max_num_queries, monkeypatch):
+    monkeypatch.setattr(views, "BOOKINGS_PAGE_SIZE", 10)
+    client.force_login(user_with_bookings)
+    url = reverse("my-bookings-json")
+
+    seen, cursor = [], ""
+    while True:
+        # session + user + one page query
+        with django_assert_max_num_queries(3):
+            data = client.get(url, {"tab": "upcoming", "cursor": cursor}).json()
+        seen.extend(item["start"] for item in data["results"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 29
+    assert seen == sorted(seen)
+
+
+def test_cancel_moves_booking_to_past_tab(client, user_with_bookings):
+    client.force_login(user_with_bookings)
+    booking = Booking.objects.filter(start__gt=timezone.now()).order_by("start").first()
+
+    r = client.post(reverse("booking-cancel", args=[booking.pk]))
+    assert r.status_code == 302
+    booking.refresh_from_db()
+    assert booking.status == Booking.STATUS_CANCELLED
+
+    past = client.get(reverse("my-bookings-json"), {"tab": "past"}).json()["results"]
+    assert booking.pk in [item["id"] for item in past]
+    assert len(past) == 6  # five past + the cancelled one
+
+
+def test_cannot_cancel_past_booking(client, user_with_bookings):
+    client.force_login(user_with_bookings)
+    booking = Booking.objects.filter(start__lt=timezone.now()).first()
+
+    client.post(reverse("booking-cancel", args=[booking.pk]))
+    booking.refresh_from_db()
+    assert booking.status == Booking.STATUS_CONFIRMED
@@ -0,0 +1,133 @@
+import datetime
+import random
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+
+from catalog.intervals import IntervalIndex
+from catalog.models import ActivityClass, Location, OneOffSession, ScheduleRule
+from catalog.utils import decode_occurrence_token, expand_rules, occurrences_for_rules
+
+
+def test_interval_index_matches_brute_force():
+    rng = random.Random(7)
+    intervals = []
+    for i in range(500):
+        start = rng.randrange(0, 1440)
+        intervals.append((start, start + rng.randrange(15, 180), i))
+    index = IntervalIndex(intervals)
+
+    for _ in range(200):
+        lo = rng.randrange(0, 1500)
+        hi = lo + rng.randrange(1, 240)
+        expected = sorted(i for s, e, i in intervals if s < hi and e > lo)
+        assert sorted(index.overlapping(lo, hi)) == expected
+
+
+@pytest.mark.django_db
+def test_rule_duration_flows_into_sessions_and_tokens():
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    ScheduleRule.objects.create(activity_class=ac, weekday=0, time=datetime.time(18), duration_minutes=90)
+
+    start = datetime.datetime.now(datetime.timezone.utc)
+    sessions = expand_rules(ac, start, start + datetime.timedelta(days=14))
+    assert sessions
+    for session in sessions:
+        assert session["end"] - session["start"] == datetime.timedelta(minutes=90)
+        _, token_start, token_end = decode_occurrence_token(session["token"])
+        assert token_end - token_start == datetime.timedelta(minutes=90)
+
+
+@pytest.mark.django_db
+def test_zero_duration_is_rejected():
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    for obj in (ScheduleRule(activity_class=ac, weekday=0, time=datetime.time(9), duration_minutes=0),
+                OneOffSession(activity_class=ac, start=datetime.datetime(2030, 1, 1, 9, tzinfo=datetime.timezone.utc),
+                              duration_minutes=0)):
+        with pytest.raises(ValidationError) as exc:
+            obj.full_clean()
+        assert "duration_minutes" in exc.value.message_dict
+
+
+@pytest.mark.django_db
+def test_zero_duration_is_refused_by_the_database():
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    for model, fields in ((ScheduleRule, {"weekday": 0, "time": datetime.time(9)}),
+                          (OneOffSession, {"start": datetime.datetime(2030, 1, 1, 9, tzinfo=datetime.timezone.utc)})):
+        with pytest.raises(IntegrityError), transaction.atomic():
+            model.objects.create(activity_class=ac, duration_minutes=0, **fields)
+
+
+@pytest.mark.django_db
+def test_zero_duration_rows_are_skipped_not_raised(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    ScheduleRule.objects.create(activity_class=ac, weekday=1, time=datetime.time(18))
+    start = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)
+    # Rows written before the constraint existed (SQLite lets us fake one).
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA ignore_check_constraints = ON")
+        try:
+            ScheduleRule.objects.create(activity_class=ac, weekday=0, time=datetime.time(9), duration_minutes=0)
+            OneOffSession.objects.create(activity_class=ac, start=start, duration_minutes=0)
+        finally:
+            cursor.execute("PRAGMA ignore_check_constraints = OFF")
+
+    sessions = expand_rules(ac, start - datetime.timedelta(days=1), start + datetime.timedelta(days=14))
+    assert sessions and all(s["start"].weekday() == 1 for s in sessions)
+    occurrences = occurrences_for_rules(ac.weekly_rules.all(), days_ahead=14)
+    assert occurrences and all(moment.weekday() == 1 for moment in occurrences)
+    assert client.get(ac.get_absolute_url()).status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_filters_by_local_time_window(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St", time_zone="Europe/Vilnius")
+    day = datetime.date(2030, 6, 3)
+    evening = ActivityClass.objects.create(title="Evening", slug="evening", location=loc)
+    ScheduleRule.objects.create(activity_class=evening, weekday=day.weekday(), time=datetime.time(19, 30),
+                                duration_minutes=60, start_date=datetime.date(2030, 1, 1))
+    long_run = ActivityClass.objects.create(title="Long run", slug="long-run", location=loc)
+    ScheduleRule.objects.create(activity_class=long_run, weekday=day.weekday(), time=datetime.time(16),
+                                duration_minutes=150, start_date=datetime.date(2030, 1, 1))
+    morning = ActivityClass.objects.create(title="Morning", slug="morning", location=loc)
+    ScheduleRule.objects.create(activity_class=morning, weekday=day.weekday(), time=datetime.time(7),
+                                start_date=datetime.date(2030, 1, 1))
+    one_off = ActivityClass.objects.create(title="Pop-up", slug="pop-up", location=loc)
+    OneOffSession.objects.create(activity_class=one_off,  # 18:15 in Vilnius
+                                 start=datetime.datetime(2030, 6, 3, 15, 15, tzinfo=datetime.timezone.utc))
+
+    r = client.get(reverse("class-list"), {"date": day.isoformat(), "time_from": "18:00", "time_to": "20:00"})
+    assert [c.title for c in r.context["classes"]] == ["Evening", "Long run", "Pop-up"]
+
+    r = client.get(reverse("class-list"), {"date": day.isoformat()})
+    assert len(r.context["classes"]) == 4
+
+
+@pytest.mark.django_db
+def test_day_filter_pages_without_listing_every_match(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St", time_zone="Europe/Vilnius")
+    day = datetime.date(2030, 6, 3)
+    for i in range(30):
+        ac = ActivityClass.objects.create(title=f"Class {i:02}", slug=f"class-{i}", location=loc)
+        ScheduleRule.objects.create(activity_class=ac, weekday=day.weekday(), time=datetime.time(19),
+                                    start_date=datetime.date(2030, 1, 1))
+    ActivityClass.objects.create(title="Class 99", slug="class-99", location=loc)
+
+    param_counts = []
+
+    def record(execute, sql, params, many, context):
+        param_counts.append(len(params or ()))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        r = client.get(reverse("class-list"), {"date": day.isoformat(), "page": 2})
+    assert r.context["page_obj"].paginator.count == 30
+    assert [c.title for c in r.context["classes"]] == [f"Class {i:02}" for i in range(12, 24)]
+    # Only the page's own ids ever go into an IN list.
+    assert max(param_counts) <= 12
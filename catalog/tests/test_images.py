@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from PIL import Image
+
+from catalog import images
+from catalog.models import ActivityClass, Location
+
+
+def _jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 80, 40)).save(buffer, format="JPEG")
+    return ContentFile(buffer.getvalue())
+
+
+@pytest.mark.django_db
+def test_process_images_renders_hashed_renditions_and_srcset(client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    cls = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    cls.photo.save("yoga.jpg", _jpeg(1000, 500))
+
+    r = client.get(reverse("class-detail", args=[cls.slug]))
+    assert f'src="{cls.photo.url}"' in r.content.decode()  # not processed yet: original
+
+    assert images.process_images(workers=1) == 1
+    assert images.process_images(workers=1) == 0  # up to date
+
+    cls.refresh_from_db()
+    renditions = cls.photo_renditions
+    assert renditions["source"] == cls.photo.name
+    assert (renditions["width"], renditions["height"]) == (1000, 500)
+    formats = images.available_formats()
+    assert set(renditions["formats"]) == set(formats)
+    for fmt in formats:
+        assert [w for w, _ in renditions["formats"][fmt]] == [320, 640, 960]
+        for _, name in renditions["formats"][fmt]:
+            assert (tmp_path / name).exists()
+    with Image.open(tmp_path / renditions["formats"]["jpeg"][0][1]) as small:
+        assert small.size == (320, 160)
+
+    html = client.get(reverse("class-detail", args=[cls.slug])).content.decode()
+    assert "/media/renditions/yoga-320w-" in html and " 960w" in html
+    if "webp" in formats:
+        assert 'type="image/webp"' in html
+
+    cls.photo.save("yoga-new.jpg", _jpeg(400, 300))
+    assert images.process_images(workers=1) == 1  # stale renditions are redone
+
+
+@pytest.mark.django_db
+def test_process_images_bounds_jobs_in_flight(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    for i in range(7):
+        ActivityClass.objects.create(title=f"Yoga {i}", slug=f"yoga-{i}", location=loc).photo.save(
+            f"yoga-{i}.jpg", _jpeg(400, 200))
+
+    read, saved, peak = [], [], []
+    real_read, real_save = images._read, images._save
+    monkeypatch.setattr(images, "_read", lambda obj: read.append(obj.pk) or peak.append(len(read) - len(saved))
+                        or real_read(obj))
+    monkeypatch.setattr(images, "_save", lambda *args: saved.append(1) or real_save(*args))
+
+    assert images.process_images(workers=1) == 7
+    assert max(peak) == 2  # two jobs per worker, not the whole backlog
+
+
+@pytest.mark.django_db
+def test_class_without_photo_uses_placeholder(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    cls = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    html = client.get(reverse("class-detail", args=[cls.slug])).content.decode()
+    assert "img/placeholders/studio-1.jpg" in html
+    assert 'loading="eager"' in html
@@ -0,0 +1,74 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from catalog.index_audit import CapturedQuery, audit, audit_pages, full_scans
+from catalog.management.commands import audit_indexes
+from catalog.models import ActivityClass, Location, Tag
+from catalog.seeding import seed_catalog
+
+
+def test_full_scans_ignores_index_walks_and_constant_rows():
+    plan = [
+        "SCAN catalog_location",
+        "SCAN catalog_activityclass USING INDEX class_title_idx",
+        "SCAN CONSTANT ROW",
+        "SEARCH catalog_schedulerule USING INDEX rule_active_class_idx (activity_class_id=?)",
+    ]
+    assert [scan.table for scan in full_scans(plan)] == ["catalog_location"]
+
+
+@pytest.mark.django_db
+def test_audit_captures_every_catalog_page():
+    seed_catalog(classes=20)
+    report = audit()
+    assert set(report) == {label for label, _ in audit_pages()}
+    assert all(queries for queries in report.values())
+
+
+@pytest.mark.django_db
+def test_audit_indexes_command_prints_plans():
+    seed_catalog(classes=20)
+    out = StringIO()
+    call_command("audit_indexes", "--plans", "--fail", stdout=out)
+    assert "class list: " in out.getvalue()
+    assert "No full scans of tables with at least 1000 rows." in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_audit_indexes_command_fails_on_flagged_scans(monkeypatch):
+    Location.objects.create(city="Vilnius", address1="Gedimino pr. 1")
+    query = CapturedQuery("class list", 'SELECT * FROM "catalog_location"', ())
+    plan = ["SCAN catalog_location"]
+    monkeypatch.setattr(audit_indexes, "audit", lambda: {"class list": [(query, plan, full_scans(plan))]})
+
+    out = StringIO()
+    call_command("audit_indexes", "--min-rows", "1", stdout=out)
+    assert "full scan of catalog_location (1 rows)" in out.getvalue()
+    call_command("audit_indexes", "--min-rows", "2", stdout=out)
+    with pytest.raises(CommandError, match="1 full table scan"):
+        call_command("audit_indexes", "--min-rows", "1", "--fail", stdout=StringIO())
+
+
+@pytest.mark.django_db
+def test_city_filter_is_case_insensitive(client):
+    seed_catalog(classes=20)
+    city = Location.objects.values_list("city", flat=True).first()
+    expected = ActivityClass.objects.filter(location__city=city).count()
+
+    r = client.get(reverse("class-list"), {"city": city.upper()})
+    assert r.status_code == 200
+    assert r.context["page_obj"].paginator.count == expected > 0
+
+
+@pytest.mark.django_db
+def test_tag_filter_accepts_slug_or_id(client):
+    seed_catalog(classes=20)
+    tag = Tag.objects.filter(activityclass__isnull=False).first()
+    expected = ActivityClass.objects.filter(tags=tag).count()
+
+    for value in (tag.slug, str(tag.pk)):
+        r = client.get(reverse("class-list"), {"tag": value})
+        assert r.context["page_obj"].paginator.count == expected > 0
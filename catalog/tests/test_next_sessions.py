@@ -0,0 +1,93 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import ActivityClass, Location, ScheduleRule
+from catalog.utils import refresh_next_sessions
+
+
+def _class_with_rule(loc, title, days_from_now):
+    ac = ActivityClass.objects.create(title=title, slug=title.lower(), location=loc)
+    day = timezone.localdate() + datetime.timedelta(days=days_from_now)
+    ScheduleRule.objects.create(
+        activity_class=ac,
+        weekday=day.weekday(),
+        time=datetime.time(23, 59),
+        start_date=day - datetime.timedelta(days=7),
+    )
+    return ac
+
+
+@pytest.mark.django_db
+def test_rule_changes_refresh_next_sessions():
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = _class_with_rule(loc, "Yoga", 2)
+
+    ac.refresh_from_db()
+    assert ac.next_session_at is not None
+    assert len(ac.upcoming_times) == 3
+    assert ac.upcoming_times == sorted(ac.upcoming_times)
+
+    ac.weekly_rules.all().delete()
+    ac.refresh_from_db()
+    assert ac.next_session_at is None
+    assert ac.next_session_times == []
+
+
+@pytest.mark.django_db
+def test_list_sorts_and_filters_by_next_session(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    _class_with_rule(loc, "Boxing", 5)
+    _class_with_rule(loc, "Yoga", 1)
+    ActivityClass.objects.create(title="Archery", slug="archery", location=loc)
+    assert refresh_next_sessions() == 3
+
+    r = client.get(reverse("class-list"), {"sort": "soonest"})
+    assert [c.title for c in r.context["classes"]] == ["Yoga", "Boxing", "Archery"]
+
+    r = client.get(reverse("class-list"), {"within": "3"})
+    assert [c.title for c in r.context["classes"]] == ["Yoga"]
+
+
+@pytest.mark.django_db
+def test_next_sessions_respect_rule_dates_and_interval():
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    today = timezone.localdate()
+    now = timezone.now()
+    ended = ActivityClass.objects.create(title="Ended", slug="ended", location=loc)
+    ScheduleRule.objects.create(activity_class=ended, weekday=today.weekday(), time=datetime.time(23, 59),
+                                start_date=today - datetime.timedelta(days=90),
+                                end_date=today - datetime.timedelta(days=30))
+    later = ActivityClass.objects.create(title="Later", slug="later", location=loc)
+    ScheduleRule.objects.create(activity_class=later, weekday=today.weekday(), time=datetime.time(23, 59),
+                                start_date=today + datetime.timedelta(days=365))
+    biweekly = ActivityClass.objects.create(title="Biweekly", slug="biweekly", location=loc)
+    first = today + datetime.timedelta(days=3)
+    ScheduleRule.objects.create(activity_class=biweekly, weekday=first.weekday(), time=datetime.time(12, 0),
+                                start_date=first - datetime.timedelta(weeks=4), interval=2)
+
+    refresh_next_sessions(now=now)
+    for obj in (ended, later):
+        obj.refresh_from_db()
+        assert obj.next_session_at is None
+        assert obj.next_session_times == []
+
+    biweekly.refresh_from_db()
+    # Every other week within the 28-day horizon, not weekly.
+    assert [t.date() for t in biweekly.upcoming_times] == [first, first + datetime.timedelta(weeks=2)]
+
+
+@pytest.mark.django_db
+def test_soonest_sort_ignores_rules_outside_their_dates(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    today = timezone.localdate()
+    _class_with_rule(loc, "Yoga", 2)
+    ended = ActivityClass.objects.create(title="Archery", slug="archery", location=loc)
+    ScheduleRule.objects.create(activity_class=ended, weekday=today.weekday(), time=datetime.time(23, 59),
+                                start_date=today - datetime.timedelta(days=90),
+                                end_date=today - datetime.timedelta(days=30))
+
+    r = client.get(reverse("class-list"), {"within": "7"})
+    assert [c.title for c in r.context["classes"]] == ["Yoga"]
@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from catalog.models import ActivityClass, Location
+from sportsfinder.profiling import _cprofile_lock, make_token
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.REQUEST_PROFILING = {"ENABLED": True, "SAMPLE_RATE": 0.0, "DIR": tmp_path}
+    return settings.REQUEST_PROFILING
+
+
+@pytest.mark.django_db
+def test_signed_header_profiles_request_and_report_aggregates(client, profiling, tmp_path, capsys):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    url = reverse("class-list")
+
+    assert "X-Profile-Id" not in client.get(url)  # rate 0, no header
+    assert "X-Profile-Id" not in client.get(url, HTTP_X_PROFILE="forged")
+
+    for _ in range(2):
+        r = client.get(url, HTTP_X_PROFILE=make_token())
+        assert r["X-Profile-Id"].startswith("class-list/")
+    assert len(list((tmp_path / "class-list").glob("*.prof"))) == 2
+
+    call_command("profile_report", "class-list", "--limit", "5")
+    out = capsys.readouterr().out
+    assert "class-list: 2 cProfile" in out
+    assert "(dispatch)" in out
+
+
+@pytest.mark.django_db
+def test_stack_sampler_writes_folded_stacks(client, profiling, tmp_path, capsys):
+    profiling.update(MODE="sample", SAMPLE_RATE=1.0, SAMPLE_INTERVAL=0.0001)
+    r = client.get(reverse("class-list"))
+    path = tmp_path / r["X-Profile-Id"]
+    assert path.suffix == ".folded"
+
+    call_command("profile_report", "--all")
+    assert "sampled profile(s)" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_full_view_directory_skips_profiling(client, profiling, tmp_path, monkeypatch):
+    profiling.update(SAMPLE_RATE=1.0, MAX_FILES_PER_VIEW=3)
+    url = reverse("class-list")
+    ids = {client.get(url)["X-Profile-Id"] for _ in range(3)}
+    assert len(ids) == 3  # same second, distinct files
+
+    def fail():
+        raise AssertionError("profiled a request whose view is already full")
+
+    monkeypatch.setattr("cProfile.Profile", fail)
+    r = client.get(url)
+    assert r.status_code == 200 and "X-Profile-Id" not in r
+    assert len(list((tmp_path / "class-list").iterdir())) == 3
+
+
+@pytest.mark.django_db
+def test_cprofile_skips_requests_while_another_is_profiled(client, profiling):
+    profiling.update(SAMPLE_RATE=1.0)
+    url = reverse("class-list")
+    with _cprofile_lock:  # a concurrent request in this process holds the profiler
+        r = client.get(url)
+    assert r.status_code == 200 and "X-Profile-Id" not in r
+    assert "X-Profile-Id" in client.get(url)
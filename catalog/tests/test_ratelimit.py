@@ -0,0 +1,54 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from catalog.models import ActivityClass, Location
+from sportsfinder.ratelimit import LocalBuckets, Rate
+
+User = get_user_model()
+
+
+def test_token_bucket_refuses_after_burst_and_refills(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("sportsfinder.ratelimit.time.monotonic", lambda: clock[0])
+    buckets = LocalBuckets(max_keys=10)
+    rate = Rate.parse("3/6s")
+    assert rate == Rate(3, 6)
+
+    assert [buckets.take("k", rate) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("k", rate) == pytest.approx(2.0)
+    clock[0] += 2.0
+    assert buckets.take("k", rate) == 0
+    assert buckets.take("other", rate) == 0
+
+    with pytest.raises(ValueError):
+        Rate.parse("often")
+
+
+@pytest.mark.django_db
+def test_login_is_throttled_before_touching_the_database(client, django_assert_num_queries):
+    url = reverse("login")
+    for _ in range(10):
+        client.post(url, {"username": "x", "password": "y"})
+    with django_assert_num_queries(0):
+        r = client.post(url, {"username": "x", "password": "y"})
+    assert r.status_code == 429
+    assert int(r["Retry-After"]) >= 1
+    assert client.get(url).status_code == 200  # GETs are not counted
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("backend", ["local", "cache"])
+def test_booking_throttled_per_user(client, settings, backend):
+    settings.RATELIMIT = {"BACKEND": backend}
+    user = User.objects.create_user("leo", "leo@example.com", "pass")
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    client.force_login(user)
+    url = reverse("class-book", args=[ac.slug])
+
+    statuses = [client.post(url, {"token": "bad"}).status_code for _ in range(21)]
+    assert statuses[:20] == [302] * 20
+    r = client.post(url, {"token": "bad"}, HTTP_ACCEPT="application/json")
+    assert r.status_code == 429
+    assert r.json()["error"] == "Too many requests."
@@ -0,0 +1,178 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import (
+    ActivityClass, Booking, ClassWeekRollup, DailyRollup, Location, OccurrenceRollup, ScheduleException, ScheduleRule,
+)
+from catalog.rollups import rebuild_rollups
+from catalog.utils import book_sessions
+
+User = get_user_model()
+
+
+def _snapshot():
+    return {
+        "occurrences": sorted(OccurrenceRollup.objects.values_list("start", "bookings", "revenue")),
+        "days": sorted(DailyRollup.objects.values_list("day", "bookings", "revenue")),
+        "weeks": sorted(ClassWeekRollup.objects.values_list("week", "bookings", "revenue")),
+    }
+
+
+@pytest.fixture
+def yoga():
+    loc = Location.objects.create(city="Kaunas", address1="Main St", time_zone="Europe/Vilnius")
+    return ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc, price=Decimal("12.50"), capacity=10)
+
+
+@pytest.mark.django_db
+def test_rollups_follow_bookings_and_cancellations(yoga):
+    alice = User.objects.create_user("alice", "a@example.com", "pass")
+    bob = User.objects.create_user("bob", "b@example.com", "pass")
+    # 23:30 UTC is already the next day in Vilnius.
+    start = (timezone.now() + datetime.timedelta(days=2)).replace(hour=23, minute=30, second=0, microsecond=0)
+    end = start + datetime.timedelta(hours=1)
+
+    a = Booking.objects.create(user=alice, activity_class=yoga, start=start, end=end)
+    Booking.objects.create(user=bob, activity_class=yoga, start=start, end=end)
+    local_day = start.astimezone(datetime.timezone(datetime.timedelta(hours=2))).date()
+    day = DailyRollup.objects.get()
+    assert (day.day.weekday(), day.bookings, day.revenue) == (local_day.weekday(), 2, Decimal("25.00"))
+
+    a.cancel()
+    a.save()  # a plain re-save must not count twice
+    occurrence = OccurrenceRollup.objects.get()
+    assert (occurrence.bookings, occurrence.revenue) == (1, Decimal("12.50"))
+
+    Booking.objects.filter(user=bob).get().delete()
+    week = ClassWeekRollup.objects.get()
+    assert (week.bookings, week.revenue) == (0, Decimal("0.00"))
+
+    # Series booking bypasses save(); it revives alice's row and adds a second session.
+    later = start + datetime.timedelta(days=7)
+    results = book_sessions(alice, yoga, [{"start": start, "end": end}, {"start": later, "end": later + (end - start)}])
+    assert [r["status"] for r in results] == ["rebooked", "booked"]
+    assert sum(ClassWeekRollup.objects.values_list("bookings", flat=True)) == 2
+
+    incremental = _snapshot()
+    rebuild_rollups(chunk_size=1)
+    assert _snapshot() == incremental
+
+
+@pytest.mark.django_db
+def test_backfill_and_analytics_dashboard(client, yoga):
+    user = User.objects.create_user("leo", "leo@example.com", "pass")
+    start = timezone.now().replace(minute=0, second=0, microsecond=0) - datetime.timedelta(days=3)
+    ScheduleRule.objects.create(activity_class=yoga, weekday=start.weekday(), time=datetime.time(9),
+                                start_date=start.date(), end_date=start.date())
+    Booking.objects.create(user=user, activity_class=yoga, start=start, end=start + datetime.timedelta(hours=1))
+    OccurrenceRollup.objects.all().delete()
+    DailyRollup.objects.all().delete()
+    ClassWeekRollup.objects.all().delete()
+
+    call_command("backfill_rollups", "--chunk-size", "5")
+    assert ClassWeekRollup.objects.get().bookings == 1
+
+    url = reverse("analytics")
+    assert client.get(url).status_code == 302  # staff only
+    User.objects.create_user("staff", "s@example.com", "pass", is_staff=True)
+    client.login(username="staff", password="pass")
+    r = client.get(url, {"group": "city"})
+    assert r.status_code == 200
+    row = r.context["rows"][0]
+    assert (row["label"], row["bookings"], row["fill_rate"]) == ("Kaunas", 1, 0.1)
+
+
+@pytest.mark.django_db
+def test_fill_rate_counts_sessions_without_bookings(client, yoga):
+    User.objects.create_user("staff", "s@example.com", "pass", is_staff=True)
+    client.login(username="staff", password="pass")
+    today = timezone.localdate()
+    monday = today - datetime.timedelta(days=today.weekday())
+    since = monday - datetime.timedelta(weeks=9)
+    # One session a week for ten weeks, plus a closed day that must not count.
+    ScheduleRule.objects.create(activity_class=yoga, weekday=2, time=datetime.time(9),
+                                start_date=since - datetime.timedelta(weeks=4))
+    ScheduleRule.objects.create(activity_class=yoga, weekday=4, time=datetime.time(9),
+                                start_date=monday, end_date=monday + datetime.timedelta(days=6))
+    ScheduleException.objects.create(activity_class=yoga, date=monday + datetime.timedelta(days=4))
+    start = timezone.make_aware(datetime.datetime.combine(since + datetime.timedelta(days=2), datetime.time(9)))
+    Booking.objects.create(user=User.objects.create_user("leo", "leo@example.com", "pass"), activity_class=yoga,
+                           start=start, end=start + datetime.timedelta(hours=1))
+
+    r = client.get(reverse("analytics"), {"since": since.isoformat(), "until": monday.isoformat()})
+    row = r.context["rows"][0]
+    assert (row["sessions"], row["bookings"]) == (10, 1)
+    assert row["fill_rate"] == pytest.approx(0.01)
+
+    r = client.get(reverse("analytics"), {"group": "week", "since": since.isoformat(), "until": monday.isoformat()})
+    assert len(r.context["rows"]) == 10
+    assert {row["sessions"] for row in r.context["rows"]} == {1}
+
+
+@pytest.mark.django_db
+def test_deleting_classes_with_bookings_leaves_no_rollups(yoga):
+    alice = User.objects.create_user("alice", "a@example.com", "pass")
+    pilates = ActivityClass.objects.create(title="Pilates", slug="pilates", location=yoga.location, price=Decimal("9"))
+    start = timezone.now() + datetime.timedelta(days=2)
+    for ac in (yoga, pilates):
+        Booking.objects.create(user=alice, activity_class=ac, start=start, end=start + datetime.timedelta(hours=1))
+
+    yoga.delete()
+    assert list(OccurrenceRollup.objects.values_list("activity_class_id", flat=True)) == [pilates.pk]
+    ActivityClass.objects.filter(pk=pilates.pk).delete()
+    assert not Booking.objects.exists()
+    assert _snapshot() == {"occurrences": [], "days": [], "weeks": []}
+
+
+@pytest.mark.django_db
+def test_deleting_a_user_subtracts_bookings_per_class(yoga, django_assert_max_num_queries):
+    pilates = ActivityClass.objects.create(title="Pilates", slug="pilates", location=yoga.location, price=Decimal("9"))
+    alice = User.objects.create_user("alice", "a@example.com", "pass")
+    bob = User.objects.create_user("bob", "b@example.com", "pass")
+    first = (timezone.now() + datetime.timedelta(days=1)).replace(microsecond=0)
+    sessions = [{"start": first + datetime.timedelta(days=7 * i), "end": first + datetime.timedelta(days=7 * i, hours=1)}
+                for i in range(20)]
+    for ac in (yoga, pilates):
+        book_sessions(alice, ac, sessions)
+        book_sessions(bob, ac, sessions[:1])
+
+    # Bounded by the number of classes, not by alice's 40 bookings.
+    with django_assert_max_num_queries(25):
+        alice.delete()
+    bob.delete()
+    assert set(OccurrenceRollup.objects.values_list("bookings", flat=True)) == {0}
+    assert set(ClassWeekRollup.objects.values_list("revenue", flat=True)) == {Decimal("0.00")}
+
+
+@pytest.mark.django_db
+def test_series_booking_counts_only_rows_it_wrote(yoga, monkeypatch):
+    from catalog import utils
+
+    alice = User.objects.create_user("alice", "a@example.com", "pass")
+    first = (timezone.now() + datetime.timedelta(days=1)).replace(microsecond=0)
+    sessions = [{"start": first + datetime.timedelta(days=7 * i), "end": first + datetime.timedelta(days=7 * i, hours=1)}
+                for i in range(3)]
+    cancelled = Booking.objects.create(user=alice, activity_class=yoga, **sessions[0])
+    cancelled.cancel()
+    cancelled.save()
+
+    real_upsert = utils._upsert_bookings
+
+    def racing_upsert(*args):
+        # Another request revives the first session and books the second
+        # after book_sessions has read the existing rows.
+        cancelled.status = Booking.STATUS_CONFIRMED
+        cancelled.save()
+        Booking.objects.create(user=alice, activity_class=yoga, **sessions[1])
+        return real_upsert(*args)
+
+    monkeypatch.setattr(utils, "_upsert_bookings", racing_upsert)
+    results = book_sessions(alice, yoga, sessions)
+    assert [r["status"] for r in results] == ["already_booked", "already_booked", "booked"]
+    assert list(OccurrenceRollup.objects.order_by("start").values_list("bookings", flat=True)) == [1, 1, 1]
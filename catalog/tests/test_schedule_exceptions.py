@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from catalog.models import ActivityClass, Location, OneOffSession, ScheduleException, ScheduleRule
+from catalog.utils import expand_rules
+
+
+@pytest.mark.django_db
+def test_exceptions_and_one_offs_apply_to_expansion(django_assert_num_queries):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    today = timezone.localdate()
+    ScheduleRule.objects.create(activity_class=ac, weekday=today.weekday(), time=datetime.time(18),
+                                start_date=today - datetime.timedelta(days=7))
+
+    week1 = today + datetime.timedelta(days=7)
+    week2 = today + datetime.timedelta(days=14)
+    ScheduleException.objects.create(location=loc, date=week1, reason="Holiday")
+    ScheduleException.objects.create(activity_class=ac, date=week2)
+    # Years of history outside the window must not change the work done.
+    ScheduleException.objects.bulk_create([
+        ScheduleException(location=loc, date=today - datetime.timedelta(days=n)) for n in range(1, 1000)
+    ])
+    extra = timezone.make_aware(datetime.datetime.combine(today + datetime.timedelta(days=9), datetime.time(7)))
+    OneOffSession.objects.create(activity_class=ac, start=extra)
+
+    start = timezone.make_aware(datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time.min))
+    end = start + datetime.timedelta(days=28)
+    expand_rules(ac, start, end)  # warm the rule cache
+    with django_assert_num_queries(2):
+        sessions = expand_rules(ac, start, end)
+
+    dates = [s["start"].date() for s in sessions]
+    assert week1 not in dates and week2 not in dates
+    assert [s["start"] for s in sessions] == sorted(s["start"] for s in sessions)
+    assert extra in [s["start"] for s in sessions]
+    assert sum(s["rule"] is None for s in sessions) == 1
+    assert len(sessions) == 3  # 4 weekly slots - 2 closures + 1 one-off
+
+
+def test_exception_requires_class_or_location():
+    from django.core.exceptions import ValidationError
+
+    with pytest.raises(ValidationError):
+        ScheduleException(date=datetime.date(2030, 1, 1)).clean()
@@ -0,0 +1,53 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from catalog.models import ActivityClass, Tag
+from catalog.seeding import seed_catalog
+
+
+def test_seeded_catalog_is_restored_for_each_test(seeded_catalog, client):
+    assert ActivityClass.objects.count() == seeded_catalog.classes
+    assert ActivityClass.objects.filter(next_session_at__isnull=False).count() == seeded_catalog.classes
+
+    r = client.get(reverse("class-list"), {"tag": "yoga"})
+    assert r.status_code == 200
+    assert all("Yoga" in card.title for card in r.context["cards"])
+
+    ActivityClass.objects.update(title="Changed")
+    Tag.objects.filter(slug="yoga").delete()
+
+
+def test_seeded_catalog_is_fresh_after_a_test_changed_it(seeded_catalog):
+    assert not ActivityClass.objects.filter(title="Changed").exists()
+    assert Tag.objects.filter(slug="yoga").exists()
+
+
+@pytest.mark.django_db
+def test_database_is_empty_again_outside_the_fixture():
+    assert not ActivityClass.objects.exists()
+
+
+@pytest.mark.django_db
+def test_seed_catalog_is_deterministic_and_reuses_tags():
+    first = seed_catalog(classes=10, seed=3)
+    titles = sorted(ActivityClass.objects.values_list("title", flat=True))
+    second = seed_catalog(classes=10, seed=4)
+    assert first.classes == second.classes == 10
+    assert Tag.objects.count() == first.tags
+    assert titles == sorted(ActivityClass.objects.filter(slug__startswith="seed-3-").values_list("title", flat=True))
+
+
+@pytest.mark.django_db
+def test_seed_catalog_command_creates_load_test_users(client):
+    call_command("seed_catalog", "--classes", "5", "--locations", "2", "--users", "3", "--password", "pw",
+                 stdout=StringIO())
+    assert ActivityClass.objects.filter(slug__startswith="seed-0-class-").count() == 5
+    assert client.login(username="loadtest-2", password="pw")
+
+    with pytest.raises(CommandError, match="Seed 0 is already"):
+        call_command("seed_catalog", "--classes", "5", "--locations", "2", stdout=StringIO())
+    call_command("seed_catalog", "--classes", "5", "--locations", "2", "--seed", "1", stdout=StringIO())
+    assert ActivityClass.objects.count() == 10
@@ -0,0 +1,45 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import ActivityClass, Booking, Location, ScheduleRule
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_series_booking_uses_bulk_insert(client, django_assert_max_num_queries):
+    u = User.objects.create_user("leo", "leo@example.com", "pass")
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ac = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    start = timezone.localdate() + datetime.timedelta(days=1)
+    monday = ScheduleRule.objects.create(activity_class=ac, weekday=0, time=datetime.time(18), start_date=start)
+    ScheduleRule.objects.create(activity_class=ac, weekday=2, time=datetime.time(18), start_date=start)
+    client.force_login(u)
+
+    # One existing booking is reported back instead of duplicated.
+    first_monday = start + datetime.timedelta(days=(0 - start.weekday()) % 7)
+    existing_start = timezone.make_aware(datetime.datetime.combine(first_monday, datetime.time(18)))
+    Booking.objects.create(user=u, activity_class=ac, start=existing_start,
+                           end=existing_start + datetime.timedelta(hours=1))
+
+    url = reverse("class-book-series", args=[ac.slug])
+    params = {"from": start.isoformat(), "until": (start + datetime.timedelta(weeks=8, days=-1)).isoformat()}
+    # Plus one upsert per rollup table (in a savepoint), independent of series length.
+    with django_assert_max_num_queries(12):
+        r = client.post(url, params, HTTP_ACCEPT="application/json")
+
+    results = r.json()["results"]
+    assert len(results) == 16
+    statuses = [item["status"] for item in results]
+    assert statuses.count("already_booked") == 1
+    assert statuses.count("booked") == 15
+    assert Booking.objects.filter(user=u, activity_class=ac).count() == 16
+
+    # Restricting to one rule only touches that rule's sessions.
+    r = client.post(url, {**params, "rule": monday.pk}, HTTP_ACCEPT="application/json")
+    assert {item["status"] for item in r.json()["results"]} == {"already_booked"}
+    assert len(r.json()["results"]) == 8
@@ -0,0 +1,36 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import ActivityClass, Location
+
+User = get_user_model()
+
+
+def _session_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).status_code == 200
+    return sum("django_session" in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_catalog_reads_skip_the_session_table(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    url = reverse("class-list")
+
+    assert _session_queries(client, url) == 0
+
+    # A stale cookie costs one lookup, then the miss is remembered.
+    client.cookies[settings.SESSION_COOKIE_NAME] = "s" * 32
+    assert _session_queries(client, url) == 1
+    client.cookies[settings.SESSION_COOKIE_NAME] = "s" * 32
+    assert _session_queries(client, url) == 0
+
+    User.objects.create_user("leo", "leo@example.com", "pass")
+    client.login(username="leo", password="pass")
+    assert _session_queries(client, url) == 0
+    assert client.get(url).context["user"].is_authenticated
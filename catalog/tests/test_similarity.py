@@ -0,0 +1,46 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import ActivityClass, Booking, Coach, Location, SimilarClass, Tag
+from catalog.similarity import compute_similar
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_similar_classes_rank_shared_signals_and_render(client):
+    kaunas = Location.objects.create(city="Kaunas", address1="Main St")
+    vilnius = Location.objects.create(city="Vilnius", address1="Side St")
+    yoga_tag, calm_tag, box_tag = (Tag.objects.create(name=n, slug=n) for n in ("yoga", "calm", "boxing"))
+    coach = Coach.objects.create(name="Ona")
+
+    yoga = ActivityClass.objects.create(title="Yoga", slug="yoga", location=kaunas, coach=coach)
+    pilates = ActivityClass.objects.create(title="Pilates", slug="pilates", location=kaunas)
+    stretch = ActivityClass.objects.create(title="Stretch", slug="stretch", location=vilnius)
+    boxing = ActivityClass.objects.create(title="Boxing", slug="boxing", location=vilnius, coach=coach)
+    yoga.tags.set([yoga_tag, calm_tag])
+    pilates.tags.set([calm_tag])
+    stretch.tags.set([yoga_tag, calm_tag])
+    boxing.tags.set([box_tag])
+
+    start = timezone.now() + datetime.timedelta(days=1)
+    for name in ("a", "b"):
+        user = User.objects.create_user(name, f"{name}@example.com", "pass")
+        for ac in (yoga, pilates):
+            Booking.objects.create(user=user, activity_class=ac, start=start, end=start + datetime.timedelta(hours=1))
+
+    ranked = [pk for pk, _ in compute_similar()[yoga.pk]]
+    # Pilates shares a tag, the city and both bookers; Stretch only tags; Boxing only the coach.
+    assert ranked == [pilates.pk, stretch.pk, boxing.pk]
+
+    call_command("rebuild_similar_classes", "--top-k", "2")
+    assert SimilarClass.objects.filter(activity_class=yoga).count() == 2
+
+    r = client.get(reverse("class-detail", args=[yoga.slug]))
+    assert [c.title for c in r.context["similar_classes"]] == ["Pilates", "Stretch"]
+    assert b"You may also like" in r.content
@@ -0,0 +1,48 @@
+import pytest
+from django.urls import reverse
+
+from catalog import sitemaps
+from catalog.models import ActivityClass, Location
+
+
+@pytest.fixture
+def sitemap_settings(settings, tmp_path, monkeypatch):
+    settings.SITEMAP_ROOT = tmp_path
+    settings.SITE_URL = "https://sportsfinder.test/"
+    monkeypatch.setattr(sitemaps, "CHUNK_SIZE", 2)
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_sitemaps_rebuild_only_changed_chunks(client, sitemap_settings):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    classes = [ActivityClass.objects.create(title=f"Class {i}", slug=f"class-{i}", location=loc) for i in range(5)]
+    chunks = {c.pk // 2 for c in classes}
+
+    r = client.get(reverse("sitemap-index"))  # built on first request
+    index = b"".join(r.streaming_content).decode()
+    assert index.count("<sitemap>") == len(chunks)
+    assert r["Cache-Control"] == "public, max-age=3600"
+
+    first = sitemaps.chunk_name(classes[0].pk // 2)
+    body = b"".join(client.get(reverse("sitemap-chunk", args=[first])).streaming_content).decode()
+    assert f"<loc>https://sportsfinder.test/classes/{classes[0].slug}/</loc>" in body
+
+    assert sitemaps.build_sitemaps() == (0, len(chunks))
+    classes[-1].title = "Renamed"
+    classes[-1].save()
+    assert sitemaps.build_sitemaps() == (1, len(chunks) - 1)
+
+    ActivityClass.objects.filter(pk__in=[c.pk for c in classes if c.pk // 2 == classes[0].pk // 2]).delete()
+    sitemaps.build_sitemaps()
+    assert not (sitemap_settings / first).exists()
+    assert client.get(reverse("sitemap-chunk", args=[first])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_latest_classes_feed(client):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    r = client.get(reverse("class-feed"))
+    assert r.status_code == 200
+    assert b"Yoga (Kaunas)" in r.content
@@ -0,0 +1,61 @@
+import datetime
+
+import pytest
+
+from catalog import snapshot as schedule_snapshot
+from catalog.models import ActivityClass, Location, ScheduleRule
+from catalog.utils import occurrences_for_rules
+
+
+@pytest.fixture
+def snapshot_file(settings, tmp_path):
+    settings.SCHEDULE_SNAPSHOT_PATH = tmp_path / "schedule.snapshot"
+    schedule_snapshot._attachment.reset()
+    yield settings.SCHEDULE_SNAPSHOT_PATH
+    schedule_snapshot._attachment.reset()
+
+
+@pytest.mark.django_db
+def test_snapshot_round_trip_and_hot_swap(snapshot_file, django_assert_num_queries):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    yoga = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    box = ActivityClass.objects.create(title="Boxing", slug="boxing", location=loc)
+    ScheduleRule.objects.create(activity_class=yoga, weekday=0, time=datetime.time(17, 30),
+                                end_date=datetime.date(2030, 1, 1), interval=2)
+    ScheduleRule.objects.create(activity_class=yoga, weekday=2, time=datetime.time(9))
+    ScheduleRule.objects.create(activity_class=box, weekday=4, time=datetime.time(18), active=False)
+
+    assert schedule_snapshot.get_snapshot() is None
+    schedule_snapshot.build_snapshot()
+    snap = schedule_snapshot.get_snapshot()
+    assert len(snap) == 2
+
+    with django_assert_num_queries(0):
+        rules = snap.rules_for(yoga.pk)
+        assert snap.rules_for(box.pk) == []
+        assert len(occurrences_for_rules(rules, days_ahead=14)) >= 2
+    assert [(r.weekday, r.time, r.interval) for r in rules] == [
+        (0, datetime.time(17, 30), 2), (2, datetime.time(9), 1),
+    ]
+    assert rules[0].end_date == datetime.date(2030, 1, 1)
+    assert rules[1].end_date is None
+
+    ScheduleRule.objects.filter(activity_class=box).update(active=True)
+    schedule_snapshot.build_snapshot()
+    swapped = schedule_snapshot.get_snapshot()
+    assert swapped.generation > snap.generation
+    assert len(swapped.rules_for(box.pk)) == 1
+
+
+@pytest.mark.django_db
+def test_schedule_changes_retire_the_snapshot(snapshot_file):
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    yoga = ActivityClass.objects.create(title="Yoga", slug="yoga", location=loc)
+    rule = ScheduleRule.objects.create(activity_class=yoga, weekday=0, time=datetime.time(17, 30))
+    schedule_snapshot.build_snapshot()
+    assert schedule_snapshot.get_snapshot() is not None
+
+    rule.delete()
+    assert schedule_snapshot.get_snapshot() is None
+    schedule_snapshot.build_snapshot()
+    assert schedule_snapshot.get_snapshot().rules_for(yoga.pk) == []
@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import Client
+
+from sportsfinder.staticfiles import accepted_encodings
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "sportsfinder.staticfiles.CompressedManifestStaticFilesStorage"},
+    }
+    settings.STATIC_SERVING = {"ENABLED": True}
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_collectstatic_writes_hashed_and_compressed_files(collected):
+    url = static("css/dist/styles.css")
+    assert url != "/static/css/dist/styles.css"  # manifest name with a hash
+    hashed = collected / url.removeprefix("/static/")
+    assert hashed.exists()
+    assert gzip.decompress((collected / f"{hashed.relative_to(collected)}.gz").read_bytes()) == hashed.read_bytes()
+
+
+def test_middleware_serves_precompressed_immutable_files(collected):
+    client = Client()
+    url = static("css/dist/styles.css")
+    raw = (collected / url.removeprefix("/static/")).read_bytes()
+
+    r = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert r["Content-Encoding"] == "gzip"
+    assert r["Content-Type"].startswith("text/css")
+    assert r["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert r["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(b"".join(r.streaming_content)) == raw
+
+    plain = client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+    assert not plain.has_header("Content-Encoding")
+    assert b"".join(plain.streaming_content) == raw
+
+    assert plain["ETag"] != r["ETag"] and r["ETag"].endswith('-gzip"')
+    assert plain["Vary"] == "Accept-Encoding"
+    assert client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=r["ETag"]).status_code == 304
+    # A cached gzip body does not validate an identity request.
+    assert client.get(url, HTTP_IF_NONE_MATCH=r["ETag"]).status_code == 200
+    assert client.get("/static/css/dist/styles.css")["Cache-Control"] == "public, max-age=60"
+    assert client.post(url).status_code == 405
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("br;q=1.0, gzip;q=0, *") == {"br", "*"}
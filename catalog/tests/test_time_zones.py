@@ -0,0 +1,51 @@
+import datetime
+import zoneinfo
+
+import pytest
+
+from catalog.models import ActivityClass, Location, ScheduleRule
+from catalog.utils import expand_rules, occurrences_for_rules
+from catalog.zones import localizer
+
+
+def test_localizer_matches_zoneinfo_across_dst():
+    zone = zoneinfo.ZoneInfo("Europe/Vilnius")
+    first, last = datetime.date(2030, 3, 20), datetime.date(2030, 4, 5)
+    localize = localizer(zone, first, last)
+    day = first
+    while day <= last:
+        for t in (datetime.time(0, 30), datetime.time(3, 30), datetime.time(18)):
+            expected = datetime.datetime.combine(day, t, tzinfo=zone)
+            got = localize(day, t)
+            assert got == expected
+            assert got.utcoffset() == expected.utcoffset()
+        day += datetime.timedelta(days=1)
+
+
+@pytest.mark.django_db
+def test_sessions_expand_in_venue_time_zone():
+    vilnius = Location.objects.create(city="Vilnius", address1="Gedimino", time_zone="Europe/Vilnius")
+    lisbon = Location.objects.create(city="Lisbon", address1="Rua", time_zone="Europe/Lisbon")
+    for loc in (vilnius, lisbon):
+        ac = ActivityClass.objects.create(title=f"Yoga {loc.city}", slug=f"yoga-{loc.city}", location=loc)
+        ScheduleRule.objects.create(activity_class=ac, weekday=0, time=datetime.time(18),
+                                    start_date=datetime.date(2030, 1, 1))
+
+    start = datetime.datetime(2030, 3, 18, tzinfo=datetime.timezone.utc)
+    end = start + datetime.timedelta(days=14)
+    by_city = {
+        ac.location.city: expand_rules(ac, start, end)
+        for ac in ActivityClass.objects.select_related("location")
+    }
+
+    # Both Mondays fall before the EU DST switch on Mar 31 (checked below).
+    vilnius_utc = [s["start"].astimezone(datetime.timezone.utc).hour for s in by_city["Vilnius"]]
+    lisbon_utc = [s["start"].astimezone(datetime.timezone.utc).hour for s in by_city["Lisbon"]]
+    assert vilnius_utc == [16, 16]
+    assert lisbon_utc == [18, 18]
+    assert all(s["start"].hour == 18 for sessions in by_city.values() for s in sessions)
+
+    rules = list(ScheduleRule.objects.filter(activity_class__location=vilnius))
+    after_switch = occurrences_for_rules(rules, days_ahead=7, tz=zoneinfo.ZoneInfo("Europe/Vilnius"),
+                                         from_dt=datetime.datetime(2030, 3, 31, tzinfo=datetime.timezone.utc))
+    assert after_switch[0].astimezone(datetime.timezone.utc).hour == 15
@@ -1,8 +1,18 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
+from .feeds import LatestClassesFeed
 
 urlpatterns = [
     path("classes/", views.ActivityClassList.as_view(), name="class-list"),
+    path("autocomplete.json", views.autocomplete, name="autocomplete"),
     path("classes/<slug:slug>/book/", views.book_session, name="class-book"),
+    path("classes/<slug:slug>/book-series/", views.book_series, name="class-book-series"),
     path("classes/<slug:slug>/", views.ActivityClassDetail.as_view(), name="class-detail"),
+    path("bookings/", views.my_bookings, name="my-bookings"),
+    path("bookings.json", views.my_bookings_json, name="my-bookings-json"),
+    path("bookings/<int:pk>/cancel/", views.cancel_booking, name="booking-cancel"),
+    path("analytics/", views.analytics, name="analytics"),
+    path("sitemap.xml", views.sitemap_index, name="sitemap-index"),
+    re_path(r"^sitemaps/(?P<name>classes-\d{5}\.xml)$", views.sitemap_chunk, name="sitemap-chunk"),
+    path("classes/feed.atom", LatestClassesFeed(), name="class-feed"),
 ]
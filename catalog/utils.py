@@ -1,20 +1,39 @@
 from __future__ import annotations
 
+import base64
+import bisect
 import datetime as dt
+import heapq
 import json
-from typing import Dict, List, Tuple
+import logging
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
+from django.db import connection
+from django.db.models import Prefetch, Q
 from django.utils import timezone
 from django.core.signing import BadSignature, Signer
+from django.dispatch import Signal
 
-from .models import ActivityClass, ScheduleRule
+from . import cache as catalog_cache
+from .intervals import IntervalIndex
+from .models import ActivityClass, Booking, OneOffSession, ScheduleException, ScheduleRule
+from .rollups import apply_booking_deltas
+from .zones import class_zone, localizer, zone_for
 
 
-DEFAULT_SESSION_DURATION = dt.timedelta(hours=1)
+logger = logging.getLogger(__name__)
 
 
 SESSION_TOKEN_SALT = "catalog.session-token"
 
+BOOKING_WINDOW = dt.timedelta(days=60)
+
+# How many upcoming start times are denormalized onto ActivityClass, and how
+# far ahead `refresh_next_sessions` looks for them.
+NEXT_SESSIONS_COUNT = 3
+NEXT_SESSIONS_HORIZON_DAYS = 28
+
 
 def _ensure_aware(dt_value: dt.datetime) -> dt.datetime:
     if dt_value.tzinfo is None:
@@ -71,10 +90,13 @@ def decode_occurrence_token(
     if not required_keys.issubset(data):
         raise ValueError("Incomplete session token payload.")
 
-    try:
-        activity_class = ActivityClass.objects.get(pk=data["class_id"])
-    except ActivityClass.DoesNotExist as exc:
-        raise ValueError("Session token references an unknown class.") from exc
+    activity_class = catalog_cache.get_or_set(
+        "classes",
+        f"pk:{data['class_id']}",
+        lambda: ActivityClass.objects.filter(pk=data["class_id"]).first(),
+    )
+    if activity_class is None:
+        raise ValueError("Session token references an unknown class.")
 
     try:
         start_dt = dt.datetime.fromisoformat(data["start"])
@@ -91,44 +113,123 @@ def decode_occurrence_token(
     now = timezone.now().astimezone(timezone.get_current_timezone())
     if start_dt < now:
         raise ValueError("Session token points to a past occurrence.")
-    if start_dt > now + dt.timedelta(days=60):
+    if start_dt > now + BOOKING_WINDOW:
         raise ValueError("Session token is outside the 60-day booking window.")
 
     return activity_class, start_dt, end_dt
 
 
+def class_rules(activity_class_id: int) -> List[ScheduleRule]:
+    """Return the active weekly rules of a class, served from the catalog cache."""
+
+    return catalog_cache.get_or_set(
+        "schedule",
+        activity_class_id,
+        lambda: list(ScheduleRule.objects.filter(activity_class_id=activity_class_id, active=True)),
+    )
+
+
+class ScheduleCalendar(NamedTuple):
+    """Exceptions for one class over a date window, shaped for fast lookups.
+
+    ``skip_dates`` is a set of local dates without weekly sessions;
+    ``extra_starts`` is a sorted tuple of one-off session starts and
+    ``extra_durations`` holds their durations at the same positions.
+    """
+
+    skip_dates: FrozenSet[dt.date] = frozenset()
+    extra_starts: Tuple[dt.datetime, ...] = ()
+    extra_durations: Tuple[dt.timedelta, ...] = ()
+
+
+EMPTY_CALENDAR = ScheduleCalendar()
+
+
+def calendars_for(classes: Iterable, start_date: dt.date, end_date: dt.date) -> Dict[int, ScheduleCalendar]:
+    """Load exceptions and one-off sessions for many classes in two queries.
+
+    ``classes`` need ``pk`` and ``location_id``. Both queries are range scans
+    bounded by the window, so their cost does not grow with years of past
+    exceptions.
+    """
+
+    classes = list(classes)
+    if not classes:
+        return {}
+    class_ids = {c.pk for c in classes}
+    location_ids = {c.location_id for c in classes}
+
+    by_class: Dict[int, set] = defaultdict(set)
+    by_location: Dict[int, set] = defaultdict(set)
+    exceptions = (ScheduleException.objects
+                  .filter(Q(activity_class_id__in=class_ids) | Q(location_id__in=location_ids),
+                          date__range=(start_date, end_date))
+                  .values_list("activity_class_id", "location_id", "date"))
+    for class_id, location_id, day in exceptions:
+        if class_id is not None:
+            by_class[class_id].add(day)
+        else:
+            by_location[location_id].add(day)
+
+    # Local dates differ per venue, so bound the query in UTC with a day of
+    # slack on each side; expansion bisects the exact window out of it.
+    window_start = dt.datetime.combine(start_date - dt.timedelta(days=1), dt.time.min, tzinfo=dt.timezone.utc)
+    window_end = dt.datetime.combine(end_date + dt.timedelta(days=2), dt.time.min, tzinfo=dt.timezone.utc)
+    extras: Dict[int, list] = defaultdict(list)
+    one_offs = (OneOffSession.objects
+                .filter(activity_class_id__in=class_ids, start__gte=window_start, start__lt=window_end)
+                .order_by("start")
+                .values_list("activity_class_id", "start", "duration_minutes"))
+    for class_id, start, minutes in one_offs:
+        if minutes < 1:
+            logger.warning("Skipping one-off session of class %s at %s: duration is %s minutes.",
+                           class_id, start, minutes)
+            continue
+        extras[class_id].append((start, dt.timedelta(minutes=minutes)))
+
+    return {
+        c.pk: ScheduleCalendar(
+            frozenset(by_class[c.pk] | by_location[c.location_id]),
+            tuple(start for start, _ in extras[c.pk]),
+            tuple(duration for _, duration in extras[c.pk]),
+        )
+        for c in classes
+    }
+
+
 def expand_rules(activity_class, start_dt: dt.datetime, end_dt: dt.datetime) -> List[Dict[str, dt.datetime]]:
     """Expand weekly `ScheduleRule`s into concrete sessions between the given bounds.
 
-    Returns a list of dicts shaped like ``{"start": datetime, "end": datetime}``,
-    sorted ascending by ``start``. The body currently implements a basic weekly
-    recurrence using each rule's ``next_occurrences`` helper.
+    Sessions are generated in the time zone of the class's location. Returns a list of dicts shaped like ``{"start": datetime, "end": datetime}``,
+    sorted ascending by ``start``. Rule dates come from `rule_dates`; dates
+    closed by a `ScheduleException` are dropped and `OneOffSession`s (whose
+    ``rule`` is ``None``) merged in.
     """
 
-    tz = timezone.get_current_timezone()
+    tz = class_zone(activity_class)
     start_dt = start_dt.astimezone(tz)
     end_dt = end_dt.astimezone(tz)
+    localize = localizer(tz, start_dt.date(), end_dt.date())
 
     sessions: List[Dict[str, dt.datetime]] = []
-    span_days = max((end_dt - start_dt).days + 1, 1)
-    approx_count = span_days // 7 + 8  # buffer to account for interval rules
 
-    rules = ScheduleRule.objects.filter(activity_class=activity_class)
-    for rule in rules.select_related("activity_class"):
-        if not getattr(rule, "active", True) or not rule.time:
+    calendar = calendars_for([activity_class], start_dt.date(), end_dt.date())[activity_class.pk]
+    class_id = activity_class.pk
+
+    for rule in class_rules(activity_class.pk):
+        if rule.time is None or rule.weekday is None or not _has_duration(rule):
             continue
 
-        occurrences = rule.next_occurrences(count=approx_count, from_date=start_dt.date())
-        for occ_date in occurrences:
-            naive_start = dt.datetime.combine(occ_date, rule.time)
-            start = timezone.make_aware(naive_start, tz)
+        for occ_date in rule_dates(rule, start_dt.date(), end_dt.date()):
+            if occ_date in calendar.skip_dates:
+                continue
+            start = localize(occ_date, rule.time)
             if start < start_dt:
                 continue
             if start >= end_dt:
                 break
 
-            end = start + DEFAULT_SESSION_DURATION
-            class_id = getattr(activity_class, "pk", None) or rule.activity_class_id
+            end = start + rule.duration
             sessions.append({
                 "start": start,
                 "end": end,
@@ -136,5 +237,348 @@ def expand_rules(activity_class, start_dt: dt.datetime, end_dt: dt.datetime) ->
                 "token": make_occurrence_token(class_id, start, end),
             })
 
+    lo = bisect.bisect_left(calendar.extra_starts, start_dt)
+    hi = bisect.bisect_left(calendar.extra_starts, end_dt)
+    for start, duration in zip(calendar.extra_starts[lo:hi], calendar.extra_durations[lo:hi]):
+        start = start.astimezone(tz)
+        end = start + duration
+        sessions.append({
+            "start": start,
+            "end": end,
+            "rule": None,
+            "token": make_occurrence_token(class_id, start, end),
+        })
+
     sessions.sort(key=lambda item: item["start"])
     return sessions
+
+
+def _has_duration(rule) -> bool:
+    """Whether ``rule`` yields sessions; rows that slipped past the check constraint are logged."""
+
+    if rule.duration_minutes >= 1:
+        return True
+    logger.warning("Skipping schedule rule %s: duration is %s minutes.", rule.pk, rule.duration_minutes)
+    return False
+
+
+def rule_dates(rule, first_day: dt.date, last_day: dt.date) -> Iterator[dt.date]:
+    """Local dates in ``[first_day, last_day]`` on which a weekly rule runs.
+
+    Honours the rule's ``start_date``/``end_date`` and its every-``interval``-
+    weeks cadence, counted from the first matching weekday on or after
+    ``start_date``. ``rule`` may be a `ScheduleRule` or a snapshot row.
+    """
+
+    begin = max(first_day, rule.start_date)
+    end = min(last_day, rule.end_date) if rule.end_date else last_day
+    anchor = rule.start_date + dt.timedelta(days=(rule.weekday - rule.start_date.weekday()) % 7)
+    day = begin + dt.timedelta(days=(rule.weekday - begin.weekday()) % 7)
+    step = dt.timedelta(weeks=max(rule.interval, 1))
+    # Align to the rule's own every-N-weeks cadence.
+    offset_weeks = ((day - anchor).days // 7) % max(rule.interval, 1)
+    if offset_weeks:
+        day += dt.timedelta(weeks=max(rule.interval, 1) - offset_weeks)
+    while day <= end:
+        yield day
+        day += step
+
+
+def occurrences_for_rules(
+    rules: Iterable["ScheduleRule"],
+    days_ahead: int = 14,
+    tz: Optional[dt.tzinfo] = None,
+    from_dt: Optional[dt.datetime] = None,
+    calendar: ScheduleCalendar = EMPTY_CALENDAR,
+) -> List[dt.datetime]:
+    """
+    Expand weekly rules into concrete datetimes for the next `days_ahead` days,
+    starting from `from_dt` (default: now). Returns a sorted list (ascending).
+
+    Dates come from `rule_dates`, so rules that have ended, have not started
+    yet or run every other week are expanded correctly. `calendar` (see
+    `calendars_for`) removes skipped dates with a set lookup per day and
+    merges one-off starts, already sorted, in a single pass.
+    """
+    tz = tz or timezone.get_current_timezone()
+    start_moment = (from_dt or timezone.now()).astimezone(tz)
+    start_date = start_moment.date()
+    last_date = start_date + dt.timedelta(days=days_ahead)
+    localize = localizer(tz, start_date, last_date + dt.timedelta(days=1))
+    results: List[dt.datetime] = []
+
+    for r in rules:
+        if r.time is None or r.weekday is None or not _has_duration(r):
+            continue
+        for day in rule_dates(r, start_date, last_date):
+            if day in calendar.skip_dates:
+                continue
+            local_dt = localize(day, r.time)  # DST-safe, see localizer()
+            # Skip times earlier than the start moment (same-day guard)
+            if local_dt >= start_moment:
+                results.append(local_dt)
+
+    results.sort()
+    if calendar.extra_starts:
+        end_moment = localize(last_date + dt.timedelta(days=1), dt.time.min)
+        lo = bisect.bisect_left(calendar.extra_starts, start_moment)
+        hi = bisect.bisect_left(calendar.extra_starts, end_moment)
+        results = list(heapq.merge(results, (e.astimezone(tz) for e in calendar.extra_starts[lo:hi])))
+    return results
+
+
+def day_sessions_index(day: dt.date) -> IntervalIndex:
+    """Interval index of every session on ``day``, keyed by class id.
+
+    Bounds are venue-local minutes since midnight, so "what's on between
+    18:00 and 20:00" means the same wall-clock window in every city. The
+    index is built from three queries and cached in the ``schedule``
+    namespace; window queries against it are bisects.
+    """
+
+    return catalog_cache.get_or_set("schedule", f"day:{day.isoformat()}", lambda: _build_day_index(day))
+
+
+def _build_day_index(day: dt.date) -> IntervalIndex:
+    closed_classes, closed_locations = set(), set()
+    for class_id, location_id in ScheduleException.objects.filter(date=day).values_list("activity_class_id",
+                                                                                       "location_id"):
+        if class_id is not None:
+            closed_classes.add(class_id)
+        else:
+            closed_locations.add(location_id)
+
+    intervals = []
+    rules = (ScheduleRule.objects
+             .filter(active=True, weekday=day.weekday(), time__isnull=False, start_date__lte=day)
+             .filter(Q(end_date__isnull=True) | Q(end_date__gte=day))
+             .values_list("activity_class_id", "activity_class__location_id", "time",
+                          "duration_minutes", "start_date", "interval"))
+    for class_id, location_id, time_of_day, minutes, start_date, interval in rules:
+        if class_id in closed_classes or location_id in closed_locations:
+            continue
+        first = start_date + dt.timedelta(days=(day.weekday() - start_date.weekday()) % 7)
+        if (day - first).days % (7 * max(interval, 1)):
+            continue
+        start = time_of_day.hour * 60 + time_of_day.minute
+        intervals.append((start, start + minutes, class_id))
+
+    window_start = dt.datetime.combine(day - dt.timedelta(days=1), dt.time.min, tzinfo=dt.timezone.utc)
+    window_end = dt.datetime.combine(day + dt.timedelta(days=2), dt.time.min, tzinfo=dt.timezone.utc)
+    one_offs = (OneOffSession.objects
+                .filter(start__gte=window_start, start__lt=window_end)
+                .values_list("activity_class_id", "start", "duration_minutes",
+                             "activity_class__location__time_zone"))
+    for class_id, start, minutes, zone_name in one_offs:
+        local = start.astimezone(zone_for(zone_name))
+        if local.date() != day:
+            continue
+        begin = local.hour * 60 + local.minute
+        intervals.append((begin, begin + minutes, class_id))
+
+    return IntervalIndex(intervals)
+
+
+def scheduled_sessions(since: dt.date, until: dt.date) -> Dict[Tuple[int, dt.date], int]:
+    """Scheduled sessions per ``(class id, week)`` for the weeks ``since``..``until``.
+
+    Both bounds and the returned weeks are Mondays. Weekly rule dates
+    (minus exceptions) and one-off sessions are counted by venue-local
+    date, booked or not; the analytics fill rates are computed over these.
+    Three queries and no model instances, like `day_sessions_index`.
+    """
+
+    first_day, last_day = since, until + dt.timedelta(days=6)
+    closed_classes: Dict[int, set] = defaultdict(set)
+    closed_locations: Dict[int, set] = defaultdict(set)
+    exceptions = (ScheduleException.objects
+                  .filter(date__range=(first_day, last_day))
+                  .values_list("activity_class_id", "location_id", "date"))
+    for class_id, location_id, day in exceptions:
+        if class_id is not None:
+            closed_classes[class_id].add(day)
+        else:
+            closed_locations[location_id].add(day)
+
+    counts: Dict[Tuple[int, dt.date], int] = defaultdict(int)
+    rules = (ScheduleRule.objects
+             .filter(active=True, weekday__isnull=False, time__isnull=False, start_date__lte=last_day)
+             .filter(Q(end_date__isnull=True) | Q(end_date__gte=first_day))
+             .values_list("activity_class_id", "activity_class__location_id", "weekday",
+                          "start_date", "end_date", "interval", named=True))
+    for rule in rules:
+        class_closed = closed_classes.get(rule.activity_class_id, ())
+        location_closed = closed_locations.get(rule.activity_class__location_id, ())
+        for day in rule_dates(rule, first_day, last_day):
+            if day not in class_closed and day not in location_closed:
+                counts[rule.activity_class_id, day - dt.timedelta(days=day.weekday())] += 1
+
+    window_start = dt.datetime.combine(first_day - dt.timedelta(days=1), dt.time.min, tzinfo=dt.timezone.utc)
+    window_end = dt.datetime.combine(last_day + dt.timedelta(days=2), dt.time.min, tzinfo=dt.timezone.utc)
+    one_offs = (OneOffSession.objects
+                .filter(start__gte=window_start, start__lt=window_end)
+                .values_list("activity_class_id", "start", "activity_class__location__time_zone"))
+    for class_id, start, zone_name in one_offs:
+        day = start.astimezone(zone_for(zone_name)).date()
+        if first_day <= day <= last_day:
+            counts[class_id, day - dt.timedelta(days=day.weekday())] += 1
+
+    return dict(counts)
+
+
+# Sent by `refresh_next_sessions` with the ``class_ids`` that gained or lost
+# an upcoming session. bulk_update sends no post_save, so listeners that
+# depend on ``next_session_at`` being set (the search boost) hook in here.
+upcoming_changed = Signal()
+
+
+def refresh_next_sessions(class_ids: Optional[Iterable[int]] = None, now: Optional[dt.datetime] = None) -> int:
+    """Recompute ``next_session_at``/``next_session_times`` and return the row count.
+
+    Runs over every class unless ``class_ids`` narrows it down. Called by the
+    ``refresh_next_sessions`` command on a schedule and by the schedule
+    signals for the affected classes.
+    """
+
+    now = now or timezone.now()
+    qs = ActivityClass.objects.select_related("location").only(
+        "pk", "next_session_at", "location__time_zone",
+    ).prefetch_related(
+        Prefetch("weekly_rules", queryset=ScheduleRule.objects.filter(active=True))
+    )
+    if class_ids is not None:
+        qs = qs.filter(pk__in=list(class_ids))
+
+    # Venues disagree on what "today" is; a day of slack covers every zone.
+    first_day = now.astimezone(dt.timezone.utc).date() - dt.timedelta(days=1)
+    last_day = first_day + dt.timedelta(days=NEXT_SESSIONS_HORIZON_DAYS + 2)
+
+    def flush(batch: List[ActivityClass]) -> int:
+        calendars = calendars_for(batch, first_day, last_day)
+        toggled = []
+        for obj in batch:
+            times = occurrences_for_rules(obj.weekly_rules.all(), days_ahead=NEXT_SESSIONS_HORIZON_DAYS,
+                                          tz=class_zone(obj), from_dt=now, calendar=calendars[obj.pk])
+            times = times[:NEXT_SESSIONS_COUNT]
+            if (obj.next_session_at is None) != (not times):
+                toggled.append(obj.pk)
+            obj.next_session_at = times[0] if times else None
+            obj.next_session_times = [t.isoformat() for t in times]
+        updated = ActivityClass.objects.bulk_update(batch, ["next_session_at", "next_session_times"])
+        if toggled:
+            upcoming_changed.send(sender=ActivityClass, class_ids=toggled)
+        return updated
+
+    updated = 0
+    batch: List[ActivityClass] = []
+    for obj in qs.order_by("pk").iterator(chunk_size=500):
+        batch.append(obj)
+        if len(batch) >= 500:
+            updated += flush(batch)
+            batch = []
+    if batch:
+        updated += flush(batch)
+    return updated
+
+
+def encode_cursor(start_dt: dt.datetime, pk: int) -> str:
+    """Opaque keyset cursor for ``(start, id)``-ordered listings."""
+
+    raw = f"{_ensure_aware(start_dt).astimezone(dt.timezone.utc).isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[dt.datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_raw, pk_raw = raw.split("|", 1)
+        return _ensure_aware(dt.datetime.fromisoformat(start_raw)), int(pk_raw)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Malformed cursor.") from exc
+
+
+def _upsert_bookings(user, activity_class, sessions, now: dt.datetime) -> set:
+    """Insert confirmed bookings, reviving cancelled ones, and return the starts written.
+
+    One ``INSERT ... ON CONFLICT DO UPDATE ... WHERE status = cancelled
+    RETURNING`` (PostgreSQL and SQLite share the syntax, as in
+    `rollups._add_counts`): rows that are already confirmed, including ones
+    a concurrent request wrote after our read, are left alone and not
+    returned.
+    """
+
+    meta = Booking._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    names = ("user", "activity_class", "start", "end", "status", "created_at")
+    columns = [qn(meta.get_field(name).column) for name in names]
+    start_field, end_field, created_field = (meta.get_field(name) for name in ("start", "end", "created_at"))
+    created = created_field.get_db_prep_save(now, connection)
+    params = []
+    for session in sessions:
+        params += [user.pk, activity_class.pk, start_field.get_db_prep_save(session["start"], connection),
+                   end_field.get_db_prep_save(session["end"], connection), Booking.STATUS_CONFIRMED, created]
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(sessions))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders} "
+            f"ON CONFLICT ({', '.join(columns[:3])}) DO UPDATE SET {columns[4]} = EXCLUDED.{columns[4]} "
+            f"WHERE {table}.{columns[4]} = %s RETURNING {columns[2]}",
+            params + [Booking.STATUS_CANCELLED],
+        )
+        returned = [value for value, in cursor.fetchall()]
+    start_col = start_field.get_col(meta.db_table)
+    for convert in connection.ops.get_db_converters(start_col) + start_field.get_db_converters(connection):
+        returned = [convert(value, start_col, connection) for value in returned]
+    return set(returned)
+
+
+def book_sessions(user, activity_class, sessions, now: Optional[dt.datetime] = None) -> List[Dict]:
+    """Book many occurrences of one class for ``user`` in a fixed number of queries.
+
+    ``sessions`` are dicts with ``start``/``end`` as produced by
+    `expand_rules`. Every occurrence is validated up front; existing
+    bookings are looked up with one query and the rest are inserted, or
+    revived if cancelled, by a single upsert (`_upsert_bookings`). Returns
+    one result dict per session, in input order, with ``status`` set to
+    ``booked``, ``rebooked``, ``already_booked`` or ``rejected``. Sessions a
+    concurrent request booked first come back as ``already_booked``.
+    """
+
+    now = now or timezone.now()
+    results: List[Dict] = []
+    valid: List[Dict] = []
+    for session in sessions:
+        result = {"start": session["start"], "end": session["end"], "status": "booked"}
+        if session["start"] < now:
+            result.update(status="rejected", reason="Session has already started.")
+        elif session["start"] > now + BOOKING_WINDOW:
+            result.update(status="rejected", reason="Session is outside the booking window.")
+        else:
+            valid.append(session)
+        results.append(result)
+
+    if not valid:
+        return results
+
+    existing = dict(
+        Booking.objects
+        .filter(user=user, activity_class=activity_class, start__in=[s["start"] for s in valid])
+        .values_list("start", "status")
+    )
+
+    to_write = [s for s in valid if existing.get(s["start"]) != Booking.STATUS_CONFIRMED]
+    written = _upsert_bookings(user, activity_class, to_write, now) if to_write else set()
+
+    # The upsert sends no post_save, so the rollups are updated here, for
+    # the rows this call actually inserted or revived.
+    apply_booking_deltas(activity_class.pk, {start: 1 for start in written}, activity_class=activity_class)
+
+    for result in results:
+        if result["status"] != "booked":
+            continue
+        if result["start"] not in written:
+            result["status"] = "already_booked"
+        elif existing.get(result["start"]) == Booking.STATUS_CANCELLED:
+            result["status"] = "rebooked"
+    return results
@@ -1,57 +1,82 @@
 import datetime as dt
 import datetime
 from datetime import timedelta
-from typing import Iterable, List, Optional
+from decimal import Decimal
 
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from django.shortcuts import get_object_or_404, redirect
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Lower
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_POST
 from django.utils import timezone
-from collections import defaultdict
 from django.views.generic import ListView, DetailView
 
-from .models import ActivityClass, Booking, Tag, Location, ScheduleRule
-from .utils import decode_occurrence_token, expand_rules, make_occurrence_token
+from sportsfinder.ratelimit import ratelimit
+
+from . import autocomplete as catalog_autocomplete, cache as catalog_cache, sitemaps
+from .cards import build_cards
+from .models import ActivityClass, Booking, ClassWeekRollup, SimilarClass, Tag, Location, ScheduleRule
+from .snapshot import get_snapshot
+from .utils import (
+    book_sessions,
+    calendars_for,
+    class_rules,
+    day_sessions_index,
+    decode_cursor,
+    decode_occurrence_token,
+    encode_cursor,
+    expand_rules,
+    make_occurrence_token,
+    occurrences_for_rules,
+    scheduled_sessions,
+)
+from .zones import class_zone
+
+
+def _minutes(value, default):
+    """Parse ``HH:MM`` into minutes since midnight."""
+    try:
+        parsed = dt.time.fromisoformat(value.strip())
+    except ValueError:
+        return default
+    return parsed.hour * 60 + parsed.minute
 
 
-def occurrences_for_rules(
-    rules: Iterable["ScheduleRule"],
-    days_ahead: int = 14,
-    tz: Optional[dt.tzinfo] = None,
-    from_dt: Optional[dt.datetime] = None,
-) -> List[dt.datetime]:
-    """
-    Expand weekly rules into concrete datetimes for the next `days_ahead` days,
-    starting from `from_dt` (default: now). Returns a sorted list (ascending).
+class _ClassesOnDay:
+    """The class list narrowed to ids from a day's interval index, for the paginator.
+
+    A busy day can match most of the catalog, so instead of one huge
+    ``pk IN (...)`` the other filters' ordered pks are read as a single
+    column and intersected with the index in Python; only the requested
+    page's rows are then loaded.
     """
-    tz = tz or timezone.get_current_timezone()
-    start_moment = (from_dt or timezone.now()).astimezone(tz)
-    start_date = start_moment.date()
-    results: List[dt.datetime] = []
-    by_weekday: dict[int, list] = defaultdict(list)
-
-    # Pre-group rules by weekday (0=Mon..6=Sun)
-    for r in rules:
-        by_weekday[r.weekday].append(r)
-
-    for offset in range(days_ahead + 1):
-        day = start_date + dt.timedelta(days=offset)
-        wk = day.weekday()
-        if wk not in by_weekday:
-            continue
 
-        for r in by_weekday[wk]:
-            naive = dt.datetime.combine(day, r.time)
-            local_dt = timezone.make_aware(naive, tz)  # zoneinfo-safe
+    def __init__(self, queryset, class_ids):
+        self.queryset = queryset
+        self.class_ids = class_ids
+        self._pks = None
 
-            # Skip times earlier than the start moment (same-day guard)
-            if local_dt >= start_moment:
-                results.append(local_dt)
+    def _matching(self):
+        if self._pks is None:
+            self._pks = [pk for pk in self.queryset.values_list("pk", flat=True) if pk in self.class_ids]
+        return self._pks
 
-    results.sort()
-    return results
+    def count(self):
+        return len(self._matching())
 
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1 or None][0]
+        pks = self._matching()[index]
+        rows = self.queryset.in_bulk(pks)
+        return [rows[pk] for pk in pks]
 
 
 class ActivityClassList(ListView):
@@ -60,59 +85,110 @@ class ActivityClassList(ListView):
     context_object_name = "classes"
     paginate_by = 12
 
+    SORT_ORDERINGS = {
+        "title": ("title",),
+        "soonest": (F("next_session_at").asc(nulls_last=True), "title"),
+    }
+    WITHIN_CHOICES = (1, 3, 7, 14)  # days
+
     def get_queryset(self):
+        sort = self.request.GET.get("sort", "").strip()
         qs = (ActivityClass.objects
-              .select_related("location", "coach")
-              .prefetch_related("tags", "weekly_rules")
-              .order_by("title"))
+              .select_related("location", "coach__user")
+              .prefetch_related("tags")
+              .order_by(*self.SORT_ORDERINGS.get(sort, self.SORT_ORDERINGS["title"])))
 
         q = self.request.GET.get("q", "").strip()
         tag = self.request.GET.get("tag", "").strip()
         city = self.request.GET.get("city", "").strip()
+        coach = self.request.GET.get("coach", "").strip()
         date_str = self.request.GET.get("date", "").strip()
+        within = self.request.GET.get("within", "").strip()
 
         if q:
             qs = qs.filter(Q(title__icontains=q) | Q(description__icontains=q))
 
         if tag:
-            # allow slug or id
-            qs = qs.filter(Q(tags__slug=tag) | Q(tags__id__iexact=tag))
+            # allow slug or id; a plain slug lookup can use the tag indexes
+            tag_filter = Q(tags__slug=tag)
+            if tag.isdigit():
+                tag_filter |= Q(tags__id=int(tag))
+            qs = qs.filter(tag_filter)
 
         if city:
-            qs = qs.filter(location__city__iexact=city)
+            qs = qs.filter(location__city__lower=Lower(Value(city)))
+
+        if coach.isdigit():
+            qs = qs.filter(coach_id=int(coach))
 
+        day_ids = None
         if date_str:
-            # ISO yyyy-mm-dd; match weekday of that date
+            # ISO yyyy-mm-dd, optionally narrowed to a local time window
+            # ("what's on between 18:00 and 20:00"); answered from the
+            # cached per-day interval index rather than by scanning rules.
             try:
                 d = dt.date.fromisoformat(date_str)
-                qs = qs.filter(schedulerule__weekday=d.weekday())
             except ValueError:
-                pass  # ignore invalid date
-
-        return qs.distinct()
+                d = None  # ignore invalid date
+            if d is not None:
+                lo = _minutes(self.request.GET.get("time_from", ""), default=0)
+                hi = _minutes(self.request.GET.get("time_to", ""), default=24 * 60)
+                day_ids = set(day_sessions_index(d).overlapping(lo, hi))
+
+        if within.isdigit() and int(within) in self.WITHIN_CHOICES:
+            now = timezone.now()
+            qs = qs.filter(next_session_at__gte=now,
+                           next_session_at__lt=now + timedelta(days=int(within)))
+
+        # Only the tag join can repeat a class; DISTINCT elsewhere would force
+        # the paginator's COUNT through a subquery over every column.
+        if tag:
+            qs = qs.distinct()
+        return _ClassesOnDay(qs, day_ids) if day_ids is not None else qs
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         ctx["q"] = self.request.GET.get("q", "")
         ctx["tag"] = self.request.GET.get("tag", "")
         ctx["city"] = self.request.GET.get("city", "")
+        ctx["coach"] = self.request.GET.get("coach", "")
         ctx["date"] = self.request.GET.get("date", "")
+        ctx["time_from"] = self.request.GET.get("time_from", "")
+        ctx["time_to"] = self.request.GET.get("time_to", "")
+        ctx["sort"] = self.request.GET.get("sort", "")
+        ctx["within"] = self.request.GET.get("within", "")
+        ctx["within_choices"] = self.WITHIN_CHOICES
 
         # Filter options
-        ctx["all_tags"] = Tag.objects.order_by("name")
-        ctx["all_cities"] = (Location.objects
-                             .values_list("city", flat=True)
-                             .distinct().order_by("city"))
-
-        # Next 3 occurrences per class (for cards)
+        ctx["all_tags"] = catalog_cache.get_or_set(
+            "tags", "options",
+            lambda: list(Tag.objects.order_by("name").values("name", "slug")))
+        ctx["all_cities"] = catalog_cache.get_or_set(
+            "cities", "options",
+            lambda: list(Location.objects
+                         .values_list("city", flat=True)
+                         .distinct().order_by("city")))
+
+        # Next 3 occurrences per class (for cards), precomputed on the row.
+        # Times that have passed since the last refresh are dropped; if that
+        # empties the list the card falls back to expanding the rules.
+        # The fallback reads the shared schedule snapshot when a current one is attached.
         cards = []
-        tz = timezone.get_current_timezone()
+        now = timezone.now()
+        snapshot = get_snapshot()
+        stale = [obj for obj in ctx["classes"]
+                 if obj.next_session_times and obj.upcoming_times[-1] < now]
+        today = now.date()
+        calendars = calendars_for(stale, today - timedelta(days=1), today + timedelta(days=15))
         for obj in ctx["classes"]:
-            rules = obj.weekly_rules.all()
-            next_times = occurrences_for_rules(rules, days_ahead=14, tz=tz)[:3]
+            next_times = [t for t in obj.upcoming_times if t >= now]
+            if obj.pk in calendars:
+                rules = snapshot.rules_for(obj.pk) if snapshot else class_rules(obj.pk)
+                next_times = occurrences_for_rules(rules, days_ahead=14, tz=class_zone(obj),
+                                                   calendar=calendars[obj.pk])[:3]
             cards.append((obj, next_times))
 
-        ctx["cards"] = cards
+        ctx["cards"] = build_cards(cards)
         return ctx
 
 
@@ -134,7 +210,7 @@ class ActivityClassDetail(DetailView):
         if start_param:
             try:
                 y, m, d = map(int, start_param.split("-"))
-                start_dt = timezone.make_aware(datetime.datetime(y, m, d))
+                start_dt = timezone.make_aware(datetime.datetime(y, m, d), class_zone(self.object))
             except Exception:
                 start_dt = timezone.now()
         else:
@@ -149,12 +225,22 @@ class ActivityClassDetail(DetailView):
                 session["end"],
             )
         ctx["upcoming_sessions"] = sessions
+        ctx["similar_classes"] = [
+            entry.similar for entry in
+            SimilarClass.objects
+            .filter(activity_class=self.object)
+            .select_related("similar__location")
+            .order_by("rank")
+        ]
         return ctx
 
 
 GRACE_PERIOD = dt.timedelta(minutes=5)
+# Per IP, session and user; shared by single and series booking.
+BOOKING_RATE = "20/m"
 
 
+@ratelimit("booking", BOOKING_RATE)
 @login_required
 def book_session(request, slug):
     activity_class = get_object_or_404(ActivityClass, slug=slug)
@@ -176,21 +262,301 @@ def book_session(request, slug):
         messages.error(request, "This session has already started.")
         return redirect(activity_class.get_absolute_url())
 
-    already_booked = Booking.objects.filter(
+    existing = Booking.objects.filter(
         user=request.user,
         activity_class=activity_class,
         start=start_dt,
-    ).exists()
+    ).first()
 
-    if already_booked:
+    if existing is not None and existing.status == Booking.STATUS_CONFIRMED:
         messages.info(request, "You already booked this session.")
         return redirect(activity_class.get_absolute_url())
 
-    Booking.objects.create(
-        user=request.user,
-        activity_class=activity_class,
-        start=start_dt,
-        end=end_dt,
-    )
+    if existing is not None:
+        # Re-booking a cancelled session revives the row; the unique
+        # (user, class, start) constraint rules out a second one.
+        existing.status = Booking.STATUS_CONFIRMED
+        existing.end = end_dt
+        existing.save(update_fields=["status", "end"])
+    else:
+        Booking.objects.create(
+            user=request.user,
+            activity_class=activity_class,
+            start=start_dt,
+            end=end_dt,
+        )
     messages.success(request, "Booking confirmed!")
     return redirect(activity_class.get_absolute_url())
+
+
+SERIES_DEFAULT_WEEKS = 8
+
+
+def _parse_series_request(request, activity_class):
+    """Return ``(sessions, error)`` for a series-booking POST.
+
+    Accepts ``rule`` (a `ScheduleRule` id of this class), ``weekday``
+    (repeatable, 0=Mon..6=Sun), ``from`` and ``until`` (ISO dates, defaulting
+    to today and eight weeks later).
+    """
+    tz = class_zone(activity_class)
+    try:
+        today = timezone.localdate(timezone=tz)
+        date_from = dt.date.fromisoformat(request.POST["from"]) if request.POST.get("from") else today
+        date_until = (dt.date.fromisoformat(request.POST["until"]) if request.POST.get("until")
+                      else date_from + timedelta(weeks=SERIES_DEFAULT_WEEKS))
+        rule_id = int(request.POST["rule"]) if request.POST.get("rule") else None
+        weekdays = {int(w) for w in request.POST.getlist("weekday")}
+    except ValueError:
+        return [], "Invalid series parameters."
+    if date_until < date_from:
+        return [], "The end date must not be before the start date."
+
+    start_dt = max(timezone.make_aware(dt.datetime.combine(date_from, dt.time.min), tz), timezone.now())
+    end_dt = timezone.make_aware(dt.datetime.combine(date_until + timedelta(days=1), dt.time.min), tz)
+
+    sessions = expand_rules(activity_class, start_dt, end_dt)
+    if rule_id is not None:
+        sessions = [s for s in sessions if s["rule"] is not None and s["rule"].pk == rule_id]
+    if weekdays:
+        sessions = [s for s in sessions if s["start"].weekday() in weekdays]
+    if not sessions:
+        return [], "No sessions match that series."
+    return sessions, None
+
+
+@ratelimit("booking", BOOKING_RATE)
+@login_required
+@require_POST
+def book_series(request, slug):
+    activity_class = get_object_or_404(ActivityClass.objects.select_related("location"), slug=slug)
+    wants_json = "application/json" in request.headers.get("Accept", "")
+
+    sessions, error = _parse_series_request(request, activity_class)
+    if error:
+        if wants_json:
+            return JsonResponse({"error": error}, status=400)
+        messages.error(request, error)
+        return redirect(activity_class.get_absolute_url())
+
+    results = book_sessions(request.user, activity_class, sessions)
+    if wants_json:
+        return JsonResponse({"results": [
+            {**r, "start": r["start"].isoformat(), "end": r["end"].isoformat()} for r in results
+        ]})
+
+    booked = sum(r["status"] in ("booked", "rebooked") for r in results)
+    messages.success(request, f"Booked {booked} of {len(results)} sessions.")
+    return redirect(activity_class.get_absolute_url())
+
+
+def autocomplete(request):
+    """Suggestions for the search box, answered from the in-memory prefix index."""
+    q = request.GET.get("q", "")
+    try:
+        limit = int(request.GET.get("limit", catalog_autocomplete.DEFAULT_LIMIT))
+    except ValueError:
+        limit = catalog_autocomplete.DEFAULT_LIMIT
+    return JsonResponse({
+        "query": q,
+        "results": [s._asdict() for s in catalog_autocomplete.suggest(q, limit)],
+    })
+
+
+BOOKINGS_PAGE_SIZE = 20
+BOOKING_TABS = ("upcoming", "past")
+
+
+def _bookings_page(user, tab, cursor, limit=BOOKINGS_PAGE_SIZE):
+    """Return ``(bookings, next_cursor)`` for one dashboard tab.
+
+    Keyset-paginated on ``(start, id)``, so no page costs more the deeper
+    the user pages. The upcoming tab is a single range scan of
+    ``booking_user_confirmed_idx``. The past tab (past bookings plus
+    cancelled future ones) cannot be one range: it walks ``(user, start)``
+    backwards from the cursor and filters out confirmed future rows, which
+    only the first pages pass over.
+    """
+    now = timezone.now()
+    qs = (Booking.objects
+          .filter(user=user)
+          .select_related("activity_class__location"))
+
+    if tab == "upcoming":
+        qs = qs.filter(status=Booking.STATUS_CONFIRMED, start__gte=now).order_by("start", "id")
+        if cursor:
+            start, pk = decode_cursor(cursor)
+            qs = qs.filter(Q(start__gt=start) | Q(start=start, id__gt=pk))
+    else:
+        qs = qs.filter(Q(start__lt=now) | Q(status=Booking.STATUS_CANCELLED)).order_by("-start", "-id")
+        if cursor:
+            start, pk = decode_cursor(cursor)
+            qs = qs.filter(Q(start__lt=start) | Q(start=start, id__lt=pk))
+
+    rows = list(qs[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1].start, rows[limit - 1].pk) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _dashboard_params(request):
+    tab = request.GET.get("tab", "upcoming")
+    if tab not in BOOKING_TABS:
+        tab = "upcoming"
+    return tab, request.GET.get("cursor", "")
+
+
+@login_required
+def my_bookings(request):
+    tab, cursor = _dashboard_params(request)
+    try:
+        bookings, next_cursor = _bookings_page(request.user, tab, cursor)
+    except ValueError:
+        return redirect(f"{request.path}?tab={tab}")
+
+    return render(request, "catalog/my_bookings.html", {
+        "tab": tab,
+        "tabs": BOOKING_TABS,
+        "bookings": bookings,
+        "next_cursor": next_cursor,
+    })
+
+
+@login_required
+def my_bookings_json(request):
+    tab, cursor = _dashboard_params(request)
+    try:
+        bookings, next_cursor = _bookings_page(request.user, tab, cursor)
+    except ValueError:
+        return JsonResponse({"error": "Invalid cursor."}, status=400)
+
+    return JsonResponse({
+        "tab": tab,
+        "results": [
+            {
+                "id": b.pk,
+                "class": b.activity_class.title,
+                "url": b.activity_class.get_absolute_url(),
+                "city": b.activity_class.location.city,
+                "start": b.start.isoformat(),
+                "end": b.end.isoformat(),
+                "status": b.status,
+                "cancellable": b.is_cancellable,
+            }
+            for b in bookings
+        ],
+        "next_cursor": next_cursor,
+    })
+
+
+@login_required
+@require_POST
+def cancel_booking(request, pk):
+    booking = get_object_or_404(Booking, pk=pk, user=request.user)
+
+    if not booking.is_cancellable:
+        messages.error(request, "This booking can no longer be cancelled.")
+    else:
+        booking.cancel()
+        messages.success(request, "Booking cancelled.")
+    return redirect("my-bookings")
+
+
+ANALYTICS_DEFAULT_WEEKS = 12
+# Rollup lookup per grouping; the class ones minus "activity_class__" also
+# work on ActivityClass, for scheduled sessions that have no rollup row.
+ANALYTICS_GROUPS = {
+    "class": "activity_class__title",
+    "coach": "activity_class__coach__name",
+    "city": "activity_class__location__city",
+    "week": "week",
+}
+
+
+def _analytics_range(request):
+    today = timezone.localdate()
+    until = today - timedelta(days=today.weekday())
+    since = until - timedelta(weeks=ANALYTICS_DEFAULT_WEEKS - 1)
+    try:
+        since = dt.date.fromisoformat(request.GET.get("since", "")) if request.GET.get("since") else since
+        until = dt.date.fromisoformat(request.GET.get("until", "")) if request.GET.get("until") else until
+    except ValueError:
+        pass
+    return since - timedelta(days=since.weekday()), until - timedelta(days=until.weekday())
+
+
+@staff_member_required
+def analytics(request):
+    """Occupancy and revenue by class, coach, city or week.
+
+    Bookings and revenue come from `ClassWeekRollup`, so their cost depends
+    on the number of (class, week) rows in range, not on how many bookings
+    there are. Fill rates are over every scheduled session, booked or not
+    (`scheduled_sessions`, cached until the schedule changes).
+    """
+    group = request.GET.get("group", "class")
+    if group not in ANALYTICS_GROUPS:
+        group = "class"
+    since, until = _analytics_range(request)
+
+    field = ANALYTICS_GROUPS[group]
+    rows = {
+        row["label"]: dict(row, sessions=0, spots=0)
+        for row in (ClassWeekRollup.objects
+                    .filter(week__gte=since, week__lte=until)
+                    .values(label=F(field))
+                    .annotate(bookings=Sum("bookings"), revenue=Sum("revenue"))
+                    .order_by())
+    }
+
+    scheduled = catalog_cache.get_or_set(
+        "schedule", f"scheduled:{since}:{until}", lambda: scheduled_sessions(since, until), local=False)
+    class_label = "pk" if group == "week" else field.removeprefix("activity_class__")
+    classes = {pk: (capacity, label) for pk, capacity, label in
+               ActivityClass.objects.values_list("pk", "capacity", class_label)}
+    for (class_id, week), count in scheduled.items():
+        if class_id not in classes:
+            continue
+        capacity, label = classes[class_id]
+        if group == "week":
+            label = week
+        row = rows.setdefault(label, {"label": label, "bookings": 0, "revenue": Decimal("0"),
+                                      "sessions": 0, "spots": 0})
+        row["sessions"] += count
+        if capacity:
+            row["spots"] += count * capacity
+
+    rows = sorted(rows.values(), key=lambda row: (-row["revenue"], str(row["label"])))
+    for row in rows:
+        row["fill_rate"] = row["bookings"] / row["spots"] if row["spots"] else None
+
+    return render(request, "catalog/analytics.html", {
+        "rows": rows,
+        "group": group,
+        "groups": ANALYTICS_GROUPS,
+        "since": since,
+        "until": until,
+        "totals": {
+            "bookings": sum(r["bookings"] for r in rows),
+            "revenue": sum(r["revenue"] for r in rows),
+        },
+    })
+
+
+def _sitemap_file(name):
+    path = sitemaps.sitemap_root() / name
+    if not path.is_file():
+        raise Http404("No such sitemap.")
+    return FileResponse(open(path, "rb"), content_type="application/xml")
+
+
+@cache_control(public=True, max_age=3600)
+def sitemap_index(request):
+    """Serve the prebuilt index, building the files first on a fresh deploy."""
+    if not (sitemaps.sitemap_root() / sitemaps.INDEX).exists():
+        sitemaps.build_sitemaps()
+    return _sitemap_file(sitemaps.INDEX)
+
+
+@cache_control(public=True, max_age=3600)
+def sitemap_chunk(request, name):
+    return _sitemap_file(name)
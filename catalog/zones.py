@@ -0,0 +1,79 @@
+"""Time zone helpers shared by schedule expansion, cards and rollups.
+
+Every venue has its own IANA zone (`Location.time_zone`); sessions are
+expanded, displayed and bucketed into days in that zone.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import zoneinfo
+from typing import Callable, Dict, Optional
+
+from django.utils import timezone
+
+
+@functools.lru_cache(maxsize=None)
+def zone_for(name: Optional[str]) -> dt.tzinfo:
+    """Resolve an IANA zone name once per process; unknown names fall back to the default zone."""
+
+    if not name:
+        return timezone.get_default_timezone()
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return timezone.get_default_timezone()
+
+
+def class_zone(activity_class) -> dt.tzinfo:
+    return zone_for(activity_class.location.time_zone)
+
+
+@functools.lru_cache(maxsize=None)
+def _fixed_zone(offset: dt.timedelta) -> dt.tzinfo:
+    return dt.timezone(offset)
+
+
+@functools.lru_cache(maxsize=4096)
+def _day_offsets(zone_key: str, first_day: dt.date, last_day: dt.date) -> Dict[dt.date, dt.tzinfo]:
+    """Map each local date in the range to a fixed-offset tzinfo.
+
+    Dates on which the zone changes offset (DST transitions) are left out;
+    callers fall back to a full zoneinfo conversion for those.
+    """
+
+    zone = zone_for(zone_key)
+    offsets: Dict[dt.date, dt.tzinfo] = {}
+    day = first_day
+    offset = dt.datetime.combine(day, dt.time.min, tzinfo=zone).utcoffset()
+    while day <= last_day:
+        next_day = day + dt.timedelta(days=1)
+        next_offset = dt.datetime.combine(next_day, dt.time.min, tzinfo=zone).utcoffset()
+        if next_offset == offset:
+            offsets[day] = _fixed_zone(offset)
+        day, offset = next_day, next_offset
+    return offsets
+
+
+def localizer(tz: dt.tzinfo, first_day: dt.date, last_day: dt.date) -> Callable[[dt.date, dt.time], dt.datetime]:
+    """Return ``localize(day, time) -> aware datetime`` for dates in the range.
+
+    UTC offsets are precomputed once per (zone, range), so a batch of
+    occurrences converts with a dict lookup each instead of a zoneinfo
+    resolution; only DST-transition days pay for the full conversion.
+    """
+
+    key = getattr(tz, "key", None)
+    if key is None:
+        # Fixed-offset zones (dt.timezone) never shift.
+        return lambda day, time_of_day: dt.datetime.combine(day, time_of_day, tzinfo=tz)
+
+    offsets = _day_offsets(key, first_day, last_day)
+
+    def localize(day: dt.date, time_of_day: dt.time) -> dt.datetime:
+        fixed = offsets.get(day)
+        if fixed is not None:
+            return dt.datetime.combine(day, time_of_day, tzinfo=fixed)
+        return timezone.make_aware(dt.datetime.combine(day, time_of_day), tz)
+
+    return localize
@@ -0,0 +1,111 @@
+import sqlite3
+import time
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addini("suite_time_budget", "Fail a green run that takes longer than this many seconds (0: no limit).",
+                  default="0")
+
+
+def pytest_sessionstart(session):
+    session.config._suite_started = time.perf_counter()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # Under pytest-xdist only the controller (no workerinput) judges the whole run.
+    if hasattr(session.config, "workerinput") or exitstatus != 0:
+        return
+    budget = float(session.config.getini("suite_time_budget") or 0)
+    elapsed = time.perf_counter() - session.config._suite_started
+    if budget and elapsed > budget:
+        writer = session.config.get_terminal_writer()
+        writer.line()
+        writer.line(
+            f"Test suite took {elapsed:.1f}s, over its {budget:.0f}s budget (suite_time_budget in pytest.ini).",
+            red=True)
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_collection_modifyitems(items):
+    # The snapshot is copied in outside any transaction, so seeded tests
+    # cannot use the default rollback-per-test mode; this also makes
+    # pytest-django create the test database for them.
+    for item in items:
+        if "seeded_catalog" in item.fixturenames and not item.get_closest_marker("django_db"):
+            item.add_marker(pytest.mark.django_db(transaction=True))
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    # Test transactions roll back without firing signals, so cached catalog
+    # data would otherwise leak from one test into the next.
+    from django.core.cache import caches
+
+    from catalog import autocomplete, cache as catalog_cache
+    from sportsfinder import ratelimit
+
+    for alias in caches:
+        caches[alias].clear()
+    catalog_cache.clear_local()
+    catalog_cache.stats.reset()
+    autocomplete._holder.reset()
+    ratelimit.local_buckets.clear()
+    yield
+
+
+def _copy_database(connection) -> sqlite3.Connection:
+    copy = sqlite3.connect(":memory:")
+    connection.connection.backup(copy)
+    return copy
+
+
+@pytest.fixture(scope="session")
+def catalog_snapshot(django_db_setup, django_db_blocker):
+    """``(seed result, seeded copy, empty copy)`` of the test database, built once per run.
+
+    The catalog is seeded with ``bulk_create`` a single time; tests get it
+    back through SQLite's backup API, which copies pages rather than
+    replaying inserts. On other databases this yields ``None``.
+    """
+    from django.db import connection
+
+    from catalog.seeding import seed_catalog
+
+    if connection.vendor != "sqlite":
+        yield None
+        return
+    with django_db_blocker.unblock():
+        connection.ensure_connection()
+        empty = _copy_database(connection)
+        result = seed_catalog()
+        seeded = _copy_database(connection)
+        empty.backup(connection.connection)
+    yield result, seeded, empty
+    seeded.close()
+    empty.close()
+
+
+@pytest.fixture
+def seeded_catalog(catalog_snapshot, django_db_blocker):
+    """Database holding `catalog.seeding.seed_catalog()`'s rows; returns its `SeedResult`.
+
+    Each test starts from a fresh copy of the snapshot; the tests are run
+    like ``django_db(transaction=True)`` ones (see below), so writes are
+    real and the database is emptied again afterwards.
+    """
+    from django.db import connection
+
+    from catalog.seeding import seed_catalog
+
+    if catalog_snapshot is None:
+        yield seed_catalog()
+        return
+    result, seeded, empty = catalog_snapshot
+    with django_db_blocker.unblock():
+        connection.ensure_connection()
+        seeded.backup(connection.connection)
+    yield result
+    with django_db_blocker.unblock():
+        empty.backup(connection.connection)
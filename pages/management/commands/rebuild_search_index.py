@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from pages.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the site search index from catalog classes and legacy "
+        "activities. Signals keep it current afterwards; run it once after "
+        "deploying and whenever the document format changes."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} documents."))
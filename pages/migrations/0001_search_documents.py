@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:35
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def create_vector_index(apps, schema_editor):
+    # tsvector/GIN only exist on PostgreSQL; other backends search search_text.
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX search_document_vector_gin ON pages_searchdocument USING gin (search_vector)")
+
+
+def drop_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS search_document_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('class', 'Class'), ('activity', 'Activity')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=160)),
+                ('summary', models.CharField(blank=True, max_length=300)),
+                ('city', models.CharField(blank=True, max_length=120)),
+                ('tags', models.CharField(blank=True, max_length=400)),
+                ('url', models.CharField(max_length=300)),
+                ('search_text', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('boost', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'object_id'), name='search_document_source_unique')],
+            },
+        ),
+        migrations.RunPython(create_vector_index, drop_vector_index),
+    ]
@@ -1,3 +1,38 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
-# Create your models here.
+
+class SearchDocument(models.Model):
+    """One searchable listing, denormalized from catalog classes and legacy activities.
+
+    Maintained by pages.search; ``search_text`` is the normalised haystack
+    used on every backend, ``search_vector`` the weighted tsvector used (and
+    GIN-indexed) on PostgreSQL only.
+    """
+
+    SOURCE_CLASS = "class"
+    SOURCE_ACTIVITY = "activity"
+    SOURCE_CHOICES = (
+        (SOURCE_CLASS, "Class"),
+        (SOURCE_ACTIVITY, "Activity"),
+    )
+
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=160)
+    summary = models.CharField(max_length=300, blank=True)
+    city = models.CharField(max_length=120, blank=True)
+    tags = models.CharField(max_length=400, blank=True)
+    url = models.CharField(max_length=300)
+    search_text = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    boost = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("source", "object_id"), name="search_document_source_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_display()}: {self.title}"
@@ -0,0 +1,162 @@
+"""Site-wide search over catalog classes and legacy activities.
+
+Both sources are flattened into `SearchDocument` rows so a search is one
+query against one table, ranked and paginated in the database. Rows are
+upserted by the signals in pages.signals and can be rebuilt from scratch
+with ``manage.py rebuild_search_index``.
+
+On PostgreSQL ranking uses the weighted, GIN-indexed ``search_vector``
+(title A, tags/city B, description C). Elsewhere every search term must
+appear in the normalised ``search_text`` and title/tag hits score higher.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils.text import Truncator
+
+from activities.models import Activity
+from catalog.autocomplete import normalise
+from catalog.models import ActivityClass
+
+from .models import SearchDocument
+
+
+BATCH_SIZE = 500
+SUMMARY_WORDS = 40
+# Structured, bookable classes outrank free-text legacy listings.
+CLASS_BOOST = 0.5
+UPCOMING_BOOST = 0.25
+
+UPSERT_FIELDS = ["title", "summary", "city", "tags", "url", "search_text", "boost"]
+
+
+def _document(source, object_id, title, description, city, tags, url, boost) -> SearchDocument:
+    return SearchDocument(
+        source=source,
+        object_id=object_id,
+        title=title[:160],
+        summary=Truncator(description).words(SUMMARY_WORDS)[:300],
+        city=city,
+        tags=" ".join(tags)[:400],
+        url=url,
+        search_text=normalise(" ".join([title, " ".join(tags), city, description])),
+        boost=boost,
+    )
+
+
+def class_documents(classes: Iterable[ActivityClass]) -> List[SearchDocument]:
+    """Documents for classes fetched with ``location`` selected and ``tags`` prefetched."""
+
+    return [
+        _document(SearchDocument.SOURCE_CLASS, obj.pk, obj.title, obj.description,
+                  obj.location.city, [t.name for t in obj.tags.all()], obj.get_absolute_url(),
+                  CLASS_BOOST + (UPCOMING_BOOST if obj.next_session_at else 0))
+        for obj in classes
+    ]
+
+
+def activity_documents(activities: Iterable[Activity]) -> List[SearchDocument]:
+    return [
+        _document(SearchDocument.SOURCE_ACTIVITY, obj.pk, obj.title, obj.description,
+                  obj.location, [obj.category] if obj.category else [], obj.get_absolute_url(), 0)
+        for obj in activities
+    ]
+
+
+def _update_vectors(source: str, object_ids: List[int]) -> None:
+    if connection.vendor != "postgresql" or not object_ids:
+        return
+    (SearchDocument.objects
+     .filter(source=source, object_id__in=object_ids)
+     .update(search_vector=(SearchVector("title", weight="A", config="simple")
+                            + SearchVector("tags", "city", weight="B", config="simple")
+                            + SearchVector("summary", weight="C", config="simple"))))
+
+
+def _upsert(source: str, documents: List[SearchDocument]) -> None:
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["source", "object_id"],
+        update_fields=UPSERT_FIELDS,
+        batch_size=BATCH_SIZE,
+    )
+    _update_vectors(source, [doc.object_id for doc in documents])
+
+
+def index_classes(class_ids: Optional[Iterable[int]] = None) -> int:
+    """Upsert documents for the given classes (default: all); drops deleted ones."""
+
+    qs = ActivityClass.objects.select_related("location").prefetch_related("tags").order_by("pk")
+    if class_ids is not None:
+        class_ids = list(class_ids)
+        qs = qs.filter(pk__in=class_ids)
+    count = 0
+    seen = []
+    for start in range(0, qs.count(), BATCH_SIZE):
+        docs = class_documents(qs[start:start + BATCH_SIZE])
+        _upsert(SearchDocument.SOURCE_CLASS, docs)
+        seen.extend(doc.object_id for doc in docs)
+        count += len(docs)
+    if class_ids is not None:
+        remove(SearchDocument.SOURCE_CLASS, set(class_ids) - set(seen))
+    return count
+
+
+def index_activities(activity_ids: Optional[Iterable[int]] = None) -> int:
+    qs = Activity.objects.order_by("pk")
+    if activity_ids is not None:
+        activity_ids = list(activity_ids)
+        qs = qs.filter(pk__in=activity_ids)
+    count = 0
+    seen = []
+    for start in range(0, qs.count(), BATCH_SIZE):
+        docs = activity_documents(qs[start:start + BATCH_SIZE])
+        _upsert(SearchDocument.SOURCE_ACTIVITY, docs)
+        seen.extend(doc.object_id for doc in docs)
+        count += len(docs)
+    if activity_ids is not None:
+        remove(SearchDocument.SOURCE_ACTIVITY, set(activity_ids) - set(seen))
+    return count
+
+
+def remove(source: str, object_ids: Iterable[int]) -> None:
+    object_ids = list(object_ids)
+    if object_ids:
+        SearchDocument.objects.filter(source=source, object_id__in=object_ids).delete()
+
+
+def rebuild_index() -> int:
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        return index_classes() + index_activities()
+
+
+def search(q: str):
+    """Ranked queryset of documents matching ``q`` (best first)."""
+
+    if connection.vendor == "postgresql":
+        query = SearchQuery(q, config="simple", search_type="websearch")
+        return (SearchDocument.objects
+                .filter(search_vector=query)
+                .annotate(rank=SearchRank(F("search_vector"), query) + F("boost"))
+                .order_by("-rank", "title", "pk"))
+
+    terms = normalise(q).split()
+    if not terms:
+        return SearchDocument.objects.none()
+    qs = SearchDocument.objects.all()
+    score = Value(0.0)
+    for term in terms:
+        qs = qs.filter(search_text__contains=term)
+        score = score + Case(
+            When(title__icontains=term, then=Value(1.0)),
+            When(tags__icontains=term, then=Value(0.6)),
+            default=Value(0.3),
+            output_field=FloatField(),
+        )
+    return qs.annotate(rank=score + F("boost")).order_by("-rank", "title", "pk")
@@ -0,0 +1,64 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from activities.models import Activity
+from catalog.models import ActivityClass, Location, Tag
+from catalog.utils import upcoming_changed
+
+from . import search
+from .models import SearchDocument
+
+
+@receiver(post_save, sender=ActivityClass)
+def index_class(sender, instance, **kwargs):
+    search.index_classes([instance.pk])
+
+
+@receiver(m2m_changed, sender=ActivityClass.tags.through)
+def index_class_tags(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, ActivityClass):
+        search.index_classes([instance.pk])
+
+
+@receiver(post_delete, sender=ActivityClass)
+def unindex_class(sender, instance, **kwargs):
+    search.remove(SearchDocument.SOURCE_CLASS, [instance.pk])
+
+
+@receiver(post_save, sender=Location)
+def index_location_classes(sender, instance, created, **kwargs):
+    if not created:
+        search.index_classes(instance.classes.values_list("pk", flat=True))
+
+
+@receiver(upcoming_changed, sender=ActivityClass)
+def index_upcoming_classes(sender, class_ids, **kwargs):
+    # The boost depends on next_session_at, which refresh_next_sessions bulk-updates.
+    search.index_classes(class_ids)
+
+
+@receiver(post_save, sender=Tag)
+def index_tag_classes(sender, instance, created, **kwargs):
+    if not created:
+        search.index_classes(instance.activityclass_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tag_classes(sender, instance, **kwargs):
+    # The m2m rows go with the tag and send no m2m_changed.
+    instance._search_class_ids = list(instance.activityclass_set.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def index_untagged_classes(sender, instance, **kwargs):
+    search.index_classes(getattr(instance, "_search_class_ids", []))
+
+
+@receiver(post_save, sender=Activity)
+def index_activity(sender, instance, **kwargs):
+    search.index_activities([instance.pk])
+
+
+@receiver(post_delete, sender=Activity)
+def unindex_activity(sender, instance, **kwargs):
+    search.remove(SearchDocument.SOURCE_ACTIVITY, [instance.pk])
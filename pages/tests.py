@@ -1,3 +1,73 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from activities.models import Activity
+from catalog.models import ActivityClass, Location, ScheduleRule, Tag
+from catalog.utils import refresh_next_sessions
+from pages.models import SearchDocument
+from pages.search import CLASS_BOOST, UPCOMING_BOOST, rebuild_index
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_search_merges_classes_and_activities(client, django_assert_max_num_queries):
+    owner = User.objects.create_user("owner", "o@example.com", "pass")
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    yoga = ActivityClass.objects.create(title="Morning Yoga", slug="morning-yoga", location=loc)
+    yoga.tags.add(Tag.objects.create(name="Stretching", slug="stretching"))
+    ActivityClass.objects.create(title="Boxing", slug="boxing", location=loc, description="No yoga here")
+    Activity.objects.create(title="Park yoga meetup", description="Bring a mat", category="Yoga",
+                            contacts="-", location="Vilnius", owner=owner)
+
+    # Signals keep the index current, and a rebuild gives the same result.
+    assert SearchDocument.objects.count() == 3
+    rebuild_index()
+    assert SearchDocument.objects.count() == 3
+
+    with django_assert_max_num_queries(3):
+        r = client.get(reverse("search"), {"q": "yoga"})
+    titles = [doc.title for doc in r.context["page_obj"]]
+    # Title hits first, classes ahead of legacy listings; description-only hits last.
+    assert titles == ["Morning Yoga", "Park yoga meetup", "Boxing"]
+
+    r = client.get(reverse("search"), {"q": "stretch kaunas"})
+    assert [doc.title for doc in r.context["page_obj"]] == ["Morning Yoga"]
+
+    yoga.delete()
+    assert not SearchDocument.objects.filter(source=SearchDocument.SOURCE_CLASS, title="Morning Yoga").exists()
+    r = client.get(reverse("activity-detail", args=[Activity.objects.get().pk]))
+    assert b"Bring a mat" in r.content
+
+
+@pytest.mark.django_db
+def test_search_documents_follow_next_sessions_and_tag_changes():
+    loc = Location.objects.create(city="Kaunas", address1="Main St")
+    yoga = ActivityClass.objects.create(title="Morning Yoga", slug="morning-yoga", location=loc)
+    tag = Tag.objects.create(name="Stretching", slug="stretching")
+    yoga.tags.add(tag)
+    doc = SearchDocument.objects.get(source=SearchDocument.SOURCE_CLASS, object_id=yoga.pk)
+    assert doc.boost == CLASS_BOOST
+
+    # refresh_next_sessions writes with bulk_update, which sends no post_save.
+    ScheduleRule.objects.create(activity_class=yoga, weekday=timezone.localdate().weekday(),
+                                time=datetime.time(23, 59))
+    doc.refresh_from_db()
+    assert doc.boost == CLASS_BOOST + UPCOMING_BOOST
+    ScheduleRule.objects.filter(activity_class=yoga).update(active=False)
+    refresh_next_sessions([yoga.pk])
+    doc.refresh_from_db()
+    assert doc.boost == CLASS_BOOST
+
+    tag.name = "Flexibility"
+    tag.save()
+    doc.refresh_from_db()
+    assert doc.tags == "Flexibility"
+
+    tag.delete()
+    doc.refresh_from_db()
+    assert doc.tags == ""
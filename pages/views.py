@@ -1,5 +1,12 @@
+from django.core.paginator import Paginator
 from django.http import HttpResponse
-from django.shortcuts import render 
+from django.shortcuts import render
+
+from .search import search
+
+SEARCH_PAGE_SIZE = 20
+
+
 # Create your views here.
 def home_view(request, *args, **kwargs):
     return render(request, "home.html", {})
@@ -7,4 +14,9 @@ def home_view(request, *args, **kwargs):
 
 
 def search_view(request, *args, **kwargs):
-    return render(request, "search.html", {})
\ No newline at end of file
+    q = request.GET.get("q", "").strip()
+    page_obj = None
+    if q:
+        paginator = Paginator(search(q), SEARCH_PAGE_SIZE)
+        page_obj = paginator.get_page(request.GET.get("page"))
+    return render(request, "search.html", {"q": q, "page_obj": page_obj})
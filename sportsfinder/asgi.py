@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sportsfinder.settings')
 
 application = get_asgi_application()
+
+# Build per-process catalog indexes before the first request is served.
+from catalog import autocomplete  # noqa: E402
+
+autocomplete.warm()
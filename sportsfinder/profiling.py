@@ -0,0 +1,184 @@
+"""Opt-in request profiling for production.
+
+`ProfilingMiddleware` profiles a random ``SAMPLE_RATE`` fraction of
+requests, plus any request that carries a signed ``X-Profile`` header (see
+``manage.py profile_report --token``). Each profile is written to
+``DIR/<url name>/`` as either
+
+* ``.prof`` — a cProfile/pstats dump (``MODE = "cprofile"``), or
+* ``.folded`` — collapsed stacks from a wall-clock stack sampler
+  (``MODE = "sample"``), the input format of flamegraph.pl/speedscope.
+
+Only one request per process is cProfiled at a time; requests sampled
+while the profiler is busy run unprofiled.
+
+``manage.py profile_report`` aggregates them per view. Configure it through
+``settings.REQUEST_PROFILING``; with ``ENABLED`` false the middleware
+removes itself at startup and costs nothing.
+"""
+from __future__ import annotations
+
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, get_resolver
+
+
+DEFAULTS = {
+    "ENABLED": False,
+    "SAMPLE_RATE": 0.0,           # fraction of requests profiled at random
+    "MODE": "cprofile",           # or "sample"
+    "SAMPLE_INTERVAL": 0.001,     # seconds between stack samples
+    "DIR": None,                  # defaults to BASE_DIR/.cache/profiles
+    "HEADER": "X-Profile",
+    "TOKEN_MAX_AGE": 3600,        # seconds a signed debug token stays valid
+    "MAX_FILES_PER_VIEW": 500,
+}
+TOKEN_SALT = "sportsfinder.profiling"
+
+# cProfile hooks the interpreter, and on Python 3.12+ a second profiler in
+# the same process raises; threaded workers profile one request at a time.
+_cprofile_lock = threading.Lock()
+
+
+def setting(name: str) -> Any:
+    return getattr(settings, "REQUEST_PROFILING", {}).get(name, DEFAULTS[name])
+
+
+def profile_dir() -> Path:
+    return Path(setting("DIR") or Path(settings.BASE_DIR) / ".cache" / "profiles")
+
+
+def make_token() -> str:
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign("profile")
+
+
+def token_is_valid(token: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=setting("TOKEN_MAX_AGE"))
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def frame_label(code) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}:{code.co_firstlineno}"
+
+
+class StackSampler:
+    """Samples one thread's stack on a timer and counts collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not setting("ENABLED"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.header = "HTTP_" + setting("HEADER").upper().replace("-", "_")
+
+    def should_profile(self, request) -> bool:
+        token = request.META.get(self.header)
+        if token:
+            return token_is_valid(token)
+        rate = setting("SAMPLE_RATE")
+        return rate > 0 and random.random() < rate
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        # Resolve up front so a view that already has enough profiles is not
+        # profiled only to throw the result away.
+        directory = self._directory_for(request)
+        if directory is None:
+            return self.get_response(request)
+
+        mode = setting("MODE")
+        if mode == "sample":
+            return self._profile(request, directory, mode)
+        if not _cprofile_lock.acquire(blocking=False):
+            return self.get_response(request)  # another request is being profiled
+        try:
+            return self._profile(request, directory, mode)
+        finally:
+            _cprofile_lock.release()
+
+    def _profile(self, request, directory: Path, mode: str):
+        started = time.perf_counter()
+        if mode == "sample":
+            sampler = StackSampler(threading.get_ident(), setting("SAMPLE_INTERVAL"))
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        # The id keeps two requests with the same second and timing apart.
+        path = directory / (f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+                            f"-{elapsed_ms:.0f}ms{'.folded' if mode == 'sample' else '.prof'}")
+        if mode == "sample":
+            path.write_text(sampler.folded())
+        else:
+            profiler.dump_stats(path)
+        response["X-Profile-Id"] = f"{path.parent.name}/{path.name}"
+        return response
+
+    @staticmethod
+    def _directory_for(request) -> Optional[Path]:
+        """The view's profile directory, or None once it holds MAX_FILES_PER_VIEW profiles."""
+
+        try:
+            view = get_resolver(getattr(request, "urlconf", None)).resolve(request.path_info).view_name
+        except Resolver404:
+            view = None
+        directory = profile_dir() / (view or "unresolved").replace(":", ".")
+        directory.mkdir(parents=True, exist_ok=True)
+        if sum(1 for _ in directory.iterdir()) >= setting("MAX_FILES_PER_VIEW"):
+            return None  # keep disk use bounded; older profiles are enough
+        return directory
@@ -0,0 +1,172 @@
+"""Token-bucket rate limiting for abuse-prone views.
+
+A bucket holds up to ``burst`` tokens and refills continuously at
+``count / period``; each request takes one token or is refused with 429.
+Buckets are kept per scope and per client key (IP, session cookie and
+authenticated user id).
+
+Two stores implement the same `take` call:
+
+* `LocalBuckets` — in-process dict behind a lock; a check costs a couple
+  of microseconds but limits are per worker process.
+* `CacheBuckets` — Django's shared cache, so limits hold across workers and
+  hosts. The read-modify-write is not atomic; under a race a client can
+  get a token or two extra, which is acceptable for abuse protection.
+
+Keys are derived without touching the database: the IP comes from
+``REMOTE_ADDR``, the session from its cookie, and the user id from the
+session data (for cache-backed sessions, no query at all). Views opt in
+with the `ratelimit` decorator; configure via ``settings.RATELIMIT``.
+"""
+from __future__ import annotations
+
+import functools
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+
+DEFAULTS = {
+    "ENABLED": True,
+    "BACKEND": "local",        # or "cache"
+    "CACHE_ALIAS": "default",
+    "MAX_KEYS": 100_000,       # local buckets kept per process (LRU)
+    "IP_HEADER": "REMOTE_ADDR",
+}
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_RATE_RE = re.compile(r"^(\d+)/(\d*)([smhd])$")
+
+
+def setting(name: str) -> Any:
+    return getattr(settings, "RATELIMIT", {}).get(name, DEFAULTS[name])
+
+
+class Rate(NamedTuple):
+    count: int
+    period: float  # seconds
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parse ``"10/m"`` or ``"5/10s"``."""
+        match = _RATE_RE.match(value.strip())
+        if not match:
+            raise ValueError(f"Invalid rate {value!r}; expected e.g. '10/m' or '5/10s'.")
+        count, multiplier, unit = match.groups()
+        return cls(int(count), int(multiplier or 1) * PERIODS[unit])
+
+
+def _refill(state: Optional[Tuple[float, float]], rate: Rate, now: float) -> Tuple[float, float]:
+    """Return ``(tokens, retry_after)`` after taking one token (tokens < 0: refused)."""
+
+    if state is None:
+        tokens = float(rate.count)
+    else:
+        tokens, stamp = state
+        tokens = min(float(rate.count), tokens + (now - stamp) * rate.count / rate.period)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return -1.0, (1 - tokens) * rate.period / rate.count
+
+
+class LocalBuckets:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._data: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: Rate) -> float:
+        """Take a token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._data.get(key)
+            tokens, retry_after = _refill(state, rate, now)
+            if tokens >= 0:
+                self._data[key] = (tokens, now)
+                self._data.move_to_end(key)
+                if len(self._data) > self.max_keys:
+                    self._data.popitem(last=False)
+            return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheBuckets:
+    def take(self, key: str, rate: Rate) -> float:
+        cache = caches[setting("CACHE_ALIAS")]
+        now = time.time()
+        cache_key = f"ratelimit:{key}"
+        tokens, retry_after = _refill(cache.get(cache_key), rate, now)
+        if tokens >= 0:
+            cache.set(cache_key, (tokens, now), timeout=int(rate.period) + 1)
+        return retry_after
+
+
+local_buckets = LocalBuckets(setting("MAX_KEYS"))
+cache_buckets = CacheBuckets()
+
+
+def client_keys(request, kinds: Iterable[str]) -> Iterable[str]:
+    for kind in kinds:
+        if kind == "ip":
+            value = request.META.get(setting("IP_HEADER"), "")
+            value = value.split(",")[0].strip()
+        elif kind == "session":
+            value = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        elif kind == "user":
+            user = getattr(request, "_cached_user", None)
+            if user is not None:
+                value = user.pk
+            else:
+                session = getattr(request, "session", None)
+                value = session.get(SESSION_KEY) if session is not None else None
+        else:
+            raise ValueError(f"Unknown rate limit key {kind!r}.")
+        if value:
+            yield f"{kind}:{value}"
+
+
+def too_many_requests(request, retry_after: float) -> HttpResponse:
+    seconds = max(1, round(retry_after))
+    if "application/json" in request.headers.get("Accept", ""):
+        response = JsonResponse({"error": "Too many requests.", "retry_after": seconds}, status=429)
+    else:
+        response = HttpResponse("Too many requests. Please slow down.", status=429, content_type="text/plain")
+    response["Retry-After"] = str(seconds)
+    return response
+
+
+def ratelimit(scope: str, rate: str, keys: Iterable[str] = ("ip", "session", "user"),
+              methods: Iterable[str] = ("POST",)):
+    """Limit a view to ``rate`` requests per client key within ``scope``.
+
+    Every key of the request is charged; the request is refused if any
+    bucket is empty. Only ``methods`` are counted, so GETs of a form are free.
+    """
+
+    parsed = Rate.parse(rate)
+    keys = tuple(keys)
+    methods = frozenset(m.upper() for m in methods)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods and setting("ENABLED"):
+                buckets = cache_buckets if setting("BACKEND") == "cache" else local_buckets
+                for key in client_keys(request, keys):
+                    retry_after = buckets.take(f"{scope}:{key}", parsed)
+                    if retry_after:
+                        return too_many_requests(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapped
+
+    return decorator
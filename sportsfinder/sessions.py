@@ -0,0 +1,26 @@
+"""Session store: cached_db plus a short negative cache for unknown keys.
+
+Logged-in sessions are read from the cache and only written through to the
+database. Anonymous visitors normally have no session cookie, so nothing is
+loaded at all; the exception is a stale cookie (expired, flushed or from
+another deployment), which would otherwise cost a ``django_session``
+lookup on every page view. Those misses are remembered for a few minutes.
+"""
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+MISSING_TTL = 300  # seconds
+
+
+class SessionStore(CachedDBStore):
+    def _missing_key(self, session_key):
+        return f"{self.cache_key_prefix}missing:{session_key}"
+
+    def load(self):
+        session_key = self.session_key
+        if session_key and self._cache.get(self._missing_key(session_key)):
+            self._session_key = None
+            return {}
+        data = super().load()
+        if session_key and self.session_key is None:
+            self._cache.set(self._missing_key(session_key), True, MISSING_TTL)
+        return data
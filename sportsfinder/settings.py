@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,12 +54,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'sportsfinder.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'sportsfinder.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'sportsfinder.urls'
@@ -69,8 +72,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR /'sportsfinder'/ 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept per process; in DEBUG the autoreloader
+            # clears them when a template file changes.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -98,6 +108,85 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# The shared tier. Set REDIS_URL to use Redis; otherwise a file-based cache
+# keeps entries shared between worker processes on one host. catalog.cache
+# puts a small in-process LRU in front of it (see CATALOG_CACHE).
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "TIMEOUT": 300,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / ".cache" / "django",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+CATALOG_CACHE = {
+    "TIMEOUT": 300,
+    "STALE_TTL": 60,
+    "LOCAL_MAX_ENTRIES": 512,
+    "LOCAL_TTL": 30,
+}
+
+# Memory-mapped schedule snapshot shared by all workers on a host; rebuilt by
+# `manage.py build_schedule_snapshot`. Set to None to always read rules from
+# the database.
+SCHEDULE_SNAPSHOT_PATH = BASE_DIR / ".cache" / "schedule.snapshot"
+
+# Absolute base for URLs written into sitemaps and feeds.
+SITE_URL = os.environ.get("SITE_URL", "http://localhost:8000")
+
+# Opt-in sampling profiler (see sportsfinder/profiling.py); inspect the
+# results with `manage.py profile_report`.
+REQUEST_PROFILING = {
+    "ENABLED": os.environ.get("REQUEST_PROFILING") == "1",
+    "SAMPLE_RATE": float(os.environ.get("REQUEST_PROFILING_RATE", "0.01")),
+    "MODE": "cprofile",
+    "DIR": BASE_DIR / ".cache" / "profiles",
+}
+
+# Token-bucket throttling for booking, login and registration (see
+# sportsfinder/ratelimit.py). "local" is per process; "cache" shares
+# buckets through CACHES["default"] (use it with Redis). Load tests from
+# one address run with RATELIMIT_ENABLED=0.
+RATELIMIT = {
+    "ENABLED": os.environ.get("RATELIMIT_ENABLED", "1") == "1",
+    "BACKEND": "cache" if os.environ.get("REDIS_URL") else "local",
+}
+
+# Sitemap files written by `manage.py build_sitemaps`; serve this directory
+# as static files in production.
+SITEMAP_ROOT = BASE_DIR / ".cache" / "sitemaps"
+
+
+# Sessions live in the cache with write-through to the database, so a
+# logged-in page view does not read django_session. Flash messages go in a
+# cookie, so showing one never creates a session for an anonymous visitor.
+SESSION_ENGINE = "sportsfinder.sessions"
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
+# Password hashing. PBKDF2 cost is configurable per environment; hashes
+# made at another cost still verify and are upgraded on the next login.
+PASSWORD_HASHERS = [
+    "accounts.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", "1000000"))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -136,6 +225,30 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# `collectstatic` writes content-hashed copies plus .gz/.br variants, and
+# StaticFilesMiddleware serves them with immutable caching (see
+# sportsfinder/staticfiles.py). In DEBUG, runserver serves the sources as is.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage" if DEBUG
+            else "sportsfinder.staticfiles.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+STATIC_SERVING = {
+    "ENABLED": not DEBUG,
+    "MAX_AGE": 60,
+}
+
+# Uploaded photos and their generated renditions.
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
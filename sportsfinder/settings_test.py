@@ -1,12 +1,27 @@
+import os
+
 from .settings import *  # noqa
 
+# The test database lives in memory (Django's default for SQLite) unless
+# TEST_DB_FILE names a file, e.g. to inspect it after a run; under
+# pytest-xdist each worker then gets its own "<name>_gwN" copy.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "test_db.sqlite3",
+        "TEST": {"NAME": os.environ.get("TEST_DB_FILE") or None},
+    }
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sportsfinder-tests",
     }
 }
 
+SCHEDULE_SNAPSHOT_PATH = None
+
 PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.MD5PasswordHasher",
 ]
@@ -0,0 +1,210 @@
+"""Production static files: hashed names, precompressed variants, served in-process.
+
+`CompressedManifestStaticFilesStorage` is Django's manifest storage (every
+file also gets a content-hashed copy such as ``styles.3f9a1c2b7d4e.css``,
+and ``{% static %}`` points at it) that additionally writes ``.gz`` and,
+when the ``brotli`` package is installed, ``.br`` siblings during
+``collectstatic``. Compression happens once at deploy time at maximum
+level, never per request.
+
+`StaticFilesMiddleware` serves ``STATIC_ROOT`` from the app process, so
+no separate web server is needed in front of it. It indexes the directory
+once at startup and answers ``STATIC_URL`` requests before any other
+middleware runs, sending the brotli or gzip variant when the client
+accepts it, each with its own strong ``ETag``. Hashed files get
+``Cache-Control: public, max-age=31536000, immutable``; files without a
+hash (e.g. requested by a hard-coded path) get a short max-age.
+Configure via ``settings.STATIC_SERVING``.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import mimetypes
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotAllowed
+from django.utils.http import http_date, parse_etags
+
+try:
+    import brotli
+except ImportError:  # optional; gzip alone still covers every browser
+    brotli = None
+
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MAX_AGE": 60,                  # seconds, for files without a content hash
+    "IMMUTABLE_MAX_AGE": 31536000,  # one year, for hashed files
+}
+
+# Already-compressed formats gain nothing from another pass.
+SKIP_EXTENSIONS = frozenset({
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".ico",
+    ".woff", ".woff2", ".zip", ".gz", ".br", ".mp4", ".webm",
+})
+MIN_SIZE = 200          # bytes; smaller files are not worth a variant
+MIN_SAVING = 0.05       # keep a variant only if it is at least 5% smaller
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def setting(name: str) -> Any:
+    return getattr(settings, "STATIC_SERVING", {}).get(name, DEFAULTS[name])
+
+
+def compress(data: bytes):
+    """Yield ``(suffix, payload)`` for each worthwhile compressed variant of ``data``."""
+
+    if brotli is not None:
+        yield ".br", brotli.compress(data, quality=11)
+    yield ".gz", gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        written = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, processed
+            if not dry_run and not isinstance(processed, Exception):
+                written.update(n for n in (name, hashed_name) if n)
+        if dry_run:
+            return
+        for name in sorted(written):
+            for variant in self._compress(name):
+                yield name, variant, True
+
+    def _compress(self, name: str) -> Iterable[str]:
+        if os.path.splitext(name)[1].lower() in SKIP_EXTENSIONS:
+            return
+        path = Path(self.path(name))
+        data = path.read_bytes()
+        if len(data) < MIN_SIZE:
+            return
+        for suffix, payload in compress(data):
+            target = path.with_name(path.name + suffix)
+            if len(payload) <= len(data) * (1 - MIN_SAVING):
+                target.write_bytes(payload)
+                yield name + suffix
+            else:
+                target.unlink(missing_ok=True)
+
+
+class StaticFile(NamedTuple):
+    path: Path
+    content_type: str
+    size: int
+    mtime: float
+    etag: str
+    immutable: bool
+    variants: Dict[str, tuple]  # encoding -> (path, size)
+
+
+def accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in {"0", "0.0", "0.00", "0.000"}:
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def build_index(root: Path, immutable_names: Optional[set] = None) -> Dict[str, StaticFile]:
+    """Map every file under ``root`` (by its URL-relative name) to what serving it needs."""
+
+    if immutable_names is None:
+        immutable_names = set(_manifest_names(root))
+    index: Dict[str, StaticFile] = {}
+    for directory, _, files in os.walk(root):
+        names = set(files)
+        for filename in files:
+            path = Path(directory, filename)
+            name = path.relative_to(root).as_posix()
+            if filename.endswith((".gz", ".br")) and filename[:-3] in names:
+                continue  # served as a variant of the uncompressed file
+            stat = path.stat()
+            variants = {}
+            for encoding, suffix in ENCODINGS:
+                variant = path.with_name(filename + suffix)
+                if filename + suffix in names:
+                    variants[encoding] = (variant, variant.stat().st_size)
+            content_type, _ = mimetypes.guess_type(filename)
+            index[name] = StaticFile(
+                path=path,
+                content_type=content_type or "application/octet-stream",
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                etag=f'"{int(stat.st_mtime):x}-{stat.st_size:x}"',
+                immutable=name in immutable_names,
+                variants=variants,
+            )
+    return index
+
+
+def _manifest_names(root: Path) -> Iterable[str]:
+    try:
+        manifest = json.loads((root / ManifestStaticFilesStorage.manifest_name).read_text())
+    except (FileNotFoundError, ValueError):
+        return ()
+    return manifest.get("paths", {}).values()
+
+
+class StaticFilesMiddleware:
+    def __init__(self, get_response):
+        root = getattr(settings, "STATIC_ROOT", None)
+        if not setting("ENABLED") or not root or not Path(root).is_dir():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        if not self.prefix.endswith("/"):
+            self.prefix += "/"
+        self.files = build_index(Path(root))
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.prefix):
+            static_file = self.files.get(request.path_info[len(self.prefix):])
+            if static_file is not None:
+                return self.serve(request, static_file)
+        return self.get_response(request)
+
+    def serve(self, request, static_file: StaticFile) -> HttpResponse:
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+
+        path, size, encoding = static_file.path, static_file.size, None
+        accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        for candidate, _ in ENCODINGS:
+            if candidate in accepted and candidate in static_file.variants:
+                (path, size), encoding = static_file.variants[candidate], candidate
+                break
+        # Each encoding is a different byte sequence, so it gets its own
+        # strong validator: the file's ETag with the encoding appended.
+        etag = f'{static_file.etag[:-1]}-{encoding}"' if encoding else static_file.etag
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponse(status=304)
+        else:
+            if request.method == "HEAD":
+                response = HttpResponse()
+            else:
+                response = FileResponse(open(path, "rb"))
+            response["Content-Type"] = static_file.content_type
+            response["Content-Length"] = str(size)
+            if encoding:
+                response["Content-Encoding"] = encoding
+
+        if static_file.immutable:
+            response["Cache-Control"] = f"public, max-age={setting('IMMUTABLE_MAX_AGE')}, immutable"
+        else:
+            response["Cache-Control"] = f"public, max-age={setting('MAX_AGE')}"
+        if static_file.variants:
+            response["Vary"] = "Accept-Encoding"
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(static_file.mtime)
+        return response
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sportsfinder.settings')
 
 application = get_wsgi_application()
+
+# Build per-process catalog indexes before the first request is served.
+from catalog import autocomplete  # noqa: E402
+
+autocomplete.warm()